@@ -1,33 +1,13 @@
-from flask import Flask, request, jsonify
-import pandas as pd
-import joblib
+# app.py
+# Prediction-only service (no Mongo); all routes live in student_service
+from student_service import create_app
+from student_service.context import EXTENSION
 
-# Load the trained pipeline/model
-model = joblib.load("performance_pipeline.pkl")  # Make sure this is the pipeline object
+app = create_app(enable_mongo=False)
 
-app = Flask(__name__)
-
-@app.route("/")
-def home():
-    return "Student Pass Prediction API is running"
-
-@app.route("/predict", methods=["POST"])
-def predict():
-    try:
-        data = request.get_json()  # Expect JSON input
-        if not data:
-            return jsonify({"error": "No input data provided"}), 400
-
-        # Convert JSON to DataFrame (pipeline handles preprocessing)
-        df = pd.DataFrame([data])
-
-        # Make prediction
-        prediction = model.predict(df)
-
-        return jsonify({"passed": int(prediction[0])})
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+service = app.extensions[EXTENSION]
+registry = service.model.registry
+cache = service.model.cache
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,334 @@
+"""
+Batch scoring for large CSV / Parquet files in constant memory.
+
+Reads the input in chunks, scores the chunks on a process pool (each worker
+loads the compiled model once) and appends the results to the output as
+they complete, in input order:
+
+    python batch_predict.py history.csv scored.csv --dataset math
+    python batch_predict.py history.csv scored_parquet/ --format parquet --workers 8
+    python batch_predict.py big.parquet scored.csv --chunk-size 200000
+    python batch_predict.py data/processed/students scored.csv   # columnar_dataset directory
+
+CSV output is one file; Parquet output is a directory of part files (read
+it back with pd.read_parquet(dir)). After every written chunk a small
+progress file records how far the run got, so re-running the same command
+after a crash continues from the last complete chunk (--restart starts over).
+Rows that cannot be scored get an empty prediction and are counted.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from columnar_dataset import is_columnar, load_columnar
+from fast_pipeline import load_compiled_pipeline
+from prediction_cache import model_file_hash
+from student_schema import CATEGORICAL_COLUMNS, DEFAULTS, NUMERIC_COLUMNS, REQUIRED_COLUMNS, dataset_for_path
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+# ----------------------
+# Worker side
+# ----------------------
+_predictor = None
+
+
+def _init_worker(model_path):
+    global _predictor
+    _, _predictor = load_compiled_pipeline(model_path)
+
+
+def _score_columns(columns):
+    """Predictions for a dict of column arrays; rows that cannot be scored get -1."""
+    n_rows = len(next(iter(columns.values())))
+    # Rows with a missing or non-numeric numeric feature are masked out up front,
+    # so one bad row does not push its whole chunk onto the row-by-row path
+    valid = np.ones(n_rows, dtype=bool)
+    for col in NUMERIC_COLUMNS:
+        values = pd.to_numeric(columns[col], errors="coerce").astype(np.float64)
+        valid &= np.isfinite(values)
+        columns[col] = values
+
+    predictions = np.full(n_rows, -1, dtype=np.int64)
+    rows = np.flatnonzero(valid)
+    subset = {col: values[rows] for col, values in columns.items()}
+    try:
+        predictions[rows] = _predictor.predict_columns(subset)
+    except (ValueError, TypeError):
+        for i in rows:
+            try:
+                predictions[i] = _predictor.predict_columns({col: values[i:i + 1] for col, values in columns.items()})[0]
+            except (ValueError, TypeError):
+                pass
+    return predictions
+
+
+class _Done:
+    """Stands in for a Future when scoring inline (--workers 1)."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def done(self):
+        return True
+
+    def result(self):
+        return self.value
+
+
+# ----------------------
+# Input
+# ----------------------
+def read_chunks(path, chunk_size, skip_rows=0):
+    """DataFrames of up to chunk_size rows, starting after the first skip_rows data rows."""
+    if is_columnar(path):
+        # Memory-mapped: skipping rows is free and categoricals arrive already coded
+        yield from load_columnar(path).iter_chunks(chunk_size, start=skip_rows)
+        return
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        seen = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            if seen + batch.num_rows <= skip_rows:
+                seen += batch.num_rows
+                continue
+            df = batch.to_pandas()
+            if seen < skip_rows:
+                df = df.iloc[skip_rows - seen:]
+            seen += batch.num_rows
+            yield df
+        return
+
+    # Categorical codes stay strings across chunks (e.g. a column of "1"/"2" values)
+    header = pd.read_csv(path, nrows=0).columns
+    dtype = {col: str for col in CATEGORICAL_COLUMNS if col in header}
+    # A callable, not a range: pandas turns a list-like skiprows into a set of every skipped row
+    yield from pd.read_csv(path, chunksize=chunk_size, dtype=dtype,
+                           skiprows=(lambda i: 0 < i <= skip_rows) if skip_rows else None)
+
+
+def input_columns(path):
+    """Column names of a CSV / .parquet file or columnar_dataset directory, without reading its rows."""
+    if is_columnar(path):
+        return load_columnar(path).columns
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def prepare_chunk(df, dataset=None):
+    """Adds the dataset column (if given) and defaults for missing model columns."""
+    if dataset and "dataset" not in df.columns:
+        df["dataset"] = dataset
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            df[col] = DEFAULTS[col]
+    return df
+
+
+# ----------------------
+# Output
+# ----------------------
+class CsvOutput:
+    def __init__(self, path, resume_bytes=None):
+        self.path = path
+        if resume_bytes is None:
+            self.file = open(path, "w", newline="")
+            self.header = True
+        else:
+            # Drop whatever a crashed run wrote after its last complete chunk
+            self.file = open(path, "r+", newline="")
+            self.file.truncate(resume_bytes)
+            self.file.seek(resume_bytes)
+            self.header = resume_bytes == 0
+
+    def write(self, df, index):
+        df.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetOutput:
+    def __init__(self, path, resume_bytes=None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        if resume_bytes is None:
+            for name in os.listdir(path):
+                if name.startswith("part-"):
+                    os.remove(os.path.join(path, name))
+
+    def write(self, df, index):
+        final = os.path.join(self.path, f"part-{index:06d}.parquet")
+        tmp = final + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, final)
+        return 0
+
+    def close(self):
+        pass
+
+
+def _load_progress(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_progress(path, progress):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(progress, f)
+    os.replace(tmp, path)
+
+
+# ----------------------
+# Driver
+# ----------------------
+def run_batch(input_path, output_path, model_path="performance_pipeline.pkl", fmt=None,
+              chunk_size=DEFAULT_CHUNK_SIZE, workers=None, dataset=None, restart=False, log=sys.stderr):
+    """
+    Scores `input_path` into `output_path`. Returns a summary dict.
+
+    Parameters:
+    input_path (str): CSV or .parquet file, or columnar_dataset directory, of student rows
+    output_path (str): CSV file, or directory for fmt="parquet"
+    model_path (str): Pickled pipeline to score with
+    fmt (str): "csv" or "parquet" (default: from output_path)
+    chunk_size (int): Rows per chunk; memory use is about (2 x workers + 1) chunks
+    workers (int): Scoring processes (default: CPU count; 1 = score in this process)
+    dataset (str): Value for a missing `dataset` column ("math" / "portuguese"); by
+        default taken from the file name (student_mat / student_por)
+    restart (bool): Ignore saved progress and start from the first row
+
+    Raises ValueError when the input has no `dataset` column and none is given or inferable.
+    """
+    dataset = dataset or dataset_for_path(input_path)
+    if dataset is None and "dataset" not in input_columns(input_path):
+        raise ValueError(f"{input_path} has no dataset column and its name does not say math or portuguese; "
+                         f"pass dataset (--dataset)")
+    fmt = fmt or ("parquet" if output_path.endswith(("/", ".parquet")) or os.path.isdir(output_path) else "csv")
+    output_path = output_path.rstrip("/")
+    workers = workers or os.cpu_count() or 1
+    model_version = model_file_hash(model_path)
+
+    output_class = ParquetOutput if fmt == "parquet" else CsvOutput
+    progress_path = output_path + ".progress.json" if fmt == "csv" else os.path.join(output_path, "_progress.json")
+    progress = None if restart else _load_progress(progress_path)
+    run_key = {"input": os.path.abspath(input_path), "chunk_size": chunk_size, "model_version": model_version}
+    if progress is not None and {k: progress.get(k) for k in run_key} != run_key:
+        raise ValueError(f"{progress_path} belongs to a different run ({progress.get('input')}, "
+                         f"model {progress.get('model_version')}); use --restart to start over")
+    if progress is None:
+        progress = {**run_key, "chunks": 0, "rows": 0, "failed_rows": 0, "output_bytes": 0}
+        resume_bytes = None
+    else:
+        resume_bytes = progress["output_bytes"]
+        print(f"Resuming after {progress['rows']} rows ({progress['chunks']} chunks)", file=log)
+
+    output = output_class(output_path, resume_bytes)
+    start = time.perf_counter()
+    rows_at_start = progress["rows"]
+    last_report = start
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_path,))
+        submit = lambda columns: pool.submit(_score_columns, columns)
+    else:
+        pool = None
+        _init_worker(model_path)
+        submit = lambda columns: _Done(_score_columns(columns))
+
+    def write_next(pending):
+        nonlocal last_report
+        index = min(pending)
+        df, future = pending.pop(index)
+        predictions = future.result()
+        df["prediction"] = pd.array(np.where(predictions < 0, None, predictions), dtype="Int8")
+        df["model_version"] = model_version
+        progress["output_bytes"] = output.write(df, index)
+        progress["chunks"] = index + 1
+        progress["rows"] += len(df)
+        progress["failed_rows"] += int((predictions < 0).sum())
+        _save_progress(progress_path, progress)
+
+        now = time.perf_counter()
+        if now - last_report >= 5:
+            rate = (progress["rows"] - rows_at_start) / (now - start)
+            print(f"{progress['rows']} rows scored ({rate:,.0f} rows/s)", file=log)
+            last_report = now
+
+    try:
+        pending = {}
+        max_in_flight = 2 * workers
+        chunks = read_chunks(input_path, chunk_size, skip_rows=progress["rows"])
+        for index, df in enumerate(chunks, start=progress["chunks"]):
+            df = prepare_chunk(df, dataset)
+            # Categorical columns stay coded, so the kernel looks each category up once
+            columns = {col: df[col].array if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].to_numpy()
+                       for col in REQUIRED_COLUMNS}
+            pending[index] = (df, submit(columns))
+            # Write finished chunks in order; block once too many are in flight
+            while pending and (len(pending) >= max_in_flight or pending[min(pending)][1].done()):
+                write_next(pending)
+        while pending:
+            write_next(pending)
+    finally:
+        output.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    scored = progress["rows"] - rows_at_start
+    summary = {
+        "rows": progress["rows"],
+        "rows_this_run": scored,
+        "failed_rows": progress["failed_rows"],
+        "chunks": progress["chunks"],
+        "model_version": model_version,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(scored / elapsed, 1) if elapsed else 0.0,
+        "output": output_path,
+    }
+    print(f"Scored {scored} rows in {elapsed:.2f}s ({summary['rows_per_second']:,.0f} rows/s), "
+          f"{summary['failed_rows']} failed -> {output_path}", file=log)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a large CSV/Parquet file in chunks")
+    parser.add_argument("input", help="CSV or .parquet file, or columnar dataset directory, of student rows")
+    parser.add_argument("output", help="Output CSV file, or directory with --format parquet")
+    parser.add_argument("--model", default="performance_pipeline.pkl")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="Output format (default: from the output path)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, help="Scoring processes (default: CPU count)")
+    parser.add_argument("--dataset", choices=["math", "portuguese"],
+                        help="Value for a missing dataset column (default: from the file name)")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start over")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.input, args.output, args.model, args.format, args.chunk_size,
+                        args.workers, args.dataset, args.restart)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+Offline load test of every API entry point, with results saved as JSON.
+
+Each app runs in-process in its own child process (Prometheus metrics and
+logging are configured at import time): the Flask apps through their test
+client on a thread per concurrent caller, student_api through httpx's ASGI
+transport. No port is bound, so the numbers are the app's own cost
+without the HTTP server and network.
+
+Scenarios, run for every app that serves the route:
+
+    predict        POST /predict, one student per request
+    predict_batch  POST /predict/batch, --batch-size students as NDJSON
+    students       GET /students?limit=--page-size (first page)
+    replay         requests recorded in a --replay JSON Lines file
+
+Payloads are the rows of data/raw/*.csv, typed as the ingest path types
+them. A --replay file holds one request per line:
+{"method": "POST", "path": "/predict", "body": {...}}. Lines without a
+"path" are treated as a /predict body.
+
+MongoDB is mongomock by default. With --uri the apps use a local mongod,
+in the scratch database bench_student_service, which is dropped afterwards.
+The prediction cache is off unless --cache is given, because the replayed
+rows repeat.
+
+    python benchmarks/bench_api.py --concurrency 1 8 32 --output results.json
+    python benchmarks/bench_api.py --targets app student_api --compare results.json
+    python benchmarks/bench_api.py --uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import glob
+import inspect
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+CSV_FILES = sorted(glob.glob(os.path.join(PROJECT_DIR, "data", "raw", "*.csv")))
+
+TARGETS = {
+    "app": "app",
+    "predict_api": "predict_api",
+    "mongodb_app": "mongodb_app",
+    "logging_mongodb_api": "logging_mongodb_api",
+    "monitoring_mongodb_api": "monitoring_mongodb_api",
+    "prometheus_mongodb_api": "monitoring.prometheus_mongodb_api",
+    "student_api": "student_api",
+}
+SCENARIOS = ["predict", "predict_batch", "students", "replay"]
+SCENARIO_PATHS = {"predict": "/predict", "predict_batch": "/predict/batch", "students": "/students"}
+
+HEADERS = {"x-api-key": "mysecretkey"}
+SCRATCH_DB = "bench_student_service"
+
+
+# ----------------------
+# Payloads
+# ----------------------
+def load_records():
+    """Rows of data/raw/*.csv as typed student records (what POST /students stores)."""
+    from student_ingest import iter_csv_rows, validate_row
+    from student_schema import dataset_for_path
+
+    records = []
+    for path in CSV_FILES:
+        with open(path, newline="") as f:
+            for _, row, _ in iter_csv_rows(f):
+                row["dataset"] = dataset_for_path(path)
+                doc, error = validate_row(row)
+                if error is None:
+                    records.append(doc)
+    return records
+
+
+def load_replay(path):
+    requests = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                if "path" not in entry:
+                    entry = {"method": "POST", "path": "/predict", "body": entry}
+                requests.append({"method": entry.get("method", "POST"), "path": entry["path"],
+                                 "json": entry.get("body")})
+    return requests
+
+
+def build_requests(scenario, records, args):
+    """The requests of a scenario; the load test cycles through them."""
+    if scenario == "predict":
+        return [{"method": "POST", "path": "/predict", "json": record} for record in records]
+    if scenario == "predict_batch":
+        requests = []
+        for start in range(0, len(records), args.batch_size):
+            chunk = records[start:start + args.batch_size]
+            body = "".join(json.dumps(record) + "\n" for record in chunk)
+            requests.append({"method": "POST", "path": "/predict/batch", "body": body,
+                             "content_type": "application/x-ndjson"})
+        return requests
+    if scenario == "students":
+        return [{"method": "GET", "path": "/students", "params": {"limit": args.page_size}}]
+    return load_replay(args.replay)
+
+
+# ----------------------
+# Load generation
+# ----------------------
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, statuses, elapsed, concurrency):
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": 1000.0 * percentile(latencies, 50),
+            "p95": 1000.0 * percentile(latencies, 95),
+            "p99": 1000.0 * percentile(latencies, 99),
+            "max": 1000.0 * (latencies[-1] if latencies else 0.0),
+        },
+        "status_counts": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+    }
+
+
+def run_wsgi(app, requests, total, concurrency):
+    """`total` requests over `concurrency` threads, each with its own Flask test client."""
+    counter = itertools.count()
+
+    def worker():
+        client = app.test_client()
+        latencies, statuses = [], Counter()
+        while (i := next(counter)) < total:
+            request = requests[i % len(requests)]
+            start = time.perf_counter()
+            response = client.open(request["path"], method=request["method"], headers=HEADERS,
+                                   json=request.get("json"), data=request.get("body"),
+                                   query_string=request.get("params"), content_type=request.get("content_type"))
+            response.get_data()  # drain streamed bodies
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+        return latencies, statuses
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [future.result() for future in [pool.submit(worker) for _ in range(concurrency)]]
+    elapsed = time.perf_counter() - start
+
+    latencies, statuses = [], Counter()
+    for worker_latencies, worker_statuses in results:
+        latencies.extend(worker_latencies)
+        statuses.update(worker_statuses)
+    return summarize(latencies, statuses, elapsed, concurrency)
+
+
+async def run_asgi(app, requests, total, concurrency):
+    """`total` requests from `concurrency` tasks through httpx's ASGI transport."""
+    import httpx
+
+    counter = itertools.count()
+    latencies, statuses = [], Counter()
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=60.0) as client:
+        async def worker():
+            while (i := next(counter)) < total:
+                request = requests[i % len(requests)]
+                headers = {**HEADERS, **({"content-type": request["content_type"]} if "content_type" in request else {})}
+                start = time.perf_counter()
+                response = await client.request(request["method"], request["path"], headers=headers,
+                                                json=request.get("json"), content=request.get("body"),
+                                                params=request.get("params"))
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, statuses, elapsed, concurrency)
+
+
+# ----------------------
+# Child process: one app
+# ----------------------
+def seed_collection(app, args, records):
+    """Points the app at the scratch collection and fills it; returns it (None without Mongo)."""
+    ctx = getattr(app, "extensions", {}).get("student_service")
+    if ctx is None or ctx.mongo is None:
+        return None
+    if args.uri:
+        from mongo_connection import MongoConnectionManager
+
+        # Never the app's real database
+        ctx.mongo = MongoConnectionManager(args.uri, db_name=SCRATCH_DB, health_interval=0)
+    collection = ctx.mongo.collection
+    collection.drop()
+    documents = [dict(records[i % len(records)]) for i in range(args.students)]
+    collection.insert_many(documents)
+    return collection
+
+
+def run_worker(args):
+    sys.path.insert(0, PROJECT_DIR)
+    if not args.uri:
+        import mongomock
+
+        import mongo_connection
+
+        mongo_connection.MongoClient = mongomock.MongoClient
+
+    import importlib
+
+    module = importlib.import_module(TARGETS[args.target])
+    app = module.app
+    registry = getattr(module, "registry", None)
+    if registry is not None:
+        registry.wait_ready()
+
+    asgi = inspect.iscoroutinefunction(getattr(app, "__call__", None))
+    routes = {route.path for route in app.routes} if asgi else {rule.rule for rule in app.url_map.iter_rules()}
+    records = load_records()
+    collection = None if asgi else seed_collection(app, args, records)
+
+    results = {}
+    for scenario in args.scenarios:
+        if scenario == "replay" and not args.replay:
+            continue
+        if scenario in SCENARIO_PATHS and SCENARIO_PATHS[scenario] not in routes:
+            continue
+        if scenario == "students" and collection is None:
+            continue
+        requests = build_requests(scenario, records, args)
+        runs = []
+        for concurrency in args.concurrency:
+            if asgi:
+                asyncio.run(run_asgi(app, requests, args.warmup, min(concurrency, args.warmup or 1)))
+                run = asyncio.run(run_asgi(app, requests, args.requests, concurrency))
+            else:
+                run_wsgi(app, requests, args.warmup, min(concurrency, args.warmup or 1))
+                run = run_wsgi(app, requests, args.requests, concurrency)
+            if scenario == "predict_batch":
+                run["records_per_second"] = run["throughput_rps"] * args.batch_size
+            runs.append(run)
+        results[scenario] = runs
+
+    if collection is not None and args.uri:
+        collection.drop()
+    log_pipeline = getattr(module, "log_pipeline", None)
+    if log_pipeline is not None:
+        log_pipeline.stop()
+    print(json.dumps(results))
+
+
+# ----------------------
+# Parent: every app, report and comparison
+# ----------------------
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_target(target, args):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--target", target,
+               "--requests", str(args.requests), "--warmup", str(args.warmup),
+               "--batch-size", str(args.batch_size), "--page-size", str(args.page_size),
+               "--students", str(args.students), "--scenarios", *args.scenarios,
+               "--concurrency", *map(str, args.concurrency)]
+    if args.uri:
+        command += ["--uri", args.uri]
+    if args.replay:
+        command += ["--replay", os.path.abspath(args.replay)]
+    env = {**os.environ, "MODEL_DIR": PROJECT_DIR, "MODEL_POLL_INTERVAL": "0", "MODEL_LOAD_ASYNC": "0",
+           "MONGO_URI": args.uri or "mongodb://localhost:27017", "MONGO_HEALTH_INTERVAL": "0",
+           "LOG_PAYLOADS": "0",
+           # Prepended so an activated environment's own PYTHONPATH still applies
+           "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get("PYTHONPATH")]))}
+    if not args.cache:
+        env["PREDICTION_CACHE_SIZE"] = "0"
+
+    # Log files the apps write land in a scratch directory; relative data/ paths still resolve
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.symlink(os.path.join(PROJECT_DIR, "data"), os.path.join(work_dir, "data"))
+        output = subprocess.run(command, cwd=work_dir, env=env, capture_output=True, text=True)
+    if output.returncode != 0:
+        return {"error": output.stderr.strip()[-2000:]}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def print_results(results, baseline=None, threshold=0.1):
+    """Table of every run; with a baseline, the change in p50 / p99 / throughput and REGRESSION flags."""
+    print(f"{'target':<24}{'scenario':<15}{'conc':>5}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  status")
+    regressions = 0
+    for target, scenarios in results.items():
+        if "error" in scenarios:
+            print(f"{target:<24}failed: {scenarios['error'].splitlines()[-1]}")
+            continue
+        for scenario, runs in scenarios.items():
+            for run in runs:
+                latency = run["latency_ms"]
+                line = (f"{target:<24}{scenario:<15}{run['concurrency']:>5}{run['throughput_rps']:>10.1f}"
+                        f"{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}  {run['status_counts']}")
+                old = find_run(baseline, target, scenario, run["concurrency"]) if baseline else None
+                if old is not None:
+                    changes = {
+                        "p50": latency["p50"] / old["latency_ms"]["p50"] - 1 if old["latency_ms"]["p50"] else 0.0,
+                        "p99": latency["p99"] / old["latency_ms"]["p99"] - 1 if old["latency_ms"]["p99"] else 0.0,
+                        "rps": run["throughput_rps"] / old["throughput_rps"] - 1 if old["throughput_rps"] else 0.0,
+                    }
+                    line += "  " + " ".join(f"{key} {100 * value:+.1f}%" for key, value in changes.items())
+                    if changes["p50"] > threshold or changes["p99"] > threshold or changes["rps"] < -threshold:
+                        line += "  REGRESSION"
+                        regressions += 1
+                print(line)
+    return regressions
+
+
+def find_run(report, target, scenario, concurrency):
+    for run in report.get("results", {}).get(target, {}).get(scenario, []):
+        if run["concurrency"] == concurrency:
+            return run
+    return None
+
+
+def main(args):
+    results = {}
+    for target in args.targets:
+        print(f"running {target}...", file=sys.stderr)
+        results[target] = run_target(target, args)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "mongo": args.uri or "mongomock",
+        "settings": {key: getattr(args, key) for key in ("requests", "warmup", "concurrency", "batch_size",
+                                                         "page_size", "students", "cache", "replay")},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"compared with {args.compare} (commit {baseline.get('commit')})")
+    regressions = print_results(results, baseline, args.threshold)
+    print(f"results written to {args.output}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline throughput and latency benchmark of every API entry point")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=100, help="students per /predict/batch request")
+    parser.add_argument("--page-size", type=int, default=100, help="limit of the /students requests")
+    parser.add_argument("--students", type=int, default=5000, help="documents seeded for /students")
+    parser.add_argument("--replay", help="JSON Lines file of recorded requests")
+    parser.add_argument("--uri", help="local MongoDB instead of mongomock (uses a scratch database)")
+    parser.add_argument("--cache", action="store_true", help="keep the prediction cache on")
+    parser.add_argument("--output", default="bench_api_results.json")
+    parser.add_argument("--compare", help="earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on a regression")
+    parser.add_argument("--target", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args)
+    else:
+        sys.exit(main(args))
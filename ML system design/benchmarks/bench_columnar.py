@@ -0,0 +1,110 @@
+"""
+Load time and memory of the student data as CSV vs the columnar format.
+
+Builds a CSV of --rows rows (the raw student_mat + student_por rows repeated)
+and its columnar_dataset copy in a temp directory, then loads each in a fresh
+process and reports wall time, resident memory added by the load, and peak RSS:
+
+    csv             pd.read_csv (object strings for the categoricals)
+    csv+category    pd.read_csv with category dtypes (the best text can do)
+    columnar-mmap   load_columnar and read every column once (pages in the files)
+    columnar-pandas load_columnar(...).to_pandas() (categorical DataFrame)
+
+    python benchmarks/bench_columnar.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+CSV_FILES = [os.path.join(PROJECT_DIR, "data", "raw", name) for name in ("student_mat.csv", "student_por.csv")]
+
+MODES = ["csv", "csv+category", "columnar-mmap", "columnar-pandas"]
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def build(directory, rows):
+    """Writes the CSV and its columnar copy; runs in a child so this process stays small."""
+    import pandas as pd
+
+    sys.path.insert(0, PROJECT_DIR)
+    from columnar_dataset import convert_csv
+
+    raw = pd.concat([pd.read_csv(path).assign(dataset=name) for path, name in zip(CSV_FILES, ("math", "portuguese"))],
+                    ignore_index=True)
+    df = raw.iloc[[i % len(raw) for i in range(rows)]]
+    csv_path = os.path.join(directory, "students.csv")
+    df.to_csv(csv_path, index=False)
+    columnar_path = os.path.join(directory, "students")
+    convert_csv([csv_path], columnar_path)
+    columnar_bytes = sum(os.path.getsize(os.path.join(columnar_path, name)) for name in os.listdir(columnar_path))
+    print(json.dumps([csv_path, columnar_path, os.path.getsize(csv_path), columnar_bytes]))
+
+
+def run_worker(args):
+    """Runs inside the child process: loads the data one way and reports time and memory."""
+    sys.path.insert(0, PROJECT_DIR)
+    import numpy as np
+    import pandas as pd
+    from columnar_dataset import load_columnar
+    from student_schema import CATEGORICAL_COLUMNS
+
+    before = rss_bytes()
+    start = time.perf_counter()
+    if args.mode == "csv":
+        data = pd.read_csv(args.csv)
+    elif args.mode == "csv+category":
+        data = pd.read_csv(args.csv, dtype={col: "category" for col in CATEGORICAL_COLUMNS})
+    elif args.mode == "columnar-mmap":
+        data = load_columnar(args.columnar)
+        touched = sum(int(np.asarray(data.array(col), dtype=np.int64).sum()) for col in data.columns)
+    else:
+        data = load_columnar(args.columnar).to_pandas()
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": seconds,
+        "rss_mb": (rss_bytes() - before) / 1e6,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3,
+    }))
+
+
+def run_child(*arguments):
+    # Peak RSS is inherited across fork/exec, so the heavy work never runs in this process
+    command = [sys.executable, os.path.abspath(__file__), *map(str, arguments)]
+    output = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path, columnar_path, csv_bytes, columnar_bytes = run_child("--build", directory, "--rows", args.rows)
+        print(f"{args.rows:,} rows: CSV {csv_bytes / 1e6:.1f} MB, columnar {columnar_bytes / 1e6:.1f} MB")
+        print(f"{'mode':<17}{'load s':>9}{'RSS +MB':>10}{'peak MB':>10}")
+        for mode in MODES:
+            r = run_child("--worker", "--mode", mode, "--csv", csv_path, "--columnar", columnar_path)
+            print(f"{mode:<17}{r['seconds']:>9.3f}{r['rss_mb']:>10.1f}{r['peak_rss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs columnar loading")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    parser.add_argument("--columnar", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--build", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.build:
+        build(args.build, args.rows)
+    else:
+        run_worker(args) if args.worker else main(args)
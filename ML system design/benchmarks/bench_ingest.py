@@ -0,0 +1,91 @@
+"""
+Ingestion throughput: one insert_one per row (what POST /students does)
+versus unordered insert_many batches of several sizes.
+
+Rows come from data/raw/student_mat.csv + student_por.csv, repeated
+`--repeat` times. Each run writes to a scratch collection that is dropped
+before and after it.
+
+Against a local MongoDB (the numbers worth quoting):
+    python benchmarks/bench_ingest.py --uri mongodb://localhost:27017 --repeat 20
+
+Without a server (measures validation and client overhead only):
+    python benchmarks/bench_ingest.py --mongomock
+"""
+import argparse
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+sys.path.insert(0, PROJECT_DIR)
+
+from student_ingest import ingest, iter_csv_rows, validate_row  # noqa: E402
+from student_schema import dataset_for_path  # noqa: E402
+
+CSV_FILES = [os.path.join(PROJECT_DIR, "data", "raw", name) for name in ("student_mat.csv", "student_por.csv")]
+
+
+def load_rows(repeat):
+    rows = []
+    for path in CSV_FILES:
+        with open(path, newline="") as f:
+            for _, row, _ in iter_csv_rows(f):
+                row["dataset"] = dataset_for_path(path)
+                rows.append(row)
+    rows = rows * repeat
+    return [(i + 2, dict(row), None) for i, row in enumerate(rows)]
+
+
+def bench_insert_one(collection, rows):
+    start = time.perf_counter()
+    for _, row, _ in rows:
+        doc, error = validate_row(row)
+        if error is None:
+            collection.insert_one(doc)
+    return len(rows), time.perf_counter() - start
+
+
+def bench_insert_many(collection, rows, batch_size):
+    summary = ingest(collection, [(line, dict(row), None) for line, row, _ in rows], batch_size)
+    return summary["inserted"], summary["seconds"]
+
+
+def main(args):
+    if args.mongomock:
+        import mongomock
+        client = mongomock.MongoClient()
+    else:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri, serverSelectionTimeoutMS=3000)
+        client.admin.command("ping")
+    collection = client[args.db]["ingest_bench"]
+
+    rows = load_rows(args.repeat)
+    print(f"{len(rows)} rows, target {'mongomock' if args.mongomock else args.uri}")
+    print(f"{'method':<24}{'rows':>8}{'seconds':>10}{'rows/s':>12}")
+
+    runs = [("insert_one", lambda: bench_insert_one(collection, rows[:args.single_rows]))]
+    runs += [(f"insert_many({size})", lambda size=size: bench_insert_many(collection, rows, size))
+             for size in args.batch_sizes]
+
+    results = {}
+    for name, run in runs:
+        collection.drop()
+        inserted, seconds = run()
+        results[name] = inserted / seconds if seconds else 0.0
+        print(f"{name:<24}{inserted:>8}{seconds:>10.3f}{results[name]:>12.0f}")
+    collection.drop()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk student ingestion")
+    parser.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="ingest_benchmark")
+    parser.add_argument("--mongomock", action="store_true", help="Use an in-memory mongomock client")
+    parser.add_argument("--repeat", type=int, default=10, help="Times the two CSVs are repeated")
+    parser.add_argument("--single-rows", type=int, default=2000, help="Rows timed for the insert_one baseline")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    main(parser.parse_args())
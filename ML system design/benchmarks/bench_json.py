@@ -0,0 +1,109 @@
+"""
+JSON encoding/decoding of the API payload shapes: Flask's default provider
+and the stdlib json module (old paths) vs fast_json.
+
+    students-page     GET /students page: documents with ObjectId _id, jsonify
+                      (old: str() on every _id first)
+    students-stream   GET /students?format=ndjson: one dumps per document
+    predict-request   POST /predict body: list of 34-field records, parsed
+    predict-response  POST /predict response: [{"prediction", "model_version"}]
+    batch-ndjson      POST /predict/batch: parse each line, dump each result
+
+    python benchmarks/bench_json.py --rows 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+sys.path.insert(0, PROJECT_DIR)
+
+import numpy as np
+import pandas as pd
+from bson.objectid import ObjectId
+from flask import Flask
+
+import fast_json
+
+CSV_FILES = [os.path.join(PROJECT_DIR, "data", "raw", name) for name in ("student_mat.csv", "student_por.csv")]
+
+
+def make_documents(n):
+    raw = pd.concat([pd.read_csv(path).assign(dataset=name) for path, name in zip(CSV_FILES, ("math", "portuguese"))],
+                    ignore_index=True)
+    rows = raw.to_dict("records")
+    return [{"_id": ObjectId(), **rows[i % len(rows)]} for i in range(n)]
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def cases(n):
+    """name -> (old, new) callables."""
+    old_app, new_app = Flask("old"), fast_json.use_fast_json(Flask("new"))
+    documents = make_documents(n)
+    records = [{key: value for key, value in doc.items() if key != "_id"} for doc in documents]
+    body = json.dumps(records).encode()
+    predictions = [{"prediction": int(p), "model_version": "6f658788dbd5"} for p in np.arange(n) % 2]
+    lines = [json.dumps(record).encode() for record in records]
+
+    def old_page():
+        with old_app.app_context():
+            page = [dict(doc, _id=str(doc["_id"])) for doc in documents]
+            return old_app.json.response(page).get_data()
+
+    def new_page():
+        with new_app.app_context():
+            return new_app.json.response(documents).get_data()
+
+    def old_stream():
+        return [json.dumps(dict(doc, _id=str(doc["_id"])), default=str) + "\n" for doc in documents]
+
+    def new_stream():
+        return [fast_json.dumps(doc) + b"\n" for doc in documents]
+
+    def old_response():
+        with old_app.app_context():
+            return old_app.json.response(predictions).get_data()
+
+    def new_response():
+        with new_app.app_context():
+            return new_app.json.response(predictions).get_data()
+
+    def old_batch():
+        return [json.dumps({"line": i, **json.loads(line)}) + "\n" for i, line in enumerate(lines)]
+
+    def new_batch():
+        return [fast_json.dumps({"line": i, **fast_json.loads(line)}) + b"\n" for i, line in enumerate(lines)]
+
+    return {
+        "students-page": (old_page, new_page),
+        "students-stream": (old_stream, new_stream),
+        "predict-request": (lambda: json.loads(body), lambda: fast_json.loads(body)),
+        "predict-response": (old_response, new_response),
+        "batch-ndjson": (old_batch, new_batch),
+    }
+
+
+def main(args):
+    print(f"fast_json backend: {fast_json.BACKEND}, {args.rows:,} rows per payload")
+    print(f"{'shape':<18}{'old ms':>10}{'fast ms':>10}{'speedup':>9}")
+    for name, (old, new) in cases(args.rows).items():
+        old_seconds, new_seconds = best_of(old, args.repeat), best_of(new, args.repeat)
+        print(f"{name:<18}{old_seconds * 1e3:>10.1f}{new_seconds * 1e3:>10.1f}{old_seconds / new_seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding of API payloads")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,128 @@
+"""
+Load test for the /predict endpoint.
+
+Fires `--requests` POSTs at `--concurrency` in flight and reports throughput
+and p50/p95/p99 latency. Payloads are rows of data/raw/student_mat.csv.
+
+Against a running server:
+    python benchmarks/bench_load.py --url http://127.0.0.1:8000/predict --concurrency 64
+
+In-process, without binding a port (ASGI apps only):
+    python benchmarks/bench_load.py --app student_api:app --concurrency 64
+"""
+import argparse
+import asyncio
+import csv
+import importlib
+import os
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+DEFAULT_CSV = os.path.join(PROJECT_DIR, "data", "raw", "student_mat.csv")
+
+NUMERIC_COLUMNS = ["age", "Medu", "Fedu", "traveltime", "studytime", "failures", "famrel", "freetime",
+                   "goout", "Dalc", "Walc", "health", "absences", "G1", "G2", "G3"]
+
+
+def load_payloads(path, dataset="math"):
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for col in NUMERIC_COLUMNS:
+            row[col] = int(row[col])
+        row.setdefault("dataset", dataset)
+    return rows
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(client, url, payloads, total, concurrency):
+    latencies = []
+    statuses = Counter()
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < total:
+            i = next_index
+            next_index += 1
+            payload = payloads[i % len(payloads)]
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=payload)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": 1000.0 * percentile(latencies, 50),
+            "p95": 1000.0 * percentile(latencies, 95),
+            "p99": 1000.0 * percentile(latencies, 99),
+            "max": 1000.0 * (latencies[-1] if latencies else 0.0),
+        },
+        "status_counts": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+    }
+
+
+def load_app(spec):
+    sys.path.insert(0, PROJECT_DIR)
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "app")
+
+
+async def main(args):
+    payloads = load_payloads(args.csv)
+    if args.app:
+        transport = httpx.ASGITransport(app=load_app(args.app))
+        client = httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=args.timeout)
+        url = "/predict"
+    else:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = httpx.AsyncClient(limits=limits, timeout=args.timeout)
+        url = args.url
+
+    async with client:
+        if args.warmup:
+            await run_load(client, url, payloads, args.warmup, min(args.concurrency, args.warmup))
+        results = await run_load(client, url, payloads, args.requests, args.concurrency)
+
+    latency = results["latency_ms"]
+    print(f"{results['requests']} requests @ concurrency {results['concurrency']} in {results['elapsed_s']:.2f}s")
+    print(f"throughput: {results['throughput_rps']:.1f} req/s")
+    print(f"latency ms: p50={latency['p50']:.2f} p95={latency['p95']:.2f} "
+          f"p99={latency['p99']:.2f} max={latency['max']:.2f}")
+    print(f"status: {results['status_counts']}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the /predict endpoint")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/predict")
+    parser.add_argument("--app", help="module:attr of an ASGI app to test in-process instead of --url")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="CSV of student rows used as payloads")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(main(parser.parse_args()))
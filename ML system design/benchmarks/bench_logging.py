@@ -0,0 +1,112 @@
+"""
+Request latency of logging_mongodb_api's /predict under different logging setups.
+
+Each setup runs in its own process (logging is configured at import time),
+with the prediction cache disabled and logs written to a temp directory:
+
+    legacy          synchronous text lines, headers + records + predictions logged (old behaviour)
+    async+payloads  queue handler + JSON lines, payload logging still on (LOG_PAYLOADS=1)
+    async           queue handler + JSON lines, payloads off (the default)
+    async+sampled   as async, keeping 10% of the per-request info lines
+
+    python benchmarks/bench_logging.py --requests 2000 --batch-sizes 1 100
+
+No MongoDB is needed: /predict never touches the database.
+"""
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+DEFAULT_CSV = os.path.join(PROJECT_DIR, "data", "raw", "student_mat.csv")
+
+MODES = {
+    "legacy": {"LOG_ASYNC": "0", "LOG_FORMAT": "text", "LOG_PAYLOADS": "1"},
+    "async+payloads": {"LOG_PAYLOADS": "1"},
+    "async": {},
+    "async+sampled": {"LOG_SAMPLE_RATE": "0.1"},
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def load_records(path, n):
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for key, value in row.items():
+            if value.isdigit():
+                row[key] = int(value)
+        row["dataset"] = "math"
+    return [rows[i % len(rows)] for i in range(n)]
+
+
+def run_worker(args):
+    """Runs inside the child process: imports the app and times /predict."""
+    sys.path.insert(0, PROJECT_DIR)
+    import logging_mongodb_api
+
+    client = logging_mongodb_api.app.test_client()
+    headers = {"x-api-key": "mysecretkey"}
+    results = {}
+    for batch_size in args.batch_sizes:
+        payload = load_records(args.csv, batch_size)
+        for _ in range(args.warmup):
+            client.post("/predict", json=payload, headers=headers)
+
+        latencies = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            response = client.post("/predict", json=payload, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.data
+        latencies.sort()
+        results[batch_size] = {
+            "p50_ms": 1000.0 * percentile(latencies, 50),
+            "p95_ms": 1000.0 * percentile(latencies, 95),
+            "p99_ms": 1000.0 * percentile(latencies, 99),
+            "rps": len(latencies) / sum(latencies),
+        }
+
+    logging_mongodb_api.log_pipeline.stop()
+    log_bytes = sum(os.path.getsize(name) for name in os.listdir(".") if name.startswith("app.log"))
+    print(json.dumps({"results": results, "log_bytes": log_bytes}))
+
+
+def main(args):
+    print(f"{'mode':<16}{'batch':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'log MB':>9}")
+    for mode, env in MODES.items():
+        with tempfile.TemporaryDirectory() as log_dir:
+            child_env = {**os.environ, **env, "MODEL_DIR": PROJECT_DIR, "PREDICTION_CACHE_SIZE": "0",
+                         "MONGO_URI": "mongodb://localhost:27017", "MONGO_HEALTH_INTERVAL": "0"}
+            command = [sys.executable, os.path.abspath(__file__), "--worker", "--requests", str(args.requests),
+                       "--warmup", str(args.warmup), "--csv", args.csv,
+                       "--batch-sizes", *map(str, args.batch_sizes)]
+            output = subprocess.run(command, cwd=log_dir, env=child_env, capture_output=True, text=True, check=True)
+            report = json.loads(output.stdout.strip().splitlines()[-1])
+
+        for batch_size, r in report["results"].items():
+            print(f"{mode:<16}{batch_size:>6}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}"
+                  f"{r['rps']:>9.0f}{report['log_bytes'] / 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /predict latency per logging setup")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    run_worker(args) if args.worker else main(args)
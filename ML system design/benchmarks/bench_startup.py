@@ -0,0 +1,120 @@
+"""
+Cold-start time of the serving entry points, and where it goes.
+
+Each target runs in a fresh interpreter with `python -X importtime`:
+
+    created   app object built: the port could be bound from here
+    ready     /ready answers 200 (model loaded and warmed up)
+    process   whole child process, interpreter start-up included
+
+plus the import time per top-level package (self time summed over its
+modules), heaviest first. The file cache is warm after the first run, so
+the median of --repeat runs is reported.
+
+    student_service        create_app() with the model loaded in the constructor
+    student_service:async  the same with MODEL_LOAD_ASYNC=1 (loaded on a thread)
+    app                    the app.py wrapper
+    student_api            the FastAPI app
+    studentpass:home       StudentPass/app.py rendering its Home page (bare Streamlit)
+
+    python benchmarks/bench_startup.py --repeat 5 --top 8
+
+No MongoDB is needed: the Flask targets run with the /students routes off.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+STUDENTPASS_DIR = os.path.join(os.path.dirname(PROJECT_DIR), "StudentPass")
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+{setup}
+created = time.perf_counter()
+{wait}
+ready = time.perf_counter()
+print(json.dumps({{"created_s": created - start, "ready_s": ready - start}}))
+"""
+
+WAIT_FLASK = """
+client = app.test_client()
+while client.get("/ready").status_code != 200:
+    time.sleep(0.005)
+"""
+
+TARGETS = {
+    "student_service": (PROJECT_DIR, {}, "from student_service import create_app\napp = create_app()", WAIT_FLASK),
+    "student_service:async": (PROJECT_DIR, {"MODEL_LOAD_ASYNC": "1"},
+                              "from student_service import create_app\napp = create_app()", WAIT_FLASK),
+    "app": (PROJECT_DIR, {}, "import app as module\napp = module.app", WAIT_FLASK),
+    "student_api": (PROJECT_DIR, {}, "import student_api", "student_api.registry.wait_ready()"),
+    "studentpass:home": (STUDENTPASS_DIR, {}, "import runpy\nrunpy.run_path('app.py')", "pass"),
+}
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(stderr):
+    """Seconds of import self time per top-level package."""
+    packages = defaultdict(float)
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            packages[match.group(4).split(".")[0]] += int(match.group(1)) / 1e6
+    return packages
+
+
+def run_target(name, repeat):
+    cwd, env, setup, wait = TARGETS[name]
+    child_env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get("PYTHONPATH")])),
+                 "SERVICE_MONGO": "0", "MODEL_POLL_INTERVAL": "0",
+                 "MONGO_URI": "mongodb://localhost:27017", "MONGO_HEALTH_INTERVAL": "0", **env}
+    command = [sys.executable, "-X", "importtime", "-c", CHILD.format(setup=setup, wait=wait)]
+
+    runs, packages = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(command, cwd=cwd, env=child_env, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if output.returncode != 0:
+            raise RuntimeError(f"{name} failed:\n{output.stderr[-2000:]}")
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        packages = import_times(output.stderr)
+        runs.append({**result, "process_s": elapsed, "imports_s": sum(packages.values())})
+
+    summary = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    return summary, packages
+
+
+def main(args):
+    print(f"{'target':<24}{'created s':>10}{'ready s':>10}{'process s':>11}{'imports s':>11}")
+    breakdowns = {}
+    for name in args.targets:
+        summary, packages = run_target(name, args.repeat)
+        breakdowns[name] = packages
+        print(f"{name:<24}{summary['created_s']:>10.3f}{summary['ready_s']:>10.3f}"
+              f"{summary['process_s']:>11.3f}{summary['imports_s']:>11.3f}")
+
+    for name, packages in breakdowns.items():
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        print(f"\n{name}: import time per package (last run)")
+        for package, seconds in heaviest:
+            print(f"  {package:<28}{1000 * seconds:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark start-up and import time of the serving apps")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    main(args)
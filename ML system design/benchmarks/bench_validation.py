@@ -0,0 +1,102 @@
+"""
+Validation and default-filling of /predict batches: per-record loops vs the compiled schema.
+
+Records are the raw student_mat + student_por rows (as JSON would decode
+them) with a few fields dropped per record, so the defaults are exercised:
+
+    fill-loop       the old /predict loop: every record x every REQUIRED_COLUMNS
+    defaults-merge  {**DEFAULTS, **record} per record (fills, checks nothing)
+    pydantic        StudentData(**record) per record (checks types, not values)
+    compiled        STUDENT_SCHEMA.validate + records(): types, ranges and
+                    allowed values checked, defaults filled, model-ready dicts
+    compiled-cols   STUDENT_SCHEMA.validate + model_columns(), what /predict/batch
+                    hands to predict_columns (no per-record dicts)
+
+    python benchmarks/bench_validation.py --sizes 1000 10000 100000
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(HERE)
+sys.path.insert(0, PROJECT_DIR)
+
+import pandas as pd
+
+from student_schema import DEFAULTS, REQUIRED_COLUMNS, STUDENT_SCHEMA, StudentData
+
+CSV_FILES = [os.path.join(PROJECT_DIR, "data", "raw", name) for name in ("student_mat.csv", "student_por.csv")]
+
+
+def make_records(n):
+    raw = pd.concat([pd.read_csv(path).assign(dataset=name) for path, name in zip(CSV_FILES, ("math", "portuguese"))],
+                    ignore_index=True)
+    rows = raw.to_dict("records")
+    records = []
+    for i in range(n):
+        record = dict(rows[i % len(rows)])
+        # Drop one field in three records so the defaults are used
+        if i % 3 == 0:
+            del record[REQUIRED_COLUMNS[i % len(REQUIRED_COLUMNS)]]
+        records.append(record)
+    return records
+
+
+def fill_loop(records):
+    for record in records:
+        for col in REQUIRED_COLUMNS:
+            if col not in record:
+                record[col] = DEFAULTS[col]
+    return records
+
+
+def defaults_merge(records):
+    return [{**DEFAULTS, **record} for record in records]
+
+
+def pydantic_models(records):
+    return [StudentData(**{**DEFAULTS, **record}).model_dump() for record in records]
+
+
+def compiled(records):
+    result = STUDENT_SCHEMA.validate(records)
+    assert result.ok, result.errors[:3]
+    return result.records()
+
+
+def compiled_columns(records):
+    result = STUDENT_SCHEMA.validate(records)
+    assert result.ok, result.errors[:3]
+    return result.model_columns()
+
+
+METHODS = {"fill-loop": fill_loop, "defaults-merge": defaults_merge, "pydantic": pydantic_models,
+           "compiled": compiled, "compiled-cols": compiled_columns}
+
+
+def best_of(fn, records, repeat):
+    times = []
+    for _ in range(repeat):
+        batch = copy.deepcopy(records) if fn is fill_loop else records  # the loop mutates its input
+        start = time.perf_counter()
+        fn(batch)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args):
+    print(f"{'records':>9}" + "".join(f"{name:>16}" for name in METHODS))
+    for n in args.sizes:
+        records = make_records(n)
+        results = {name: best_of(fn, records, args.repeat) for name, fn in METHODS.items()}
+        print(f"{n:>9}" + "".join(f"{results[name] * 1e3:>14.1f}ms" for name in METHODS))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batch validation of /predict records")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
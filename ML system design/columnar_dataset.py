@@ -0,0 +1,194 @@
+"""
+Compact columnar copy of the raw student CSVs, loaded with memory mapping.
+
+    python columnar_dataset.py data/raw/student_mat.csv data/raw/student_por.csv -o data/processed/students
+
+writes a directory with one .npy file per column plus meta.json. Categorical
+columns are stored as int8 codes into the category list kept in meta.json
+(-1 = missing), numeric columns in the smallest integer dtype that holds
+them (float64 if they have fractions or gaps). Loading maps the files
+instead of parsing text, so opening the data costs almost nothing and only
+the columns that are touched are paged in:
+
+    data = load_columnar("data/processed/students")
+    df = data.to_pandas()                      # categorical dtype, no strings parsed
+    for chunk in data.iter_chunks(50000): ...  # for batch scoring / statistics
+
+The `dataset` column is added from the file name (student_mat / student_por)
+when a CSV does not have one.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from student_schema import CATEGORICAL_COLUMNS, dataset_for_path
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+
+def is_columnar(path):
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def _smallest_dtype(values):
+    """Smallest signed integer dtype holding `values`, or float64 when they are not all integers."""
+    if len(values) == 0:
+        return np.dtype(np.int8)
+    if np.isnan(values).any() or not np.array_equal(values, np.floor(values)):
+        return np.dtype(np.float64)
+    lo, hi = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+# ----------------------
+# Writing
+# ----------------------
+def write_columnar(df, path, categorical_columns=None, sources=None):
+    """
+    Writes a DataFrame as a columnar dataset directory and returns its meta dict.
+
+    Parameters:
+    df (DataFrame): Rows to write
+    path (str): Output directory (created; existing column files are replaced)
+    categorical_columns (list): Columns stored as codes (default: non-numeric columns)
+    sources (list): Input files, recorded in meta.json
+    """
+    if categorical_columns is None:
+        categorical_columns = [col for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])]
+    os.makedirs(path, exist_ok=True)
+
+    columns = []
+    for col in df.columns:
+        if col in categorical_columns:
+            categorical = pd.Categorical(df[col].astype(str).where(df[col].notna()))
+            categories = [str(c) for c in categorical.categories]
+            dtype = np.int8 if len(categories) < 128 else np.int16 if len(categories) < 32768 else np.int32
+            values = categorical.codes.astype(dtype)
+            columns.append({"name": col, "kind": "categorical", "dtype": np.dtype(dtype).name, "categories": categories})
+        else:
+            numeric = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+            dtype = _smallest_dtype(numeric)
+            values = numeric.astype(dtype)
+            columns.append({"name": col, "kind": "numeric", "dtype": dtype.name})
+        np.save(os.path.join(path, f"{col}.npy"), values)
+
+    meta = {"format_version": FORMAT_VERSION, "rows": len(df), "columns": columns, "sources": sources or []}
+    # meta.json last: a directory without it is an incomplete write
+    tmp = os.path.join(path, META_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, os.path.join(path, META_FILE))
+    return meta
+
+
+def convert_csv(paths, path, dataset=None):
+    """
+    Converts raw student CSVs into one columnar dataset; returns its meta dict.
+
+    Parameters:
+    paths (list): CSV files, concatenated in order
+    path (str): Output directory
+    dataset (str): Value for a missing `dataset` column (default: from each file name)
+    """
+    frames = []
+    for csv_path in paths:
+        header = pd.read_csv(csv_path, nrows=0).columns
+        # Categorical codes stay strings (e.g. a column of "1"/"2" values)
+        df = pd.read_csv(csv_path, dtype={col: str for col in CATEGORICAL_COLUMNS if col in header})
+        if "dataset" not in df.columns:
+            value = dataset or dataset_for_path(csv_path)
+            if value:
+                df["dataset"] = value
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    categorical = [col for col in df.columns
+                   if col in CATEGORICAL_COLUMNS or not pd.api.types.is_numeric_dtype(df[col])]
+    return write_columnar(df, path, categorical, sources=[os.path.abspath(p) for p in paths])
+
+
+# ----------------------
+# Reading
+# ----------------------
+class ColumnarDataset:
+    """
+    A columnar dataset directory. Column arrays are memory-mapped read-only
+    (`mmap=False` reads them into memory) and opened on first use.
+    """
+
+    def __init__(self, path, mmap=True):
+        self.path = path
+        self.mmap = mmap
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported columnar format {self.meta.get('format_version')!r}")
+        self.rows = self.meta["rows"]
+        self.columns = [c["name"] for c in self.meta["columns"]]
+        self._info = {c["name"]: c for c in self.meta["columns"]}
+        self._arrays = {}
+        self._categories = {}
+
+    def __len__(self):
+        return self.rows
+
+    def is_categorical(self, col):
+        return self._info[col]["kind"] == "categorical"
+
+    def categories(self, col):
+        """Category values of a categorical column, as a pandas Index (codes index into it)."""
+        if col not in self._categories:
+            self._categories[col] = pd.Index(self._info[col]["categories"], dtype=object)
+        return self._categories[col]
+
+    def array(self, col):
+        """Stored array of a column: codes for categorical columns, values otherwise."""
+        if col not in self._info:
+            raise KeyError(col)
+        if col not in self._arrays:
+            self._arrays[col] = np.load(os.path.join(self.path, f"{col}.npy"), mmap_mode="r" if self.mmap else None)
+        return self._arrays[col]
+
+    def column(self, col, start=0, stop=None):
+        """Rows [start, stop) of a column: a pandas Categorical or a NumPy array."""
+        values = self.array(col)[start:stop]
+        if self.is_categorical(col):
+            return pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(self.categories(col)))
+        return values
+
+    def to_pandas(self, columns=None, start=0, stop=None):
+        """DataFrame of rows [start, stop); categorical columns get the category dtype."""
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({col: self.column(col, start, stop) for col in columns})
+
+    def iter_chunks(self, chunk_size, columns=None, start=0):
+        """DataFrames of up to chunk_size rows, starting at row `start`."""
+        for chunk_start in range(start, self.rows, chunk_size):
+            yield self.to_pandas(columns, chunk_start, min(chunk_start + chunk_size, self.rows))
+
+
+def load_columnar(path, mmap=True):
+    return ColumnarDataset(path, mmap)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert raw student CSVs to the columnar format")
+    parser.add_argument("inputs", nargs="+", help="CSV files, concatenated in order")
+    parser.add_argument("-o", "--output", required=True, help="Output directory")
+    parser.add_argument("--dataset", choices=["math", "portuguese"], help="Value for a missing dataset column")
+    args = parser.parse_args(argv)
+
+    meta = convert_csv(args.inputs, args.output, args.dataset)
+    size = sum(os.path.getsize(os.path.join(args.output, name)) for name in os.listdir(args.output))
+    print(f"Wrote {meta['rows']} rows x {len(meta['columns'])} columns to {args.output} ({size / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# explainer.py
+import csv
+import os
+import random
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from student_schema import NUMERIC_COLUMNS, REQUIRED_COLUMNS
+
+DEFAULT_BACKGROUND_PATH = "data/raw/student_mat.csv"
+DEFAULT_BACKGROUND_ROWS = 100
+EXPLAIN_CHUNK_SIZE = 5000
+
+
+def load_background(path, rows=DEFAULT_BACKGROUND_ROWS, seed=0, dataset="math"):
+    """
+    A fixed random sample of `rows` records from a raw student CSV, typed like
+    API input. The same file and seed always give the same background.
+    """
+    with open(path, newline="") as f:
+        records = list(csv.DictReader(f))
+    if not records:
+        raise ValueError(f"{path} has no rows to use as explanation background")
+    if rows and rows < len(records):
+        records = random.Random(seed).sample(records, rows)
+    for record in records:
+        for col in NUMERIC_COLUMNS:
+            if col in record:
+                record[col] = int(record[col])
+        record.setdefault("dataset", dataset)
+    return records
+
+
+class LinearExplainer:
+    """
+    Exact SHAP values of a CompiledPipeline, in log-odds of the positive class.
+
+    For a linear model with independent features the attribution of encoded
+    feature j is coef_j * (x_j - E[x_j]), the expectation taken over the
+    background sample; this is what shap.LinearExplainer computes, without
+    the dependency. One-hot blocks are summed back into their source column.
+    """
+
+    kind = "linear"
+
+    def __init__(self, predictor, background):
+        self.predictor = predictor
+        self.columns = predictor.numeric_columns + predictor.categorical_columns
+
+        # Coefficients in encode() order: numeric rows, then one row per category
+        coef = [predictor.numeric_coef[:, 0]]
+        for weights in predictor.category_weights:
+            coef.append(np.array([w[0] for w in weights.values()], dtype=np.float64))
+        self.coef = np.concatenate(coef)
+
+        self.expected_x = predictor.encode(background).mean(axis=0)
+        self.expected_value = float(self.expected_x @ self.coef + predictor.intercept[0])
+
+        # (n_features, n_columns) 0/1 matrix folding one-hot blocks back into their column
+        group = np.repeat(
+            np.arange(len(self.columns)),
+            [1] * len(predictor.numeric_columns) + [len(w) for w in predictor.category_weights],
+        )
+        self._fold = np.zeros((len(group), len(self.columns)), dtype=np.float64)
+        self._fold[np.arange(len(group)), group] = 1.0
+
+    def shap_values(self, records):
+        """Array (n_records, n_columns) of attributions, columns in `self.columns` order."""
+        return ((self.predictor.encode(records) - self.expected_x) * self.coef) @ self._fold
+
+
+class PermutationExplainer:
+    """
+    Model-agnostic fallback for pipelines that do not compile: shap's
+    permutation explainer over the raw columns, with the background as masker.
+    Categorical values are passed to shap as integer codes (its maskers only
+    take numbers). Much slower than LinearExplainer; needs the optional `shap` package.
+    """
+
+    kind = "permutation"
+
+    def __init__(self, pipeline, background):
+        import pandas as pd
+        import shap
+
+        self.columns = list(REQUIRED_COLUMNS)
+        self._numeric = [col in NUMERIC_COLUMNS for col in self.columns]
+        self._levels = {col: {} for col, numeric in zip(self.columns, self._numeric) if not numeric}
+
+        def positive_score(X):
+            df = pd.DataFrame(X, columns=self.columns)
+            for col, levels in self._levels.items():
+                values = list(levels)
+                df[col] = [values[int(code)] for code in df[col]]
+            return pipeline.predict_proba(df)[:, 1]
+
+        background_X = self._codes(background)
+        self._explainer = shap.PermutationExplainer(positive_score, shap.maskers.Independent(background_X))
+        self.expected_value = float(positive_score(background_X).mean())
+
+    def _codes(self, records):
+        X = np.empty((len(records), len(self.columns)), dtype=np.float64)
+        for j, (col, numeric) in enumerate(zip(self.columns, self._numeric)):
+            if numeric:
+                X[:, j] = [record[col] for record in records]
+            else:
+                levels = self._levels[col]
+                X[:, j] = [levels.setdefault(record[col], len(levels)) for record in records]
+        return X
+
+    def shap_values(self, records):
+        return np.asarray(self._explainer(self._codes(records), silent=True).values, dtype=np.float64)
+
+
+def build_explainer(pipeline, predictor, background):
+    """LinearExplainer for a binary CompiledPipeline, PermutationExplainer otherwise."""
+    if hasattr(predictor, "category_weights") and predictor.intercept.shape[0] == 1:
+        return LinearExplainer(predictor, background)
+    return PermutationExplainer(pipeline, background)
+
+
+class ExplanationEngine:
+    """
+    Builds one explainer per model version on a fixed background sample and
+    keeps the most recent `max_versions` of them, so explaining a request is
+    only the attribution math.
+
+    Parameters:
+    background_path (str): Raw student CSV the background sample is drawn from
+    background_rows (int): Size of the background sample
+    seed (int): Sampling seed, fixed so attributions are reproducible
+    max_versions (int): Explainers kept (current + rollback standby by default)
+    """
+
+    def __init__(self, background_path=DEFAULT_BACKGROUND_PATH, background_rows=DEFAULT_BACKGROUND_ROWS,
+                 seed=0, max_versions=2):
+        self.background = load_background(background_path, background_rows, seed)
+        self.max_versions = max_versions
+        self._explainers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def explainer(self, version, pipeline, predictor):
+        with self._lock:
+            explainer = self._explainers.get(version)
+            if explainer is not None:
+                self._explainers.move_to_end(version)
+                return explainer
+        # Built outside the lock; two racing builds produce the same explainer
+        explainer = build_explainer(pipeline, predictor, self.background)
+        with self._lock:
+            self._explainers[version] = explainer
+            while len(self._explainers) > self.max_versions:
+                self._explainers.popitem(last=False)
+        return explainer
+
+    def shap_values(self, version, pipeline, predictor, records, chunk_size=EXPLAIN_CHUNK_SIZE, progress=None):
+        """
+        (explainer, array (n_records, n_columns)) of attributions, computed
+        `chunk_size` records at a time; `progress(done, total)` is called after each chunk.
+        """
+        explainer = self.explainer(version, pipeline, predictor)
+        chunks = []
+        for start in range(0, len(records), chunk_size):
+            chunks.append(explainer.shap_values(records[start:start + chunk_size]))
+            if progress is not None:
+                progress(min(start + chunk_size, len(records)), len(records))
+        values = np.concatenate(chunks) if chunks else np.zeros((0, len(explainer.columns)))
+        return explainer, values
+
+    def explain(self, mv, records, top=None):
+        """
+        Attributions for a list of records under ModelVersion `mv`, one dict per
+        record: base value, prediction and {column: attribution} sorted by
+        magnitude (only the `top` largest when given).
+        """
+        explainer, values = self.shap_values(mv.version, mv.pipeline, mv.predictor, records)
+        predictions = mv.predictor.predict(records)
+        results = []
+        for prediction, row in zip(predictions, values):
+            order = np.argsort(-np.abs(row))[:top]
+            results.append({
+                "prediction": int(prediction),
+                "base_value": explainer.expected_value,
+                "attributions": {explainer.columns[j]: float(row[j]) for j in order},
+            })
+        return {"model_version": mv.version, "explainer": explainer.kind, "explanations": results}
+
+
+def engine_from_env():
+    """ExplanationEngine configured from EXPLAIN_BACKGROUND_PATH / EXPLAIN_BACKGROUND_ROWS."""
+    return ExplanationEngine(
+        background_path=os.environ.get("EXPLAIN_BACKGROUND_PATH", DEFAULT_BACKGROUND_PATH),
+        background_rows=int(os.environ.get("EXPLAIN_BACKGROUND_ROWS", str(DEFAULT_BACKGROUND_ROWS))),
+    )
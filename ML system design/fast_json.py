@@ -0,0 +1,167 @@
+# fast_json.py
+"""
+One JSON layer for the Flask and FastAPI apps: orjson when it is installed,
+the standard library otherwise (same output types, just slower).
+
+ObjectId (as its hex string), NumPy scalars and arrays, datetimes/dates
+(ISO 8601) and sets are encoded natively, so a Mongo document or
+`{"prediction": np.int64(1)}` can be returned as is:
+
+    use_fast_json(app)                                  # Flask: jsonify + request.get_json
+    FastAPI(default_response_class=FastJSONResponse)    # FastAPI responses
+    router.route_class = FastJSONRoute                  # FastAPI request bodies
+
+    dumps(obj) -> bytes, loads(bytes | str)
+
+The Flask and FastAPI classes are built on first use, so an app only
+imports the framework it runs on.
+"""
+import datetime
+import json
+import logging
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from bson.objectid import ObjectId
+except ImportError:
+    ObjectId = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+_fallback_logged = False
+
+
+def default(obj):
+    """Encodes the types neither backend handles by itself."""
+    if ObjectId is not None and isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        # orjson only handles C-contiguous arrays of plain dtypes natively
+        return obj.tolist()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj, default=default, option=_OPTIONS)
+
+    def loads(data):
+        """Parses JSON bytes or str; raises ValueError on invalid input."""
+        return orjson.loads(data)
+else:
+    def dumps(obj):
+        """Compact UTF-8 JSON bytes."""
+        return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(data):
+        """Parses JSON bytes or str; raises ValueError on invalid input."""
+        return json.loads(data)
+
+
+def log_fallback():
+    """Warns (once per process) that JSON goes through the slower standard library."""
+    global _fallback_logged
+    if orjson is None and not _fallback_logged:
+        _fallback_logged = True
+        logging.warning("orjson is not installed; fast_json falls back to the standard library json (slower)")
+
+
+# ----------------------
+# Flask
+# ----------------------
+def _flask_classes():
+    from flask.json.provider import JSONProvider
+
+    class FastJSONProvider(JSONProvider):
+        """Flask JSON provider on dumps/loads: used by jsonify, request.get_json and request.json."""
+
+        mimetype = "application/json"
+
+        def dumps(self, obj, **kwargs):
+            return dumps(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return loads(s)
+
+        def response(self, *args, **kwargs):
+            # Bytes straight into the response, no str round trip
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+    return {"FastJSONProvider": FastJSONProvider}
+
+
+def use_fast_json(app):
+    """Installs FastJSONProvider on a Flask app; returns the app."""
+    log_fallback()
+    app.json = __getattr__("FastJSONProvider")(app)
+    return app
+
+
+# ----------------------
+# FastAPI
+# ----------------------
+def _fastapi_classes():
+    log_fallback()
+    from fastapi import Request
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import APIRoute
+
+    class FastJSONResponse(JSONResponse):
+        """JSONResponse rendered with dumps (use as default_response_class)."""
+
+        def render(self, content):
+            return dumps(content)
+
+    class FastJSONRequest(Request):
+        async def json(self):
+            if not hasattr(self, "_json"):
+                self._json = loads(await self.body())
+            return self._json
+
+    class FastJSONRoute(APIRoute):
+        """APIRoute whose request bodies are parsed with loads."""
+
+        def get_route_handler(self):
+            handler = super().get_route_handler()
+
+            async def route_handler(request):
+                return await handler(FastJSONRequest(request.scope, request.receive))
+
+            return route_handler
+
+    return {"FastJSONResponse": FastJSONResponse, "FastJSONRequest": FastJSONRequest,
+            "FastJSONRoute": FastJSONRoute}
+
+
+_LAZY = {
+    "FastJSONProvider": _flask_classes,
+    "FastJSONResponse": _fastapi_classes,
+    "FastJSONRequest": _fastapi_classes,
+    "FastJSONRoute": _fastapi_classes,
+}
+
+
+def __getattr__(name):
+    # Framework classes are created (and the framework imported) on first access
+    if name in globals():
+        return globals()[name]
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    classes = _LAZY[name]()
+    globals().update(classes)
+    return classes[name]
@@ -0,0 +1,326 @@
+# fast_pipeline.py
+import numpy as np
+
+
+class CompiledPipeline:
+    """
+    Pandas-free scoring kernel for a fitted preprocessing + linear model pipeline.
+
+    The StandardScaler statistics and the one-hot encoder are folded into
+    the model weights at compile time, so scoring a record is a handful of
+    dict lookups plus one dot product over the numeric features.
+    Build it with `compile_pipeline()` rather than directly.
+    """
+
+    def __init__(self, numeric_columns, means, scales, numeric_coef,
+                 categorical_columns, category_weights, intercept, classes,
+                 ignore_unknown=True):
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.columns = self.numeric_columns + self.categorical_columns
+
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.numeric_coef = np.asarray(numeric_coef, dtype=np.float64)  # (n_numeric, n_scores)
+        self.category_weights = category_weights  # one {value: weight vector} per column
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes = np.asarray(classes)
+        self.ignore_unknown = ignore_unknown
+
+        self._zero = np.zeros(self.intercept.shape[0], dtype=np.float64)
+
+        # One-hot layout for encode(): categories keep the encoder's order
+        self._one_hot_positions = [{value: k for k, value in enumerate(weights)} for weights in category_weights]
+        self._one_hot_offsets = []
+        offset = len(self.numeric_columns)
+        for positions in self._one_hot_positions:
+            self._one_hot_offsets.append(offset)
+            offset += len(positions)
+        self._n_one_hot = offset - len(self.numeric_columns)
+        # Weights over the encode() layout, for predict_encoded()
+        self._encoded_coef = np.vstack(
+            [self.numeric_coef.reshape(len(self.numeric_columns), -1)]
+            + [np.asarray(list(weights.values()), dtype=np.float64).reshape(len(weights), -1)
+               for weights in category_weights]
+        )
+
+    # ----------------------
+    # Scoring
+    # ----------------------
+    def decision_function(self, records):
+        """Linear scores for a list of dicts, same as `pipeline.decision_function`."""
+        if isinstance(records, dict):
+            records = [records]
+        self._check_columns(records)
+
+        numeric = np.array(
+            [[record[col] for col in self.numeric_columns] for record in records],
+            dtype=np.float64,
+        ).reshape(len(records), len(self.numeric_columns))
+
+        categorical = np.zeros((len(records), self.intercept.shape[0]), dtype=np.float64)
+        for i, record in enumerate(records):
+            for col, weights in zip(self.categorical_columns, self.category_weights):
+                categorical[i] += self._lookup(col, weights, record[col])
+
+        return self._finish(numeric, categorical)
+
+    def decision_function_columns(self, columns):
+        """Linear scores for a dict of column name -> sequence/NumPy array."""
+        missing = [col for col in self.columns if col not in columns]
+        if missing:
+            raise ValueError(f"columns are missing: {set(missing)}")
+
+        n_rows = len(columns[self.columns[0]]) if self.columns else 0
+        numeric = np.empty((n_rows, len(self.numeric_columns)), dtype=np.float64)
+        for j, col in enumerate(self.numeric_columns):
+            numeric[:, j] = np.asarray(columns[col], dtype=np.float64)
+
+        categorical = np.zeros((n_rows, self.intercept.shape[0]), dtype=np.float64)
+        for col, weights in zip(self.categorical_columns, self.category_weights):
+            values = columns[col]
+            if hasattr(values, "codes") and hasattr(values, "categories"):
+                # A pandas Categorical (e.g. from columnar_dataset): one lookup per category, missing (-1) -> last row
+                table = np.array([self._lookup(col, weights, v) for v in values.categories] + [self._missing(col)])
+                categorical += table[values.codes]
+                continue
+            values = np.asarray(columns[col], dtype=object)
+            # Look each distinct value up once, then broadcast back to the rows
+            _, first, inverse = np.unique(values.astype(str), return_index=True, return_inverse=True)
+            table = np.array([self._lookup(col, weights, v) for v in values[first]])
+            categorical += table[inverse.reshape(-1)]
+
+        return self._finish(numeric, categorical)
+
+    def predict(self, records):
+        """Class labels for a list of dicts, identical to `pipeline.predict`."""
+        return self._labels(self.decision_function(records))
+
+    def predict_columns(self, columns):
+        """Class labels for a dict of column name -> sequence/NumPy array."""
+        return self._labels(self.decision_function_columns(columns))
+
+    def predict_one(self, record):
+        return self.predict([record])[0]
+
+    def predict_encoded(self, features):
+        """Class labels for `encode()` output, so records encoded for storage are not encoded again."""
+        return self._labels(np.asarray(features, dtype=np.float64) @ self._encoded_coef + self.intercept)
+
+    # ----------------------
+    # Encoding
+    # ----------------------
+    def feature_names(self):
+        """Names of the `encode()` output columns: numeric, then column=value one-hots."""
+        return self.numeric_columns + [
+            f"{col}={value}" for col, weights in zip(self.categorical_columns, self.category_weights)
+            for value in weights
+        ]
+
+    def encode(self, records):
+        """
+        Model input vectors for a list of dicts, shape (n_records, n_features):
+        scaled numeric columns followed by the one-hot blocks, in
+        `feature_names()` order. Unknown categories encode as all zeros.
+        """
+        if isinstance(records, dict):
+            records = [records]
+        self._check_columns(records)
+
+        numeric = np.array(
+            [[record[col] for col in self.numeric_columns] for record in records],
+            dtype=np.float64,
+        ).reshape(len(records), len(self.numeric_columns))
+        if np.isnan(numeric).any():
+            raise ValueError("Input X contains NaN.")
+
+        encoded = np.zeros((len(records), len(self.numeric_columns) + self._n_one_hot), dtype=np.float64)
+        encoded[:, :len(self.numeric_columns)] = (numeric - self.means) / self.scales
+        for i, record in enumerate(records):
+            for col, offset, positions in zip(self.categorical_columns, self._one_hot_offsets, self._one_hot_positions):
+                position = positions.get(record[col])
+                if position is None:
+                    if not self.ignore_unknown:
+                        raise ValueError(f"Found unknown category {record[col]!r} in column {col!r}")
+                    continue
+                encoded[i, offset + position] = 1.0
+        return encoded
+
+    # ----------------------
+    # Internals
+    # ----------------------
+    def _check_columns(self, records):
+        for record in records:
+            missing = [col for col in self.columns if col not in record]
+            if missing:
+                raise ValueError(f"columns are missing: {set(missing)}")
+
+    def _lookup(self, col, weights, value):
+        weight = weights.get(value)
+        if weight is None:
+            if not self.ignore_unknown:
+                raise ValueError(f"Found unknown category {value!r} in column {col!r}")
+            return self._zero
+        return weight
+
+    def _missing(self, col):
+        # Same as the encoder: a missing value is an unknown category
+        return self._lookup(col, {}, None)
+
+    def _finish(self, numeric, categorical):
+        if np.isnan(numeric).any():
+            raise ValueError("Input X contains NaN.")
+        scaled = (numeric - self.means) / self.scales
+        return scaled @ self.numeric_coef + categorical + self.intercept
+
+    def _labels(self, scores):
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(int)]
+        return self.classes[scores.argmax(axis=1)]
+
+
+class PipelinePredictor:
+    """Fallback with the CompiledPipeline interface that calls the sklearn pipeline."""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.columns = list(getattr(pipeline, "feature_names_in_", []))
+
+    def predict(self, records):
+        import pandas as pd
+
+        if isinstance(records, dict):
+            records = [records]
+        df = pd.DataFrame(records)
+        if self.columns:
+            df = df[self.columns]
+        return self.pipeline.predict(df)
+
+    def predict_columns(self, columns):
+        import pandas as pd
+
+        return self.pipeline.predict(pd.DataFrame(columns))
+
+    def predict_one(self, record):
+        return self.predict([record])[0]
+
+    def predict_encoded(self, features):
+        return self.pipeline[-1].predict(features)
+
+    def feature_names(self):
+        return list(self.pipeline[:-1].get_feature_names_out())
+
+    def encode(self, records):
+        import pandas as pd
+
+        if isinstance(records, dict):
+            records = [records]
+        df = pd.DataFrame(records)
+        if self.columns:
+            df = df[self.columns]
+        encoded = self.pipeline[:-1].transform(df)
+        if hasattr(encoded, "toarray"):
+            encoded = encoded.toarray()
+        return np.asarray(encoded, dtype=np.float64)
+
+
+# ----------------------
+# Compilation
+# ----------------------
+def compile_pipeline(pipeline):
+    """
+    Compiles a fitted Pipeline(ColumnTransformer, LogisticRegression-like) into
+    a CompiledPipeline.
+
+    Supported preprocessing: StandardScaler, OneHotEncoder (no `drop`, no
+    infrequent categories), 'passthrough' and 'drop' column groups, with
+    remainder='drop'. Raises ValueError for anything else.
+    """
+    # Imported here so the apps can start before scikit-learn is loaded
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+        raise ValueError("Expected a Pipeline(preprocessor, model)")
+    preprocessor = pipeline.steps[0][1]
+    estimator = pipeline.steps[-1][1]
+
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError("Expected a ColumnTransformer as the first step")
+    if not all(hasattr(estimator, attr) for attr in ("coef_", "intercept_", "classes_")):
+        raise ValueError("Expected a fitted linear classifier as the last step")
+    if preprocessor.remainder != "drop":
+        raise ValueError("Only remainder='drop' is supported")
+
+    coef = np.asarray(estimator.coef_, dtype=np.float64).T  # (n_features_out, n_scores)
+    offset = 0
+
+    numeric_columns, means, scales, numeric_rows = [], [], [], []
+    categorical_columns, category_weights = [], []
+    ignore_unknown = True
+
+    for name, transformer, cols in preprocessor.transformers_:
+        if transformer == "drop" or name == "remainder":
+            continue
+        cols = list(cols)
+
+        if transformer == "passthrough" or isinstance(transformer, StandardScaler):
+            if transformer == "passthrough":
+                mean, scale = np.zeros(len(cols)), np.ones(len(cols))
+            else:
+                mean = transformer.mean_ if transformer.with_mean else np.zeros(len(cols))
+                scale = transformer.scale_ if transformer.with_std else np.ones(len(cols))
+            numeric_columns.extend(cols)
+            means.extend(mean)
+            scales.extend(scale)
+            numeric_rows.extend(range(offset, offset + len(cols)))
+            offset += len(cols)
+
+        elif isinstance(transformer, OneHotEncoder):
+            if transformer.drop is not None:
+                raise ValueError("OneHotEncoder(drop=...) is not supported")
+            if getattr(transformer, "_infrequent_enabled", False):
+                raise ValueError("OneHotEncoder infrequent categories are not supported")
+            if transformer.handle_unknown == "error":
+                ignore_unknown = False
+            for col, categories in zip(cols, transformer.categories_):
+                weights = {}
+                for k, value in enumerate(categories):
+                    weights[value] = coef[offset + k]
+                categorical_columns.append(col)
+                category_weights.append(weights)
+                offset += len(categories)
+        else:
+            raise ValueError(f"Unsupported transformer {transformer!r} for {name!r}")
+
+    if offset != coef.shape[0]:
+        raise ValueError("Preprocessor output does not match the model's coefficients")
+
+    return CompiledPipeline(
+        numeric_columns=numeric_columns,
+        means=means,
+        scales=scales,
+        numeric_coef=coef[numeric_rows].reshape(len(numeric_rows), coef.shape[1]),
+        categorical_columns=categorical_columns,
+        category_weights=category_weights,
+        intercept=estimator.intercept_,
+        classes=estimator.classes_,
+        ignore_unknown=ignore_unknown,
+    )
+
+
+def make_predictor(pipeline):
+    """CompiledPipeline when the pipeline can be compiled, PipelinePredictor otherwise."""
+    try:
+        return compile_pipeline(pipeline)
+    except ValueError:
+        return PipelinePredictor(pipeline)
+
+
+def load_compiled_pipeline(path="performance_pipeline.pkl"):
+    """Loads a pickled pipeline and returns (pipeline, predictor)."""
+    import joblib
+
+    pipeline = joblib.load(path)
+    return pipeline, make_predictor(pipeline)
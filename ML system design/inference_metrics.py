@@ -0,0 +1,178 @@
+# inference_metrics.py
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+# Metrics live in the default registry, which PrometheusMetrics serves on /metrics.
+# They are created once per process, however many apps import this module.
+PREPROCESS_SECONDS = Histogram(
+    "student_inference_preprocess_seconds",
+    "Time spent turning request JSON into model input records",
+    ["model_version"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+PREDICT_SECONDS = Histogram(
+    "student_inference_predict_seconds",
+    "Time spent in the model's predict call",
+    ["model_version"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+BATCH_SIZE = Histogram(
+    "student_inference_batch_size",
+    "Records per prediction request, cache hits included",
+    ["model_version"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096),
+)
+PREDICTIONS = Counter(
+    "student_predictions_total",
+    "Predictions served, by predicted class",
+    ["model_version", "predicted_class"],
+)
+FEATURE_DRIFT = Gauge(
+    "student_feature_drift_zscore",
+    "Moving average of a numeric feature in live traffic, in training standard deviations from the training mean",
+    ["model_version", "feature"],
+)
+UNKNOWN_CATEGORY_RATIO = Gauge(
+    "student_unknown_category_ratio",
+    "Moving share of live records with a category the model never saw",
+    ["model_version", "feature"],
+)
+
+
+class _RegistryCollector:
+    """Reports load duration and liveness of every version the tracked registries hold."""
+
+    def __init__(self):
+        self.registries = []
+
+    def collect(self):
+        load = GaugeMetricFamily("student_model_load_seconds", "Time taken to load, compile and warm up a model version",
+                                 labels=["model_version", "kernel"])
+        active = GaugeMetricFamily("student_model_active", "1 for the live model version, 0 for the rollback standby",
+                                   labels=["model_version"])
+        for registry in self.registries:
+            if not registry.ready:
+                continue  # still loading; scrapes must not wait for it
+            for mv, live in ((registry.current, 1), (registry.previous, 0)):
+                if mv is None:
+                    continue
+                load.add_metric([mv.version, type(mv.predictor).__name__], mv.load_seconds)
+                active.add_metric([mv.version], live)
+        yield load
+        yield active
+
+    def describe(self):
+        return []
+
+
+_registry_collector = _RegistryCollector()
+REGISTRY.register(_registry_collector)
+
+
+def track_registry(registry):
+    """Exports model load duration and liveness for a ModelRegistry."""
+    if registry not in _registry_collector.registries:
+        _registry_collector.registries.append(registry)
+
+
+class DriftTracker:
+    """
+    Exponential moving averages of the live numeric features and of the
+    unknown-category rate, compared with what the compiled model was trained
+    on (StandardScaler mean/scale, OneHotEncoder categories).
+
+    Parameters:
+    halflife (int): Records after which an old observation weighs half as much
+    """
+
+    def __init__(self, halflife=1000):
+        self.decay = 0.5 ** (1.0 / halflife)
+        self._state = {}  # version -> (numeric EMA, unknown EMA)
+        self._lock = threading.Lock()
+
+    def observe(self, mv, records):
+        predictor = mv.predictor
+        if not records or not hasattr(predictor, "means"):
+            return  # drift needs the training statistics of a CompiledPipeline
+
+        numeric = np.array([[r[c] for c in predictor.numeric_columns] for r in records], dtype=np.float64)
+        unknown = np.array([[r[c] not in weights for c, weights in zip(predictor.categorical_columns, predictor.category_weights)]
+                            for r in records], dtype=np.float64)
+        self._update(mv, numeric, unknown)
+
+    def observe_columns(self, mv, columns):
+        """observe() for validated columns (ValidationResult.model_columns)."""
+        predictor = mv.predictor
+        n = len(next(iter(columns.values()), ()))
+        if not n or not hasattr(predictor, "means"):
+            return
+
+        numeric = np.column_stack([np.asarray(columns[c], dtype=np.float64) for c in predictor.numeric_columns])
+        unknown = np.column_stack([np.fromiter((v not in weights for v in columns[c]), dtype=np.float64, count=n)
+                                   for c, weights in zip(predictor.categorical_columns, predictor.category_weights)])
+        self._update(mv, numeric, unknown)
+
+    def _update(self, mv, numeric, unknown):
+        predictor = mv.predictor
+        weight = self.decay ** len(numeric)
+        with self._lock:
+            state = self._state.get(mv.version)
+            if state is None:
+                numeric_ema, unknown_ema = numeric.mean(axis=0), unknown.mean(axis=0)
+            else:
+                numeric_ema = weight * state[0] + (1 - weight) * numeric.mean(axis=0)
+                unknown_ema = weight * state[1] + (1 - weight) * unknown.mean(axis=0)
+            self._state[mv.version] = (numeric_ema, unknown_ema)
+
+        zscores = (numeric_ema - predictor.means) / predictor.scales
+        for col, z in zip(predictor.numeric_columns, zscores):
+            FEATURE_DRIFT.labels(mv.version, col).set(z)
+        for col, ratio in zip(predictor.categorical_columns, unknown_ema):
+            UNKNOWN_CATEGORY_RATIO.labels(mv.version, col).set(ratio)
+
+
+drift = DriftTracker()
+
+
+@contextmanager
+def preprocess_timer(version):
+    start = time.perf_counter()
+    yield
+    PREPROCESS_SECONDS.labels(version).observe(time.perf_counter() - start)
+
+
+def timed_predict(mv, records):
+    """mv.predictor.predict(records), recording only its latency (the cache-miss path)."""
+    start = time.perf_counter()
+    predictions = mv.predictor.predict(records)
+    PREDICT_SECONDS.labels(mv.version).observe(time.perf_counter() - start)
+    return predictions
+
+
+def record_predictions(mv, records, predictions):
+    """Batch size, classes and drift of served predictions, whether they came from the cache or the model."""
+    BATCH_SIZE.labels(mv.version).observe(len(records))
+    _count_classes(mv, predictions)
+    drift.observe(mv, records)
+
+
+def predict_columns(mv, columns):
+    """predict() for validated columns (ValidationResult.model_columns), the /predict/batch path."""
+    start = time.perf_counter()
+    predictions = mv.predictor.predict_columns(columns)
+    PREDICT_SECONDS.labels(mv.version).observe(time.perf_counter() - start)
+    BATCH_SIZE.labels(mv.version).observe(len(predictions))
+    _count_classes(mv, predictions)
+    drift.observe_columns(mv, columns)
+    return predictions
+
+
+def _count_classes(mv, predictions):
+    classes, counts = np.unique(np.asarray(predictions), return_counts=True)
+    for cls, count in zip(classes, counts):
+        PREDICTIONS.labels(mv.version, str(cls)).inc(int(count))
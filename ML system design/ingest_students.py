@@ -0,0 +1,64 @@
+"""
+Bulk-load student records into MongoDB.
+
+Streams CSV or JSON Lines files, validates every row against the student schema (types, ranges, allowed values)
+and writes them with unordered insert_many batches. Bad rows are reported
+by file and line number; they never stop the rest of the load.
+
+    python ingest_students.py data/raw/student_mat.csv data/raw/student_por.csv
+    python ingest_students.py exports/district.jsonl --batch-size 5000
+
+The `dataset` column is taken from the file name (student_mat / student_por)
+unless --dataset is given. The connection comes from MONGO_URI.
+"""
+import argparse
+import sys
+
+from mongo_connection import mongo_from_env
+from student_ingest import DATASETS, FORMATS, INGEST_BATCH_SIZE, format_for_path, ingest, read_rows
+from student_schema import dataset_for_path
+
+
+def ingest_file(collection, path, fmt=None, batch_size=INGEST_BATCH_SIZE, dataset=None):
+    fmt = fmt or format_for_path(path)
+    dataset = dataset or dataset_for_path(path)
+    defaults = {"dataset": dataset} if dataset else None
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return ingest(collection, read_rows(f, fmt), batch_size, defaults)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load student records into MongoDB")
+    parser.add_argument("paths", nargs="+", help="CSV or JSON Lines files")
+    parser.add_argument("--format", choices=FORMATS, help="Input format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="Documents per insert_many call")
+    parser.add_argument("--dataset", choices=DATASETS, help="Value for rows without a dataset column")
+    parser.add_argument("--db", default="student_performance")
+    parser.add_argument("--collection", default="records")
+    parser.add_argument("--show-errors", type=int, default=20, help="Row errors printed per file")
+    args = parser.parse_args(argv)
+
+    mongo = mongo_from_env(db_name=args.db, collection_name=args.collection, health_interval=0)
+    exit_code = 0
+    try:
+        for path in args.paths:
+            summary = ingest_file(mongo.collection, path, args.format, args.batch_size, args.dataset)
+            print(f"{path}: {summary['inserted']}/{summary['received']} inserted, {summary['failed']} failed, "
+                  f"{summary['batches']} batches in {summary['seconds']:.2f}s ({summary['rows_per_second']} rows/s)")
+            for error in summary["errors"][:args.show_errors]:
+                print(f"  {path}:{error['line']}: {error['error']}", file=sys.stderr)
+            if summary["failed"] > args.show_errors:
+                print(f"  ... {summary['failed'] - args.show_errors} more", file=sys.stderr)
+            if summary["aborted"]:
+                print(f"{path}: aborted: {summary['aborted']}", file=sys.stderr)
+                exit_code = 1
+                break
+            if summary["failed"]:
+                exit_code = 2
+    finally:
+        mongo.close()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
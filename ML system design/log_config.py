@@ -0,0 +1,183 @@
+# log_config.py
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sampled"}
+
+# The installed pipeline; the fork and exit hooks at the bottom act on whichever is current
+_pipeline = None
+
+
+def payload_logging_enabled():
+    """Request headers, input records and predictions are only logged when LOG_PAYLOADS=1."""
+    return os.environ.get("LOG_PAYLOADS", "0").lower() in ("1", "true", "yes")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, any `extra=` fields, exc."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a `rate` fraction of the records logged with extra={"sampled": True}.
+    Unmarked records, and anything at WARNING or above, always pass.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+        self.dropped = 0
+
+    def filter(self, record):
+        if self.rate >= 1.0 or not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        if random.random() < self.rate:
+            record.sample_rate = self.rate
+            return True
+        self.dropped += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records (and counts them) instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock_dropped = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_dropped:
+                self.dropped += 1
+
+
+class LoggingPipeline:
+    """Handles to the installed handlers, for /metrics and shutdown."""
+
+    def __init__(self, queue_handler, listener, sampler, file_handler):
+        self.queue_handler = queue_handler
+        self.listener = listener
+        self.sampler = sampler
+        self.file_handler = file_handler
+
+    def stats(self):
+        return {
+            "async": self.listener is not None,
+            "queue_depth": self.queue_handler.queue.qsize() if self.queue_handler else 0,
+            "dropped_queue_full": self.queue_handler.dropped if self.queue_handler else 0,
+            "dropped_sampled": self.sampler.dropped,
+            "sample_rate": self.sampler.rate,
+            "payloads": payload_logging_enabled(),
+        }
+
+    def restart_after_fork(self):
+        # The listener thread does not survive fork(): pre-forked workers get their own
+        if self.listener is None:
+            return
+        self.queue_handler.queue = queue.Queue(maxsize=self.queue_handler.queue.maxsize)
+        self.listener = QueueListener(self.queue_handler.queue, self.file_handler, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.file_handler.close()
+
+
+def setup_logging(filename="app.log", level=logging.INFO):
+    """
+    Installs the root logging pipeline and returns a LoggingPipeline.
+
+    By default the request thread only puts records on a bounded queue; a
+    QueueListener thread formats them as JSON lines into a size-rotated file.
+    Configured through the environment:
+
+    LOG_ASYNC (1): 0 writes on the calling thread (debugging)
+    LOG_FORMAT (json): "text" for the old "%(asctime)s [%(levelname)s] %(message)s" lines
+    LOG_SAMPLE_RATE (1.0): Fraction of extra={"sampled": True} lines kept
+    LOG_MAX_BYTES (10 MB) / LOG_BACKUP_COUNT (5): Rotation of `filename`
+    LOG_QUEUE_SIZE (10000): Records buffered before new ones are dropped
+    """
+    file_handler = RotatingFileHandler(
+        filename,
+        maxBytes=int(os.environ.get("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+        backupCount=int(os.environ.get("LOG_BACKUP_COUNT", "5")),
+        delay=True,
+    )
+    if os.environ.get("LOG_FORMAT", "json") == "text":
+        file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    else:
+        file_handler.setFormatter(JsonFormatter())
+
+    # Sampling runs before the queue, so dropped lines cost the request thread almost nothing
+    sampler = SamplingFilter(float(os.environ.get("LOG_SAMPLE_RATE", "1.0")))
+
+    global _pipeline
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    # A second call replaces the pipeline: flush and release the old listener and file
+    if _pipeline is not None:
+        _pipeline.stop()
+
+    queue_handler, listener = None, None
+    if os.environ.get("LOG_ASYNC", "1") == "1":
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", "10000"))))
+        queue_handler.addFilter(sampler)
+        root.addHandler(queue_handler)
+        listener = QueueListener(queue_handler.queue, file_handler, respect_handler_level=True)
+        listener.start()
+    else:
+        file_handler.addFilter(sampler)
+        root.addHandler(file_handler)
+
+    _pipeline = LoggingPipeline(queue_handler, listener, sampler, file_handler)
+    return _pipeline
+
+
+# ----------------------
+# Process hooks (registered once, however often setup_logging runs)
+# ----------------------
+def _restart_after_fork():
+    if _pipeline is not None:
+        _pipeline.restart_after_fork()
+
+
+def _stop_at_exit():
+    # Flush what is still queued when the process exits
+    if _pipeline is not None:
+        _pipeline.stop()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(_stop_at_exit)
@@ -0,0 +1,221 @@
+# micro_batching.py
+import asyncio
+import time
+from collections import deque
+
+
+class QueueFull(Exception):
+    """Raised by `MicroBatcher.submit()` when the request queue is at capacity."""
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent prediction requests into a single batch call.
+
+    Requests are queued by `submit()`. A background task takes the first
+    queued request, then keeps collecting until either `max_batch_size`
+    requests are waiting or `max_wait_ms` has passed, and runs one
+    `predict_fn(records)` call for the whole batch on `executor`.
+
+    Parameters:
+    predict_fn (callable): Takes a list of records, returns one prediction per record
+    max_batch_size (int): Upper bound on records per predict_fn call
+    max_wait_ms (float): Upper bound on how long the first request waits for company
+    executor (Executor): Thread or process pool for predict_fn (None = loop default)
+    max_concurrency (int): Batches allowed in the executor at the same time
+    max_queue_size (int): Requests allowed to wait; beyond it submit() raises QueueFull (0 = unbounded)
+    context_fn (callable): Called on the event loop when a batch is dispatched; its
+        tuple result is passed to predict_fn before the records (e.g. the model version)
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=5.0,
+                 executor=None, max_concurrency=1, max_queue_size=0, context_fn=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.context_fn = context_fn
+
+        self._loop = None
+        self._queue = None
+        self._task = None
+        self._slots = None
+        self._in_flight = set()
+
+        # Metrics
+        self._batches = 0
+        self._requests = 0
+        self._errors = 0
+        self._rejected = 0
+        self._batch_sizes = {}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits = deque(maxlen=1000)
+
+    # ----------------------
+    # Public API
+    # ----------------------
+    async def submit(self, record):
+        """Queue one record and wait for its own prediction. Raises QueueFull when saturated."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((record, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise QueueFull(f"Prediction queue is full ({self.max_queue_size} waiting)")
+        return await future
+
+    async def stop(self):
+        """Cancel the background batching task (pending requests are failed)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        for task in list(self._in_flight):
+            task.cancel()
+        self._in_flight.clear()
+
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    def stats(self):
+        """Batch-size and queue-wait metrics collected so far."""
+        waits = sorted(self._recent_waits)
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_in_flight": len(self._in_flight),
+            "batches": self._batches,
+            "requests": self._requests,
+            "errors": self._errors,
+            "rejected": self._rejected,
+            "avg_batch_size": self._requests / self._batches if self._batches else 0.0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "queue_wait_ms": {
+                "avg": 1000.0 * self._wait_total / self._requests if self._requests else 0.0,
+                "max": 1000.0 * self._wait_max,
+                "p50": 1000.0 * _percentile(waits, 50),
+                "p95": 1000.0 * _percentile(waits, 95),
+                "p99": 1000.0 * _percentile(waits, 99),
+            },
+        }
+
+    # ----------------------
+    # Internals
+    # ----------------------
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        # Queue and task are bound to the loop that created them
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._in_flight = set()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued before waiting on the clock
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for a free executor slot first, so requests keep batching
+            # up in the queue while all workers are busy
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+
+            # Callers that gave up (client disconnect, timeout) are dropped here
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                self._slots.release()
+                continue
+
+            self._record_batch(batch, time.perf_counter())
+            task = loop.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        records = [record for record, _, _ in batch]
+        try:
+            context = self.context_fn() if self.context_fn is not None else ()
+            # Run the CPU-bound model call off the event loop
+            predictions = await loop.run_in_executor(self.executor, self.predict_fn, *context, records)
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Batcher stopped"))
+            raise
+        except Exception as e:
+            self._errors += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for (_, future, _), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(prediction)
+
+    def _record_batch(self, batch, dispatched_at):
+        size = len(batch)
+        self._batches += 1
+        self._requests += size
+        self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
+        for _, _, enqueued_at in batch:
+            wait = dispatched_at - enqueued_at
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._recent_waits.append(wait)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
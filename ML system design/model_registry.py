@@ -0,0 +1,319 @@
+# model_registry.py
+import csv
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from fast_pipeline import CompiledPipeline, make_predictor
+from prediction_cache import model_file_hash
+from student_schema import NUMERIC_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+class ModelVersion:
+    """A loaded, warmed-up model. Treat as read-only once published."""
+
+    def __init__(self, version, path, pipeline, predictor, load_seconds, training=None):
+        self.version = version
+        self.path = path
+        self.pipeline = pipeline
+        self.predictor = predictor
+        self.load_seconds = load_seconds
+        self.training = training  # train.py report next to the model file, if any
+        self.loaded_at = time.time()
+
+    def info(self):
+        info = {
+            "version": self.version,
+            "path": self.path,
+            "kernel": type(self.predictor).__name__,
+            "load_seconds": round(self.load_seconds, 4),
+            "loaded_at": self.loaded_at,
+        }
+        if self.training:
+            info["training"] = {key: self.training.get(key) for key in ("trained_at", "best_params", "metrics", "timing")}
+        return info
+
+
+def load_training_report(path):
+    """The .json report train.py writes next to a model file, or None."""
+    report_path = os.path.splitext(path)[0] + ".json"
+    try:
+        with open(report_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_warmup_sample(path, rows=32, dataset="math"):
+    """First `rows` records of a raw student CSV, typed like API input."""
+    if not path or not os.path.exists(path):
+        return []
+    sample = []
+    with open(path, newline="") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            if i >= rows:
+                break
+            for col in NUMERIC_COLUMNS:
+                if col in row:
+                    row[col] = int(row[col])
+            row.setdefault("dataset", dataset)
+            sample.append(row)
+    return sample
+
+
+class ModelRegistry:
+    """
+    Watches `model_dir` for pipeline files and serves the newest one.
+
+    New files are loaded and warmed up on a background thread, then swapped
+    in with a single reference assignment; a request that grabbed
+    `registry.current` keeps using that version until it finishes. The
+    previously active version is kept for `rollback()`. Versions are the
+    short sha256 of the model file.
+
+    Parameters:
+    model_dir (str): Directory to watch
+    pattern (str): Glob of model files inside model_dir
+    poll_interval (float): Seconds between directory scans (0 = never watch)
+    warmup_path (str): CSV whose first rows are scored before a version goes live
+    background (bool): Load the first version on a thread instead of in the
+        constructor; `ready` tells when it is live and `current` waits for it
+    """
+
+    def __init__(self, model_dir=".", pattern="performance_pipeline*.pkl", poll_interval=10.0,
+                 warmup_path="data/raw/student_mat.csv", warmup_rows=32, background=False):
+        self.model_dir = model_dir
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+        self.warmup_sample = load_warmup_sample(warmup_path, warmup_rows)
+
+        self._current = None
+        self._previous = None
+        self._versions = {}  # version -> ModelVersion, for current/previous and process-pool lookups
+        self._seen = None  # (path, mtime, size) of the newest file already handled
+        self._rejected = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._watcher_pid = None
+        self._loaded = threading.Event()  # set once the first load attempt has finished
+        self._loader_pid = None
+        self._load_error = None
+
+        if background:
+            self._ensure_loading()
+        else:
+            self._initial_load()
+            if self._load_error:
+                raise RuntimeError(self._load_error)
+
+    # ----------------------
+    # Reading
+    # ----------------------
+    @property
+    def current(self):
+        """The live ModelVersion. Read it once per request and keep the reference."""
+        if self._current is None:
+            self.wait_ready()
+        self._ensure_watching()
+        return self._current
+
+    @property
+    def ready(self):
+        """True once a version has been loaded, warmed up and made live."""
+        if self._current is None:
+            self._ensure_loading()
+        return self._current is not None
+
+    def status(self):
+        """The string "ready", "loading", or why the first load failed."""
+        if self.ready:
+            return "ready"
+        return self._load_error or "loading"
+
+    def wait_ready(self, timeout=None):
+        """Blocks until the first version is live. Raises RuntimeError if it failed to load."""
+        self._ensure_loading()
+        self._loaded.wait(timeout)
+        if self._current is None:
+            raise RuntimeError(self._load_error or "Model is still loading")
+        return self._current
+
+    @property
+    def previous(self):
+        return self._previous
+
+    def get(self, version, path=None):
+        """
+        ModelVersion by version id. Processes forked before a swap (e.g. a
+        process pool) do not have it yet, so it is loaded from `path` once.
+        """
+        mv = self._versions.get(version)
+        if mv is None and path is not None:
+            mv = self.load(path)
+            with self._lock:
+                self._versions[mv.version] = mv
+        return mv
+
+    def info(self):
+        return {
+            "status": self.status(),
+            "current": self._current.info() if self._current else None,
+            "previous": self._previous.info() if self._previous else None,
+            "rejected": dict(self._rejected),
+            "model_dir": os.path.abspath(self.model_dir),
+            "pattern": self.pattern,
+        }
+
+    # ----------------------
+    # Loading and swapping
+    # ----------------------
+    def load(self, path):
+        """Loads, compiles and warms up a model file. Raises if the warm-up fails."""
+        import joblib  # pulls in scikit-learn; kept off the import path of the apps
+
+        start = time.perf_counter()
+        version = model_file_hash(path)
+        pipeline = joblib.load(path)
+        predictor = make_predictor(pipeline)
+
+        if self.warmup_sample:
+            predictions = predictor.predict(self.warmup_sample)
+            if len(predictions) != len(self.warmup_sample):
+                raise ValueError(f"Warm-up returned {len(predictions)} predictions for {len(self.warmup_sample)} rows")
+            if isinstance(predictor, CompiledPipeline):
+                # The compiled kernel must agree with the pipeline before it serves traffic
+                import pandas as pd
+
+                expected = pipeline.predict(pd.DataFrame(self.warmup_sample))
+                if list(predictions) != list(expected):
+                    raise ValueError("Compiled kernel disagrees with the pipeline on the warm-up sample")
+
+        return ModelVersion(version, path, pipeline, predictor, time.perf_counter() - start,
+                            training=load_training_report(path))
+
+    def activate(self, mv):
+        """Makes `mv` the live version; the old live version becomes `previous`."""
+        with self._lock:
+            if self._current is not None and self._current.version == mv.version:
+                return
+            self._previous = self._current
+            self._current = mv
+            self._versions = {v.version: v for v in (self._current, self._previous) if v is not None}
+        logger.info(f"Model version {mv.version} is live ({mv.path})")
+
+    def rollback(self):
+        """Swaps back to the previous version. Returns the new live ModelVersion."""
+        with self._lock:
+            if self._previous is None:
+                raise RuntimeError("No previous model version to roll back to")
+            self._current, self._previous = self._previous, self._current
+            mv = self._current
+        logger.warning(f"Rolled back to model version {mv.version}")
+        return mv
+
+    def refresh(self):
+        """Loads the newest model file if it has not been handled yet. Returns True on a swap."""
+        candidate = self._newest_file()
+        if candidate is None or candidate == self._seen:
+            return False
+        self._seen = candidate
+        path = candidate[0]
+
+        try:
+            mv = self.load(path)
+        except Exception as e:
+            self._rejected[path] = str(e)
+            logger.error(f"Rejected model {path}: {e}")
+            return False
+
+        if self._current is not None and mv.version == self._current.version:
+            return False
+        self.activate(mv)
+        return True
+
+    def _newest_file(self):
+        newest = None
+        for path in glob.glob(os.path.join(self.model_dir, self.pattern)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = (path, stat.st_mtime_ns, stat.st_size)
+            if newest is None or entry[1] > newest[1]:
+                newest = entry
+        return newest
+
+    def _initial_load(self):
+        try:
+            self.refresh()
+            if self._current is None:
+                self._load_error = f"No loadable model matching {self.pattern!r} in {self.model_dir!r}"
+                if self._rejected:
+                    # Say why the file was rejected, not only that nothing loaded
+                    reasons = "; ".join(f"{path}: {error}" for path, error in self._rejected.items())
+                    self._load_error += f" ({reasons})"
+                logger.error(self._load_error)
+        except Exception as e:
+            self._load_error = f"Model load failed: {e}"
+            logger.error(self._load_error)
+        finally:
+            self._loaded.set()
+
+    # ----------------------
+    # Background loader and watcher
+    # ----------------------
+    def _ensure_loading(self):
+        # Like the watcher, per process: a worker forked before the first load finished loads its own
+        if self._current is not None or self._load_error or self._loader_pid == os.getpid():
+            return
+        with self._lock:
+            if self._current is not None or self._loader_pid == os.getpid():
+                return
+            self._loader_pid = os.getpid()
+            self._loaded = threading.Event()
+            threading.Thread(target=self._initial_load, name="model-loader", daemon=True).start()
+
+    def _ensure_watching(self):
+        # Started lazily, so a worker forked from a pre-loading master gets its own thread
+        if self.poll_interval <= 0 or self._stop.is_set() or self._watcher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            self._watcher = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Model refresh failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+
+def registry_from_env(background=None):
+    """
+    ModelRegistry configured from MODEL_DIR / MODEL_PATTERN / MODEL_POLL_INTERVAL.
+
+    MODEL_LOAD_ASYNC=1 loads the model in the background so the server can
+    bind its port (and answer /ready with 503) while it loads. Leave it off
+    under serve.py, where the master should hold the model before forking.
+    """
+    if background is None:
+        background = os.environ.get("MODEL_LOAD_ASYNC", "0").lower() in ("1", "true", "yes")
+    return ModelRegistry(
+        model_dir=os.environ.get("MODEL_DIR", "."),
+        pattern=os.environ.get("MODEL_PATTERN", "performance_pipeline*.pkl"),
+        poll_interval=float(os.environ.get("MODEL_POLL_INTERVAL", "10")),
+        background=background,
+    )
@@ -0,0 +1,230 @@
+# mongo_connection.py
+import logging
+import os
+import threading
+import time
+
+from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+
+logger = logging.getLogger(__name__)
+
+# MongoDB connection (override with MONGO_URI; credentials never live in the code)
+DEFAULT_URI = "mongodb://localhost:27017"
+
+
+class PoolStats(ConnectionPoolListener):
+    """Counts connection pool events so utilization can be reported without a round trip."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = 0
+        self.open = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.clears = 0
+
+    def _add(self, name, delta):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def pool_created(self, event):
+        self._add("pools", 1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add("clears", 1)
+
+    def pool_closed(self, event):
+        self._add("pools", -1)
+
+    def connection_created(self, event):
+        self._add("open", 1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add("open", -1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._add("checkout_failures", 1)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+
+    def connection_checked_in(self, event):
+        self._add("in_use", -1)
+
+
+class MongoConnectionManager:
+    """
+    Owns the MongoClient (one tuned pool per process) and a background
+    health checker that pings every `health_interval` seconds. The client is
+    created on first use in each process, so gunicorn workers forked from a
+    pre-loaded master never share the master's sockets and monitor threads.
+
+    Routes call `status()`, which answers from the cached ping result, so
+    requests no longer pay for a `ping` round trip before doing any work.
+    An operation that hits a connection error can call `report_failure()`
+    to flip the cached state immediately.
+
+    Parameters:
+    uri (str): MongoDB connection string
+    max_pool_size / min_pool_size (int): Connections per server kept by the pool
+    health_interval (float): Seconds between background pings
+    client (MongoClient): Pre-built client (e.g. mongomock in tests); pool options are then ignored
+    """
+
+    def __init__(self, uri=DEFAULT_URI, db_name="student_performance", collection_name="records",
+                 max_pool_size=50, min_pool_size=2, health_interval=10.0,
+                 server_selection_timeout_ms=3000, wait_queue_timeout_ms=2000, client=None):
+        self.max_pool_size = max_pool_size
+        self.health_interval = health_interval
+        self.pool_stats = PoolStats()
+        self.db_name = db_name
+        self.collection_name = collection_name
+
+        self._uri = uri
+        self._client_options = {
+            "maxPoolSize": max_pool_size,
+            "minPoolSize": min_pool_size,
+            "maxIdleTimeMS": 60000,
+            "waitQueueTimeoutMS": wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": server_selection_timeout_ms,
+            "connectTimeoutMS": server_selection_timeout_ms,
+        }
+        # A pre-built client is used as is in every process
+        self._client = client
+        self._owns_client = client is None
+        self._client_pid = None
+        self._client_lock = threading.Lock()
+
+        # Cached health, written only by check_now()/report_failure()
+        self._connected = None  # unknown until the first ping answers
+        self._status = "UNKNOWN"
+        self._last_ping_ms = None
+        self._checked_at = None
+        self._failures = 0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checker_pid = None
+        self._ensure_checking()
+
+    # ----------------------
+    # Client
+    # ----------------------
+    @property
+    def client(self):
+        # pymongo clients are not fork-safe: a forked worker builds its own
+        if self._owns_client and self._client_pid != os.getpid():
+            with self._client_lock:
+                if self._client_pid != os.getpid():
+                    self.pool_stats = PoolStats()
+                    self._client = MongoClient(self._uri, event_listeners=[self.pool_stats], **self._client_options)
+                    self._client_pid = os.getpid()
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[self.db_name]
+
+    @property
+    def collection(self):
+        return self.db[self.collection_name]
+
+    # ----------------------
+    # Health
+    # ----------------------
+    def check_now(self):
+        """Pings the server and updates the cached status. Returns (connected, status)."""
+        start = time.perf_counter()
+        try:
+            self.client.admin.command("ping")
+        except Exception as e:
+            self.report_failure(e)
+        else:
+            self._last_ping_ms = (time.perf_counter() - start) * 1000.0
+            self._connected, self._status = True, "SUCCESS"
+        self._checked_at = time.time()
+        return self._connected, self._status
+
+    def report_failure(self, error):
+        if self._connected is not False:
+            logger.error(f"MongoDB connection failed: {error}")
+        self._failures += 1
+        self._connected, self._status = False, str(error)
+
+    def status(self):
+        """(connected, status) from the last background ping, same shape as check_mongo_connection()."""
+        self._ensure_checking()
+        if self._connected is None:
+            # Nothing cached yet: the first caller pings instead of guessing
+            return self.check_now()
+        return self._connected, self._status
+
+    def health(self):
+        pool = self.pool_stats
+        capacity = self.max_pool_size * max(pool.pools, 1)
+        return {
+            "status": self._status,
+            "connected": self._connected,
+            "last_ping_ms": round(self._last_ping_ms, 2) if self._last_ping_ms is not None else None,
+            "checked_at": self._checked_at,
+            "failed_checks": self._failures,
+            "pool": {
+                "servers": pool.pools,
+                "max_pool_size": self.max_pool_size,
+                "open_connections": pool.open,
+                "in_use": pool.in_use,
+                "utilization": round(pool.in_use / capacity, 4),
+                "checkouts": pool.checkouts,
+                "checkout_failures": pool.checkout_failures,
+                "pool_clears": pool.clears,
+            },
+        }
+
+    # ----------------------
+    # Background checker
+    # ----------------------
+    def _ensure_checking(self):
+        # Started lazily per process, so forked workers get their own thread
+        if self.health_interval <= 0 or self._stop.is_set() or self._checker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._checker_pid == os.getpid():
+                return
+            self._checker_pid = os.getpid()
+            threading.Thread(target=self._run, name="mongo-health", daemon=True).start()
+
+    def _run(self):
+        while True:
+            self.check_now()
+            if self._stop.wait(self.health_interval):
+                return
+
+    def close(self):
+        self._stop.set()
+        if self._client is not None:
+            self._client.close()
+
+
+def mongo_from_env(**overrides):
+    """MongoConnectionManager configured from MONGO_URI / MONGO_MAX_POOL_SIZE / ..."""
+    options = {
+        "uri": os.environ.get("MONGO_URI", DEFAULT_URI),
+        "max_pool_size": int(os.environ.get("MONGO_MAX_POOL_SIZE", "50")),
+        "min_pool_size": int(os.environ.get("MONGO_MIN_POOL_SIZE", "2")),
+        "health_interval": float(os.environ.get("MONGO_HEALTH_INTERVAL", "10")),
+    }
+    options.update(overrides)
+    return MongoConnectionManager(**options)
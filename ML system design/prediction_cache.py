@@ -0,0 +1,212 @@
+# prediction_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from student_schema import NUMERIC_COLUMNS, REQUIRED_COLUMNS
+
+_NUMERIC = set(NUMERIC_COLUMNS)
+
+
+def model_file_hash(path):
+    """Short sha256 of a model file's bytes, used as its version identifier."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def canonical_key(record):
+    """
+    Hash of the REQUIRED_COLUMNS values of an (already default-filled) record.
+
+    Numeric fields are normalized to float so 17, 17.0 and "17" share a key.
+    Returns None when a column is missing, i.e. the record cannot be cached.
+    """
+    values = []
+    for col in REQUIRED_COLUMNS:
+        if col not in record:
+            return None
+        value = record[col]
+        if col in _NUMERIC:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                pass
+        values.append(value)
+
+    payload = json.dumps(values, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU + TTL cache of predictions keyed by `canonical_key()`.
+
+    The cache remembers the hash of `model_path` and clears itself when the
+    file's content changes (checked at most every `check_interval` seconds,
+    and only re-hashed when the file's mtime or size moved). Apps serving
+    from a ModelRegistry pass `version=` instead: entries are stored per
+    version and the cache clears when a lookup brings a version it has not
+    seen before. Lookups still carrying a replaced version (requests in
+    flight during a swap) just miss and do not clear the new version's entries.
+
+    Parameters:
+    maxsize (int): Entries kept before the least recently used is evicted
+    ttl (float): Seconds an entry stays valid (0 = no expiry)
+    model_path (str): Model file whose hash the cached predictions belong to
+    check_interval (float): Minimum seconds between model file checks
+    """
+
+    MISS = object()
+
+    def __init__(self, maxsize=10000, ttl=300, model_path=None, check_interval=5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.model_path = model_path
+        self.check_interval = check_interval
+
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+        self._model_stat = None
+        self._model_version = None
+        self._retired_versions = set()
+        self._next_check = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        if model_path:
+            self._model_stat = self._stat()
+            self._model_version = model_file_hash(model_path)
+
+    # ----------------------
+    # Lookups
+    # ----------------------
+    def get(self, key, version=None):
+        """Cached value for key, or PredictionCache.MISS."""
+        self._check_model()
+        if key is None:
+            return self.MISS
+        if version is not None:
+            self._check_version(version)
+            key = (version, key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return self.MISS
+            value, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return self.MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, version=None):
+        if key is None or self.maxsize <= 0:
+            return
+        if version is not None:
+            # A request still finishing on a replaced version does not clear;
+            # it just adds an entry that no new lookup will match
+            self._check_version(version)
+            key = (version, key)
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def predict(self, records, predict_fn, version=None):
+        """
+        Predictions for a list of records; only cache misses go to
+        `predict_fn(list_of_records)`, in a single call.
+        """
+        keys = [canonical_key(record) for record in records]
+        results = [self.get(key, version) for key in keys]
+
+        missing = [i for i, value in enumerate(results) if value is self.MISS]
+        if missing:
+            predictions = predict_fn([records[i] for i in missing])
+            for i, prediction in zip(missing, predictions):
+                results[i] = prediction
+                self.set(keys[i], prediction, version)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ----------------------
+    # Model invalidation
+    # ----------------------
+    def _stat(self):
+        try:
+            stat = os.stat(self.model_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _check_model(self):
+        if not self.model_path:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+
+        stat = self._stat()
+        if stat is None or stat == self._model_stat:
+            return
+        self._model_stat = stat
+        version = model_file_hash(self.model_path)
+        with self._lock:
+            # Keys are not versioned here, so any change of the file clears
+            if version != self._model_version:
+                self._switch_version(version)
+
+    def _check_version(self, version):
+        if version == self._model_version or version in self._retired_versions:
+            return
+        with self._lock:
+            if version == self._model_version or version in self._retired_versions:
+                return
+            self._switch_version(version)
+
+    def _switch_version(self, version):
+        # Called with the lock held
+        if self._model_version is not None:
+            self.invalidations += 1
+            self._retired_versions.add(self._model_version)
+        self._retired_versions.discard(version)
+        self._model_version = version
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "model_version": self._model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
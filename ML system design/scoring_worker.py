@@ -0,0 +1,408 @@
+"""
+Incremental scoring worker.
+
+Tails the `records` collection and keeps every student's stored score
+(see student_scoring.py) fresh, instead of re-batching the whole
+collection after each insert or update.
+
+    python scoring_worker.py                       # change stream, polling if unsupported
+    python scoring_worker.py --mode poll --poll-interval 2
+    python scoring_worker.py --metrics-port 9108   # Prometheus lag / throughput metrics
+
+Change-stream mode (replica sets / Atlas) micro-batches insert, replace and
+update events, scores each batch with one model call and saves the resume
+token after the batch is written, so a restart continues where it stopped.
+Poll mode (standalone mongod, local stand-ins) periodically scores the
+documents that have no score or a score from another model version, and
+sweeps the collection in pages to catch edited records.
+
+Both modes backfill stale documents at startup and whenever the model
+registry activates a new version. A document that fails to score is
+logged once and skipped until it is edited or a new model version is live.
+"""
+import argparse
+import logging
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from model_registry import registry_from_env
+from mongo_connection import mongo_from_env
+from student_scoring import SCORE_FIELD, record_hash, score_documents
+
+logger = logging.getLogger("scoring_worker")
+
+# Change-stream errors that mean the saved resume token can no longer be used
+_RESUME_TOKEN_LOST = {136, 260, 280, 286}  # CappedPositionLost, InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost
+
+# (_id, record_hash) of documents that failed to score, remembered so polls do not retry them
+MAX_FAILED_DOCUMENTS = int(os.environ.get("SCORING_MAX_FAILED_DOCUMENTS", "10000"))
+
+
+class ScoringWorker:
+    """
+    Keeps `scoring` up to date on the documents of `collection`.
+
+    Parameters:
+    collection (Collection): Student records
+    state_collection (Collection): Where the resume token and sweep cursor are saved
+    registry (ModelRegistry): Source of the current model version
+    name (str): State document id, one per worker deployment
+    mode (str): "auto", "change-stream" or "poll"
+    batch_size (int): Changed documents scored per model call
+    max_wait_ms (float): How long a partial batch waits for more changes
+    poll_interval (float): Seconds between polls (poll mode)
+    sweep_interval (float): Seconds between full record-hash sweeps (poll mode, 0 = never)
+    """
+
+    def __init__(self, collection, state_collection, registry, name="scoring-worker", mode="auto",
+                 batch_size=200, max_wait_ms=500.0, poll_interval=5.0, sweep_interval=300.0):
+        if mode not in ("auto", "change-stream", "poll"):
+            raise ValueError("mode must be auto, change-stream or poll")
+        self.collection = collection
+        self.state_collection = state_collection
+        self.registry = registry
+        self.name = name
+        self.mode = mode
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+
+        self._stop = threading.Event()
+        self._version = None
+        self._next_sweep = time.monotonic() + sweep_interval if sweep_interval else None
+        # Failed documents are skipped until their record changes or a new model version is live
+        self._failed = OrderedDict()
+
+        # Metrics
+        self.active_mode = None
+        self.events = 0
+        self.scored = 0
+        self.skipped = 0
+        self.batches = 0
+        self.errors = 0
+        self.lag_seconds = 0.0
+        self.last_batch_seconds = 0.0
+        self.token_saved_at = None
+        self._recent = deque()  # (monotonic time, documents) over the last minute
+
+    # ----------------------
+    # Public API
+    # ----------------------
+    def run(self):
+        """Runs until stop() is called."""
+        mode = self.mode
+        if mode in ("auto", "change-stream"):
+            try:
+                self._run_change_stream()
+                return
+            except (OperationFailure, NotImplementedError, TypeError) as e:
+                # Standalone servers and mongomock have no change streams
+                if mode == "change-stream":
+                    raise
+                logger.warning(f"Change streams unavailable ({e}); falling back to polling")
+        self._run_poll()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        now = time.monotonic()
+        while self._recent and self._recent[0][0] < now - 60:
+            self._recent.popleft()
+        window = now - self._recent[0][0] if self._recent else 0.0
+        recent_docs = sum(n for _, n in self._recent)
+        return {
+            "mode": self.active_mode,
+            "model_version": self._version,
+            "events": self.events,
+            "scored": self.scored,
+            "skipped_fresh": self.skipped,
+            "batches": self.batches,
+            "errors": self.errors,
+            "failed_documents": len(self._failed),
+            "lag_seconds": round(self.lag_seconds, 3),
+            "last_batch_seconds": round(self.last_batch_seconds, 4),
+            "throughput_docs_per_second": round(recent_docs / window, 1) if window > 0 else 0.0,
+            "resume_token_saved_at": self.token_saved_at,
+        }
+
+    def backfill(self):
+        """Scores every document without a score from the current model version."""
+        version = self.registry.current.version
+        if version != self._version:
+            self._failed.clear()
+        stale = {"$or": [{SCORE_FIELD: {"$exists": False}}, {f"{SCORE_FIELD}.model_version": {"$ne": version}}]}
+        total, after = 0, None
+        while not self._stop.is_set():
+            # Keyset paging, so documents that fail to score are not picked up again
+            query = {"$and": [stale, {"_id": {"$gt": after}}]} if after is not None else stale
+            docs = list(self.collection.find(query).sort("_id", 1).limit(self.batch_size))
+            if not docs:
+                break
+            total += self._score(docs)
+            after = docs[-1]["_id"]
+            if len(docs) < self.batch_size:
+                break
+        self._version = version
+        if total:
+            logger.info(f"Backfilled {total} documents for model version {version}")
+        return total
+
+    # ----------------------
+    # Change stream
+    # ----------------------
+    def _run_change_stream(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+        state = self._load_state()
+        token = state.get("resume_token")
+
+        while not self._stop.is_set():
+            options = {"full_document": "updateLookup", "max_await_time_ms": max(1, int(self.max_wait * 1000))}
+            if token:
+                options["resume_after"] = token
+            try:
+                with self.collection.watch(pipeline, **options) as stream:
+                    self.active_mode = "change-stream"
+                    logger.info(f"Watching changes ({'resuming' if token else 'from now'})")
+                    if not token:
+                        # Nothing to resume from: catch up on what changed while stopped
+                        self.backfill()
+                    saved, saved_at = token, time.monotonic()
+                    while not self._stop.is_set():
+                        self._check_model()
+                        batch, token = self._collect(stream, token)
+                        if batch:
+                            self._score(list(batch.values()))
+                        # Saved after the batch is written: a crash replays it, never skips it
+                        if token and token != saved and (batch or time.monotonic() - saved_at > 10):
+                            self._save_state(resume_token=token)
+                            saved, saved_at = token, time.monotonic()
+            except OperationFailure as e:
+                if e.code not in _RESUME_TOKEN_LOST or not token:
+                    raise
+                logger.error(f"Resume token is no longer valid ({e}); restarting from now")
+                token = None
+                self._save_state(resume_token=None)
+            except PyMongoError as e:
+                # Network blips: the driver resumes once by itself; back off and reopen
+                self.errors += 1
+                logger.error(f"Change stream failed: {e}")
+                self._stop.wait(min(self.poll_interval, 5.0))
+
+    def _collect(self, stream, token):
+        """Changed documents (latest version per _id) gathered for up to max_wait."""
+        batch = {}
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            change = stream.try_next()
+            token = stream.resume_token or token
+            if change is None:
+                if batch and time.monotonic() >= deadline:
+                    break
+                if not batch:
+                    self.lag_seconds = 0.0  # caught up
+                    return batch, token
+                continue
+            self.events += 1
+            self._record_lag(change)
+            if _only_touches_score(change):
+                continue  # our own write-back
+            doc = change.get("fullDocument")
+            if doc is not None:
+                batch[doc["_id"]] = doc
+        return batch, token
+
+    def _record_lag(self, change):
+        wall_time = change.get("wallTime")
+        if wall_time is not None:
+            if wall_time.tzinfo is None:
+                wall_time = wall_time.replace(tzinfo=timezone.utc)
+            self.lag_seconds = max(0.0, (datetime.now(timezone.utc) - wall_time).total_seconds())
+        elif change.get("clusterTime") is not None:
+            self.lag_seconds = max(0.0, time.time() - change["clusterTime"].time)
+
+    # ----------------------
+    # Polling fallback
+    # ----------------------
+    def _run_poll(self):
+        self.active_mode = "poll"
+        logger.info(f"Polling every {self.poll_interval}s")
+        while not self._stop.is_set():
+            try:
+                self.backfill()
+                if self._next_sweep is not None and time.monotonic() >= self._next_sweep:
+                    self._sweep()
+                    self._next_sweep = time.monotonic() + self.sweep_interval
+            except PyMongoError as e:
+                self.errors += 1
+                logger.error(f"Polling failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def _sweep(self):
+        """Pages through the collection by _id and rescores documents whose features changed."""
+        after = self._load_state().get("sweep_after")
+        while not self._stop.is_set():
+            query = {"_id": {"$gt": after}} if after is not None else {}
+            docs = list(self.collection.find(query).sort("_id", 1).limit(self.batch_size))
+            if not docs:
+                after = None
+                break
+            self._score(docs)
+            after = docs[-1]["_id"]
+            self._save_state(sweep_after=after)
+        self._save_state(sweep_after=after)
+
+    # ----------------------
+    # Helpers
+    # ----------------------
+    def _check_model(self):
+        if self.registry.current.version != self._version:
+            self.backfill()
+
+    def _score(self, docs):
+        mv = self.registry.current
+        start = time.perf_counter()
+        keys = {doc["_id"]: (doc["_id"], record_hash(doc)) for doc in docs}
+        docs = [doc for doc in docs if keys[doc["_id"]] not in self._failed]
+        if not docs:
+            return 0
+        try:
+            results = score_documents(self.collection, docs, mv)
+        except PyMongoError:
+            raise
+        except Exception as e:
+            # A bad document must not stall the stream: score the rest one by one
+            self.errors += 1
+            logger.error(f"Batch scoring failed, retrying one by one: {e}")
+            results = []
+            for doc in docs:
+                try:
+                    results.extend(score_documents(self.collection, [doc], mv))
+                except PyMongoError:
+                    raise
+                except Exception as doc_error:
+                    self.errors += 1
+                    self._remember_failed(keys[doc["_id"]])
+                    logger.error(f"Could not score {doc.get('_id')}: {doc_error}")
+
+        failed = [r for r in results if "error" in r]
+        if failed:
+            ids = {str(_id): key for _id, key in keys.items()}
+            for result in failed:
+                self.errors += 1
+                self._remember_failed(ids[result["_id"]])
+                logger.error(f"Could not score {result['_id']}: {result['details']}")
+        scored = sum(not r["cached"] for r in results if "error" not in r)
+        self.scored += scored
+        self.skipped += len(results) - len(failed) - scored
+        self.batches += 1
+        self.last_batch_seconds = time.perf_counter() - start
+        self._recent.append((time.monotonic(), scored))
+        return scored
+
+    def _remember_failed(self, key):
+        self._failed[key] = True
+        while len(self._failed) > MAX_FAILED_DOCUMENTS:
+            self._failed.popitem(last=False)
+
+    def _load_state(self):
+        return self.state_collection.find_one({"_id": self.name}) or {}
+
+    def _save_state(self, **fields):
+        fields["updated_at"] = datetime.now(timezone.utc)
+        self.state_collection.update_one({"_id": self.name}, {"$set": fields}, upsert=True)
+        if "resume_token" in fields:
+            self.token_saved_at = fields["updated_at"].isoformat()
+
+
+def _only_touches_score(change):
+    if change.get("operationType") != "update":
+        return False
+    description = change.get("updateDescription") or {}
+    fields = list(description.get("updatedFields", {})) + list(description.get("removedFields", []))
+    return bool(fields) and all(field == SCORE_FIELD or field.startswith(SCORE_FIELD + ".") for field in fields)
+
+
+# ----------------------
+# Metrics
+# ----------------------
+def start_metrics_server(worker, port, interval=5.0):
+    """Exposes worker.stats() on `port`: running totals as Prometheus counters, the rest as gauges."""
+    from prometheus_client import Counter, Gauge, start_http_server
+
+    gauges = {
+        "lag_seconds": Gauge("scoring_worker_lag_seconds", "Age of the last change when it was read"),
+        "throughput_docs_per_second": Gauge("scoring_worker_throughput_docs_per_second",
+                                            "Documents scored per second over the last minute"),
+        "last_batch_seconds": Gauge("scoring_worker_last_batch_seconds", "Duration of the last scoring batch"),
+    }
+    counters = {
+        "events": Counter("scoring_worker_events_total", "Change events read"),
+        "scored": Counter("scoring_worker_scored_total", "Documents scored"),
+        "skipped_fresh": Counter("scoring_worker_skipped_fresh_total", "Documents whose stored score was still fresh"),
+        "errors": Counter("scoring_worker_errors_total", "Scoring and connection errors"),
+    }
+    reported = dict.fromkeys(counters, 0)
+
+    def update():
+        while True:
+            stats = worker.stats()
+            for key, gauge in gauges.items():
+                gauge.set(stats[key])
+            # The worker keeps running totals; counters advance by what was added since the last read
+            for key, counter in counters.items():
+                counter.inc(stats[key] - reported[key])
+                reported[key] = stats[key]
+            time.sleep(interval)
+
+    start_http_server(port)
+    threading.Thread(target=update, name="scoring-metrics", daemon=True).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep stored student scores fresh")
+    parser.add_argument("--mode", choices=["auto", "change-stream", "poll"], default=os.environ.get("SCORING_MODE", "auto"))
+    parser.add_argument("--name", default="scoring-worker", help="State document id (one per deployment)")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--max-wait-ms", type=float, default=500.0)
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--sweep-interval", type=float, default=300.0, help="Seconds between record-hash sweeps (poll mode, 0 = never)")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port")
+    parser.add_argument("--stats-interval", type=float, default=60.0, help="Seconds between stats log lines")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    mongo = mongo_from_env()
+    worker = ScoringWorker(
+        mongo.collection, mongo.db["scoring_worker_state"], registry_from_env(),
+        name=args.name, mode=args.mode, batch_size=args.batch_size, max_wait_ms=args.max_wait_ms,
+        poll_interval=args.poll_interval, sweep_interval=args.sweep_interval,
+    )
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: worker.stop())
+
+    if args.metrics_port:
+        start_metrics_server(worker, args.metrics_port)
+
+    def log_stats():
+        while not worker._stop.wait(args.stats_interval):
+            logger.info(f"stats {worker.stats()}")
+
+    threading.Thread(target=log_stats, name="scoring-stats", daemon=True).start()
+    try:
+        worker.run()
+    finally:
+        logger.info(f"stopped {worker.stats()}")
+        mongo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Pre-fork production launcher for the Flask and FastAPI apps in this folder.
+
+The app module (and with it performance_pipeline.pkl) is imported once in
+the master process, then gunicorn forks the workers. The model arrays are
+shared copy-on-write between all workers instead of being loaded N times.
+
+    python serve.py app:app --workers 4 --bind 0.0.0.0:5000
+    python serve.py "student_service:create_app()" --workers 4 --bind 0.0.0.0:5000
+    python serve.py student_api:app --workers 4 --bind 0.0.0.0:8000
+
+FastAPI apps are detected and run with uvicorn's gunicorn worker.
+"""
+import argparse
+import gc
+import importlib
+import inspect
+import logging
+import os
+import threading
+import time
+
+from gunicorn.app.base import BaseApplication
+
+logger = logging.getLogger("serve")
+
+ASGI_WORKER = "uvicorn.workers.UvicornWorker"
+
+
+# ----------------------
+# Memory reporting
+# ----------------------
+def read_memory(pid, path=None):
+    """
+    RSS / PSS / shared / private memory of a process in MB (Linux /proc only).
+
+    Parameters:
+    pid (int): Process to report on
+    path (str): smaps_rollup file to parse instead of /proc/<pid>/smaps_rollup
+    """
+    fields = {}
+    try:
+        with open(path or f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024.0
+    except OSError:
+        return None
+
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "shared_mb": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+        "private_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def format_memory(memory):
+    if memory is None:
+        return "memory unavailable"
+    return ("rss={rss_mb:.1f}MB pss={pss_mb:.1f}MB shared={shared_mb:.1f}MB "
+            "private={private_mb:.1f}MB".format(**memory))
+
+
+def report_workers(arbiter):
+    """Logs memory of the master and every live worker."""
+    logger.info(f"master pid={os.getpid()} {format_memory(read_memory(os.getpid()))}")
+    total_pss = 0.0
+    for pid, worker in list(arbiter.WORKERS.items()):
+        memory = read_memory(pid)
+        if memory is not None:
+            total_pss += memory["pss_mb"]
+        logger.info(f"worker {worker.age} pid={pid} {format_memory(memory)}")
+    logger.info(f"workers={len(arbiter.WORKERS)} total_pss={total_pss:.1f}MB")
+
+
+# ----------------------
+# Gunicorn hooks
+# ----------------------
+def make_hooks(report_interval, max_worker_private_mb):
+    def when_ready(arbiter):
+        if report_interval <= 0:
+            return
+
+        def loop():
+            while True:
+                time.sleep(report_interval)
+                report_workers(arbiter)
+
+        threading.Thread(target=loop, name="rss-reporter", daemon=True).start()
+
+    def post_fork(arbiter, worker):
+        logger.info(f"worker {worker.age} forked pid={worker.pid}")
+
+    def post_request(worker, req, environ, resp):
+        # Recycle a worker gracefully once copy-on-write has un-shared too much memory
+        if max_worker_private_mb <= 0 or worker.nr % 100:
+            return
+        memory = read_memory(os.getpid())
+        if memory is not None and memory["private_mb"] > max_worker_private_mb:
+            logger.warning(f"worker pid={os.getpid()} private={memory['private_mb']:.1f}MB "
+                           f"> {max_worker_private_mb}MB, recycling")
+            worker.alive = False
+
+    def child_exit(arbiter, worker):
+        logger.info(f"worker {worker.age} pid={worker.pid} exited")
+
+    return {
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+        "post_request": post_request,
+        "child_exit": child_exit,
+    }
+
+
+# ----------------------
+# Application
+# ----------------------
+def load_app(spec):
+    """module:attr, or module:factory() to call an app factory (student_service:create_app())."""
+    module_name, _, attr = spec.partition(":")
+    factory = attr.endswith("()")
+    app = getattr(importlib.import_module(module_name), attr[:-2] if factory else attr or "app")
+    return app() if factory else app
+
+
+def is_asgi(app):
+    return inspect.iscoroutinefunction(getattr(app, "__call__", None))
+
+
+class PreforkApplication(BaseApplication):
+    def __init__(self, app, options):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork launcher with a shared, pre-loaded model")
+    parser.add_argument("app", help="module:attr of the Flask or FastAPI app, e.g. app:app")
+    parser.add_argument("--bind", default=os.environ.get("BIND", "0.0.0.0:5000"))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--worker-class", default=None, help="defaults to sync for WSGI, uvicorn for ASGI")
+    parser.add_argument("--max-requests", type=int, default=10000,
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=1000,
+                        help="random extra requests so workers do not all recycle at once")
+    parser.add_argument("--graceful-timeout", type=int, default=30)
+    parser.add_argument("--timeout", type=int, default=30)
+    parser.add_argument("--max-worker-private-mb", type=float, default=0,
+                        help="recycle a worker whose private (un-shared) memory exceeds this (0 = off)")
+    parser.add_argument("--rss-report-interval", type=float, default=60,
+                        help="seconds between per-worker memory reports (0 = off)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    # Load the app (and the model) once, in the master
+    app = load_app(args.app)
+    worker_class = args.worker_class or (ASGI_WORKER if is_asgi(app) else "sync")
+
+    # Move everything loaded so far out of the GC's reach so collections in
+    # the workers do not touch (and un-share) the pre-loaded model pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"pre-loaded {args.app} in master pid={os.getpid()} {format_memory(read_memory(os.getpid()))}")
+
+    options = {
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": worker_class,
+        "preload_app": True,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        "graceful_timeout": args.graceful_timeout,
+        "timeout": args.timeout,
+        **make_hooks(args.rss_report_interval, args.max_worker_private_mb),
+    }
+    PreforkApplication(app, options).run()
+
+
+if __name__ == "__main__":
+    main()
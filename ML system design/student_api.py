@@ -1,149 +1,171 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import pandas as pd
-import joblib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import Body, FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+import logging
+import os
+from typing import Optional
 
-# Load your trained pipeline (must be a fitted pipeline)
+from explainer import engine_from_env
+from fast_json import FastJSONResponse, FastJSONRoute
+from micro_batching import MicroBatcher, QueueFull
+from model_registry import registry_from_env
+from prediction_cache import PredictionCache, canonical_key
+from student_schema import STUDENT_SCHEMA
+
+# Load your trained pipeline (must be a fitted pipeline); the registry
+# hot-swaps newer files in MODEL_DIR without a restart
 try:
-    model = joblib.load("performance_pipeline.pkl")
+    registry = registry_from_env()
 except Exception as e:
     raise RuntimeError(f"Error loading model: {e}")
 
-# Define input schema
-class StudentData(BaseModel):
-    school: str
-    sex: str
-    age: int
-    address: str
-    famsize: str
-    Pstatus: str
-    Medu: int
-    Fedu: int
-    Mjob: str
-    Fjob: str
-    reason: str
-    guardian: str
-    traveltime: int
-    studytime: int
-    failures: int
-    schoolsup: str
-    famsup: str
-    paid: str
-    activities: str
-    nursery: str
-    higher: str
-    internet: str
-    romantic: str
-    famrel: int
-    freetime: int
-    goout: int
-    Dalc: int
-    Walc: int
-    health: int
-    absences: int
-    G1: int
-    G2: int
-    G3: int
-    dataset: str
+# Micro-batching: concurrent requests share one model.predict call
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "32"))
+MAX_BATCH_WAIT_MS = float(os.environ.get("MAX_BATCH_WAIT_MS", "5"))
 
-# Initialize FastAPI app
-app = FastAPI(title="Student Pass Prediction API")
+# Worker pool for the CPU-bound model call ("thread" or "process")
+WORKER_POOL = os.environ.get("WORKER_POOL", "thread")
+WORKER_POOL_SIZE = int(os.environ.get("WORKER_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
 
-@app.get("/")
-def read_root():
-    return {"message": "Student Pass Prediction API is running"}
+# Backpressure: requests allowed to wait before new ones get a 503
+MAX_QUEUE_SIZE = int(os.environ.get("MAX_QUEUE_SIZE", "1024"))
+RETRY_AFTER_SECONDS = "1"
 
-@app.post("/predict")
-def predict(student: StudentData):
-    try:
-        # Convert input to DataFrame
-        df = pd.DataFrame([student.dict()])
-        
-        # DEBUG: print DataFrame received
-        print("DataFrame for prediction:\n", df)
-        
-        # Make prediction
-        prediction = model.predict(df)
-        
-        return {"passed": int(prediction[0])}
-    
-    except Exception as e:
-        # DEBUG: print exact error in terminal
-        print("Prediction error:", e)
-        # Return JSON error
-        raise HTTPException(status_code=500, detail=f"Prediction error: {e}")
+def require_model():
+    # The event loop must never wait for a background load (MODEL_LOAD_ASYNC=1)
+    if not registry.ready:
+        raise HTTPException(status_code=503, detail=f"Model not ready: {registry.status()}",
+                            headers={"Retry-After": RETRY_AFTER_SECONDS})
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import pandas as pd
-import joblib
+def validate_student(student):
+    # Same compiled schema as the Flask service: types, ranges, allowed values, defaults
+    result = STUDENT_SCHEMA.validate(student)
+    if not result.ok:
+        raise HTTPException(status_code=422, detail={"error": "Validation failed", "details": result.errors})
+    return result.records()[0]
 
-# Load your trained pipeline (must be a fitted pipeline)
-try:
-    model = joblib.load("performance_pipeline.pkl")
-except Exception as e:
-    raise RuntimeError(f"Error loading model: {e}")
+def current_model():
+    # Resolved on the event loop when a batch is dispatched
+    mv = registry.current
+    return (mv.version, mv.path)
+
+def predict_batch(version, path, records):
+    # Looked up by version so process-pool workers forked before a swap still serve it
+    mv = registry.get(version, path)
+    return [(int(p), mv.version) for p in mv.predictor.predict(records)]
+
+def create_executor(kind, size):
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=size)
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=size, thread_name_prefix="predict")
+    raise ValueError(f"WORKER_POOL must be 'thread' or 'process', got {kind!r}")
+
+# Cache of recent predictions, cleared when the model version changes
+cache = PredictionCache(
+    maxsize=int(os.environ.get("PREDICTION_CACHE_SIZE", "10000")),
+    ttl=float(os.environ.get("PREDICTION_CACHE_TTL", "300")),
+)
 
-# Define input schema
-class StudentData(BaseModel):
-    school: str
-    sex: str
-    age: int
-    address: str
-    famsize: str
-    Pstatus: str
-    Medu: int
-    Fedu: int
-    Mjob: str
-    Fjob: str
-    reason: str
-    guardian: str
-    traveltime: int
-    studytime: int
-    failures: int
-    schoolsup: str
-    famsup: str
-    paid: str
-    activities: str
-    nursery: str
-    higher: str
-    internet: str
-    romantic: str
-    famrel: int
-    freetime: int
-    goout: int
-    Dalc: int
-    Walc: int
-    health: int
-    absences: int
-    G1: int
-    G2: int
-    G3: int
-    dataset: str
+# SHAP explanations: one explainer per model version on a fixed background sample,
+# built on the first /explain request so importing the app reads no data files
+explanations = None
+
+def get_explanations():
+    # Called on the event loop, so only one request ever builds the engine
+    global explanations
+    if explanations is None:
+        explanations = engine_from_env()
+    return explanations
+
+executor = create_executor(WORKER_POOL, WORKER_POOL_SIZE)
+batcher = MicroBatcher(
+    predict_batch,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=MAX_BATCH_WAIT_MS,
+    executor=executor,
+    max_concurrency=WORKER_POOL_SIZE,
+    max_queue_size=MAX_QUEUE_SIZE,
+    context_fn=current_model,
+)
 
 # Initialize FastAPI app
-app = FastAPI(title="Student Pass Prediction API")
+# orjson for response bodies (numpy values encode natively) and request bodies
+app = FastAPI(title="Student Pass Prediction API", default_response_class=FastJSONResponse)
+app.router.route_class = FastJSONRoute
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
+    executor.shutdown(wait=False, cancel_futures=True)
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Student Pass Prediction API is running"}
 
+@app.get("/ready")
+async def readiness():
+    # Readiness probe: green once the model is loaded and warmed up
+    if not registry.ready:
+        return FastJSONResponse({"ready": False, "model": registry.status()}, status_code=503)
+    return {"ready": True, "model_version": registry.current.version}
+
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "batching": batcher.stats(),
+        "worker_pool": {"kind": WORKER_POOL, "size": WORKER_POOL_SIZE},
+        "prediction_cache": cache.stats(),
+    }
+
+@app.get("/model")
+async def get_model():
+    return registry.info()
+
+@app.post("/model/rollback")
+async def rollback_model():
+    try:
+        mv = registry.rollback()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"model_version": mv.version}
+
 @app.post("/predict")
-def predict(student: StudentData):
+async def predict(student: dict = Body(...)):
+    # Parsing and validation happen here on the event loop; only the
+    # model call is handed to the worker pool by the batcher
+    require_model()
+    record = validate_student(student)
     try:
-        # Convert input to DataFrame
-        df = pd.DataFrame([student.dict()])
-        
-        # DEBUG: print DataFrame received
-        print("DataFrame for prediction:\n", df)
-        
-        # Make prediction
-        prediction = model.predict(df)
-        
-        return {"passed": int(prediction[0])}
-    
+        key = canonical_key(record)
+        version = registry.current.version
+        prediction = cache.get(key, version)
+        if prediction is PredictionCache.MISS:
+            prediction, version = await batcher.submit(record)
+            cache.set(key, prediction, version)
+        return {"passed": prediction, "model_version": version}
+
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": RETRY_AFTER_SECONDS})
+
     except Exception as e:
-        # DEBUG: print exact error in terminal
-        print("Prediction error:", e)
+        logging.error(f"Prediction error: {e}")
         # Return JSON error
         raise HTTPException(status_code=500, detail=f"Prediction error: {e}")
+
+@app.post("/explain")
+async def explain(student: dict = Body(...), top: Optional[int] = None):
+    # Attributions are in log-odds of passing for the linear explainer; the
+    # explainer for a new model version is built on its first request
+    require_model()
+    record = validate_student(student)
+    try:
+        mv = registry.current
+        result = await run_in_threadpool(get_explanations().explain, mv, [record], top)
+        return {"model_version": result["model_version"], "explainer": result["explainer"],
+                **result["explanations"][0]}
+
+    except Exception as e:
+        logging.error(f"Explanation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Explanation error: {e}")
+
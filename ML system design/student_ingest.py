@@ -0,0 +1,216 @@
+# student_ingest.py
+import csv
+import io
+import os
+import time
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+import fast_json
+from student_schema import REQUIRED_COLUMNS, CompiledSchema
+
+# Rows per insert_many call, and the most a client may ask for
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "1000"))
+MAX_INGEST_BATCH_SIZE = 10000
+# Per-row errors kept in the summary (the counts are always exact)
+MAX_REPORTED_ERRORS = int(os.environ.get("INGEST_MAX_REPORTED_ERRORS", "1000"))
+
+FORMATS = ("csv", "jsonl")
+DATASETS = ("math", "portuguese")
+
+
+# Same types, ranges and allowed values as the prediction and scoring paths
+# (STUDENT_SCHEMA), but a stored record must have every field
+INGEST_SCHEMA = CompiledSchema(required=REQUIRED_COLUMNS)
+
+
+class IngestError(ValueError):
+    """Invalid bulk ingestion parameters (reported as a 400)."""
+
+
+# ----------------------
+# Row readers
+# ----------------------
+def iter_csv_rows(lines):
+    """Yields (line, row, error) for each CSV record; `lines` is any iterable of str lines."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, None, f"Expected {len(reader.fieldnames)} fields, got {len(row) - 1 + len(row[None])}"
+            continue
+        yield reader.line_num, row, None
+
+
+def iter_jsonl_rows(lines):
+    """Yields (line, row, error) for each non-blank JSON Lines record."""
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = fast_json.loads(line)
+        except ValueError as e:
+            yield line_num, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_num, None, "Expected a JSON object"
+            continue
+        yield line_num, row, None
+
+
+def read_rows(lines, fmt):
+    if fmt == "csv":
+        return iter_csv_rows(lines)
+    return iter_jsonl_rows(lines)
+
+
+def format_for_path(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+# ----------------------
+# Validation
+# ----------------------
+def validate_rows(rows, defaults=None):
+    """
+    Validates a batch of rows against INGEST_SCHEMA in one columnar pass.
+
+    Returns one (document, None) or (None, error message) per row, in order.
+    """
+    if defaults:
+        rows = [{**defaults, **{k: v for k, v in row.items() if v not in (None, "")}} for row in rows]
+    result = INGEST_SCHEMA.validate(rows)
+    errors = {e["index"]: "; ".join(f"{col}: {message}" for col, message in e["errors"].items())
+              for e in result.errors}
+    documents = iter(result.records())
+    return [(None, errors[i]) if i in errors else (next(documents), None) for i in range(len(rows))]
+
+
+def validate_row(row, defaults=None):
+    """validate_rows() for a single row: (document, None) or (None, error message)."""
+    return validate_rows([row], defaults)[0]
+
+
+# ----------------------
+# Ingestion
+# ----------------------
+def ingest(collection, rows, batch_size=INGEST_BATCH_SIZE, defaults=None):
+    """
+    Validates `rows` ((line, row, error) tuples from read_rows()) against
+    INGEST_SCHEMA, `batch_size` at a time, and inserts the valid ones with one
+    unordered insert_many call per batch.
+
+    A bad row (schema error, duplicate key, ...) is reported by its line
+    number and never stops the rest of its batch. Only a connection level
+    failure aborts the run; the summary then says so in "aborted".
+
+    Parameters:
+    collection (Collection): Target MongoDB collection
+    rows (iterable): (line, row, error) tuples
+    batch_size (int): Documents per insert_many call
+    defaults (dict): Values used for missing or empty fields (e.g. {"dataset": "math"})
+    """
+    summary = {
+        "received": 0,
+        "inserted": 0,
+        "failed": 0,
+        "batches": 0,
+        "errors": [],
+        "errors_truncated": False,
+        "aborted": None,
+    }
+
+    def record_error(line, error):
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line, "error": error})
+        else:
+            summary["errors_truncated"] = True
+
+    def validated(pending):
+        batch = []
+        for (line, _), (doc, error) in zip(pending, validate_rows([row for _, row in pending], defaults)):
+            if error is not None:
+                record_error(line, error)
+            else:
+                batch.append((line, doc))
+        return batch
+
+    def flush(batch):
+        if not batch:
+            return
+        summary["batches"] += 1
+        try:
+            result = collection.insert_many([doc for _, doc in batch], ordered=False)
+            summary["inserted"] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered: every document without a write error was inserted
+            summary["inserted"] += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                record_error(batch[write_error["index"]][0], write_error.get("errmsg", "Write failed"))
+
+    start = time.perf_counter()
+    pending = []  # (line, row) parsed but not yet validated and inserted
+    batch = []
+    try:
+        for line, row, error in rows:
+            summary["received"] += 1
+            if error is not None:
+                record_error(line, error)
+                continue
+            pending.append((line, row))
+            if len(pending) >= batch_size:
+                batch, pending = validated(pending), []
+                flush(batch)
+        if pending:
+            batch, pending = validated(pending), []
+            flush(batch)
+    except PyMongoError as e:
+        summary["aborted"] = str(e)
+        for line, _ in batch:
+            record_error(line, "Not inserted: ingestion aborted")
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = round(elapsed, 4)
+    summary["rows_per_second"] = round(summary["inserted"] / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+# ----------------------
+# Flask request
+# ----------------------
+def body_lines(req, buffer_size=64 * 1024):
+    """
+    Lines (bytes) of a streamed Flask request body. Iterating req.stream
+    directly reads it one byte at a time; the buffer reads it in blocks.
+    """
+    return io.BufferedReader(req.stream, buffer_size)
+
+
+def ingest_request(collection, req):
+    """
+    Runs ingest() on a Flask request body streamed as CSV (Content-Type
+    text/csv or ?format=csv) or JSON Lines (default). Optional query args:
+    batch_size, dataset (default for rows without one). Raises IngestError.
+    """
+    fmt = req.args.get("format")
+    if fmt is None:
+        fmt = "csv" if req.mimetype == "text/csv" else "jsonl"
+    if fmt not in FORMATS:
+        raise IngestError(f"format must be one of {', '.join(FORMATS)}")
+
+    batch_size = req.args.get("batch_size", INGEST_BATCH_SIZE)
+    try:
+        batch_size = int(batch_size)
+    except ValueError:
+        raise IngestError("batch_size must be an integer")
+    if not 1 <= batch_size <= MAX_INGEST_BATCH_SIZE:
+        raise IngestError(f"batch_size must be between 1 and {MAX_INGEST_BATCH_SIZE}")
+
+    dataset = req.args.get("dataset")
+    if dataset is not None and dataset not in DATASETS:
+        raise IngestError(f"dataset must be one of {', '.join(DATASETS)}")
+    defaults = {"dataset": dataset} if dataset else None
+
+    # Decode line by line so the body is never held in memory as a whole
+    lines = (line.decode("utf-8-sig") for line in body_lines(req))
+    return ingest(collection, read_rows(lines, fmt), batch_size, defaults)
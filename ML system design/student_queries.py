@@ -0,0 +1,137 @@
+# student_queries.py
+import os
+import re
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from flask import Response, stream_with_context
+
+import fast_json
+
+# Server-side limits protecting the API process and the database
+DEFAULT_PAGE_SIZE = int(os.environ.get("STUDENTS_DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.environ.get("STUDENTS_MAX_PAGE_SIZE", "1000"))
+MAX_STREAM_LIMIT = int(os.environ.get("STUDENTS_MAX_STREAM_LIMIT", "100000"))
+MAX_FIELDS = 64
+CURSOR_BATCH_SIZE = 500
+QUERY_MAX_TIME_MS = int(os.environ.get("STUDENTS_QUERY_MAX_TIME_MS", "10000"))
+
+FORMATS = ("json", "ndjson", "json-stream")
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class QueryError(ValueError):
+    """Invalid /students query parameters (reported as a 400)."""
+
+
+# ----------------------
+# Query parsing
+# ----------------------
+def parse_students_query(args):
+    """
+    Parses `after`, `limit`, `fields` and `format` from request args.
+
+    after:  _id of the last student of the previous page (keyset cursor)
+    limit:  page size, capped at MAX_PAGE_SIZE (MAX_STREAM_LIMIT when streaming)
+    fields: comma-separated field names to return (_id is always included)
+    format: json (one page), ndjson or json-stream (streamed)
+    """
+    fmt = args.get("format", "json")
+    if fmt not in FORMATS:
+        raise QueryError(f"format must be one of {', '.join(FORMATS)}")
+    streaming = fmt != "json"
+
+    after = args.get("after")
+    if after:
+        try:
+            after = ObjectId(after)
+        except (InvalidId, TypeError):
+            raise QueryError("Invalid cursor in 'after'")
+    else:
+        after = None
+
+    cap = MAX_STREAM_LIMIT if streaming else MAX_PAGE_SIZE
+    limit = args.get("limit")
+    if limit is None or limit == "":
+        limit = cap if streaming else DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise QueryError("limit must be an integer")
+        if limit < 1:
+            raise QueryError("limit must be >= 1")
+        limit = min(limit, cap)
+
+    fields = args.get("fields")
+    if fields:
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+        if len(fields) > MAX_FIELDS:
+            raise QueryError(f"At most {MAX_FIELDS} fields can be requested")
+        bad = [f for f in fields if not _FIELD_NAME.match(f)]
+        if bad:
+            raise QueryError(f"Invalid field names: {bad}")
+    else:
+        fields = None
+
+    return {"after": after, "limit": limit, "fields": fields, "format": fmt}
+
+
+# ----------------------
+# Queries
+# ----------------------
+def find_students(collection, after=None, limit=DEFAULT_PAGE_SIZE, fields=None, filter=None):
+    """Cursor over students (matching `filter`) in _id order, starting after the `after` cursor."""
+    query = {"_id": {"$gt": after}} if after is not None else {}
+    if filter:
+        query = {"$and": [filter, query]} if query else filter
+    projection = {field: 1 for field in fields} if fields else None
+    return (
+        collection.find(query, projection)
+        .sort("_id", 1)
+        .limit(limit)
+        .batch_size(min(limit, CURSOR_BATCH_SIZE))
+        .max_time_ms(QUERY_MAX_TIME_MS)
+    )
+
+
+def find_students_page(collection, after=None, limit=DEFAULT_PAGE_SIZE, fields=None):
+    """One page of students plus the cursor for the next page (None on the last page)."""
+    students = list(find_students(collection, after, limit, fields))
+    next_cursor = str(students[-1]["_id"]) if len(students) == limit else None
+    return students, next_cursor
+
+
+def stream_students(cursor, fmt):
+    """Yields the cursor's documents as NDJSON lines or as chunks of one JSON array."""
+    if fmt == "ndjson":
+        for student in cursor:
+            yield fast_json.dumps(student) + b"\n"
+        return
+
+    # ObjectId and other BSON values are encoded by fast_json, no per-document conversion
+    yield b"["
+    first = True
+    for student in cursor:
+        yield (b"" if first else b",") + fast_json.dumps(student)
+        first = False
+    yield b"]"
+
+
+# ----------------------
+# Flask response
+# ----------------------
+def students_response(collection, args):
+    """Flask response for GET /students. Raises QueryError on bad parameters."""
+    query = parse_students_query(args)
+
+    if query["format"] == "json":
+        students, next_cursor = find_students_page(collection, query["after"], query["limit"], query["fields"])
+        response = Response(fast_json.dumps(students), mimetype="application/json")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+
+    cursor = find_students(collection, query["after"], query["limit"], query["fields"])
+    mimetype = "application/x-ndjson" if query["format"] == "ndjson" else "application/json"
+    return Response(stream_with_context(stream_students(cursor, query["format"])), mimetype=mimetype)
@@ -0,0 +1,277 @@
+# student_schema.py
+# Feature columns and the input schema shared by the prediction APIs
+import os
+from itertools import repeat
+from operator import itemgetter
+
+import numpy as np
+from pydantic import BaseModel
+
+# Numeric features (scaled by the pipeline)
+NUMERIC_COLUMNS = [
+    "age", "Medu", "Fedu", "traveltime", "studytime", "failures", "famrel",
+    "freetime", "goout", "Dalc", "Walc", "health", "absences", "G1", "G2", "G3"
+]
+
+# Categorical features (one-hot encoded by the pipeline)
+CATEGORICAL_COLUMNS = [
+    "school", "sex", "address", "famsize", "Pstatus", "Mjob", "Fjob", "reason",
+    "guardian", "schoolsup", "famsup", "paid", "activities", "nursery", "higher",
+    "internet", "romantic", "dataset"
+]
+
+# Required columns your model expects
+REQUIRED_COLUMNS = [
+    "school", "sex", "age", "address", "Medu", "Fedu",
+    "higher", "romantic", "dataset", "Fjob", "activities",
+    "Walc", "health", "Mjob", "freetime", "failures", "goout",
+    "schoolsup", "G2", "nursery", "Pstatus", "traveltime",
+    "studytime", "G3", "famsize", "paid", "guardian", "Dalc",
+    "internet", "famsup", "absences", "G1", "reason", "famrel"
+]
+
+# Default values for missing columns
+DEFAULTS = {col: 0 if col in NUMERIC_COLUMNS else "none" for col in REQUIRED_COLUMNS}
+
+# Valid ranges and values, from the UCI student performance data description
+NUMERIC_RANGES = {
+    "age": (15, 22), "Medu": (0, 4), "Fedu": (0, 4), "traveltime": (1, 4),
+    "studytime": (1, 4), "failures": (0, 4), "famrel": (1, 5), "freetime": (1, 5),
+    "goout": (1, 5), "Dalc": (1, 5), "Walc": (1, 5), "health": (1, 5),
+    "absences": (0, 93), "G1": (0, 20), "G2": (0, 20), "G3": (0, 20),
+}
+_YES_NO = ("yes", "no")
+_JOBS = ("teacher", "health", "services", "at_home", "other")
+CATEGORY_VALUES = {
+    "school": ("GP", "MS"), "sex": ("F", "M"), "address": ("U", "R"),
+    "famsize": ("LE3", "GT3"), "Pstatus": ("T", "A"), "Mjob": _JOBS, "Fjob": _JOBS,
+    "reason": ("home", "reputation", "course", "other"), "guardian": ("mother", "father", "other"),
+    "schoolsup": _YES_NO, "famsup": _YES_NO, "paid": _YES_NO, "activities": _YES_NO,
+    "nursery": _YES_NO, "higher": _YES_NO, "internet": _YES_NO, "romantic": _YES_NO,
+    "dataset": ("math", "portuguese"),
+}
+
+
+def dataset_for_path(path):
+    """Guesses the `dataset` column from file names like student_mat.csv / student_por.csv."""
+    name = os.path.basename(path).lower()
+    if "mat" in name:
+        return "math"
+    if "por" in name:
+        return "portuguese"
+    return None
+
+
+# Input schema for one student record
+class StudentData(BaseModel):
+    school: str
+    sex: str
+    age: int
+    address: str
+    famsize: str
+    Pstatus: str
+    Medu: int
+    Fedu: int
+    Mjob: str
+    Fjob: str
+    reason: str
+    guardian: str
+    traveltime: int
+    studytime: int
+    failures: int
+    schoolsup: str
+    famsup: str
+    paid: str
+    activities: str
+    nursery: str
+    higher: str
+    internet: str
+    romantic: str
+    famrel: int
+    freetime: int
+    goout: int
+    Dalc: int
+    Walc: int
+    health: int
+    absences: int
+    G1: int
+    G2: int
+    G3: int
+    dataset: str
+
+
+# ----------------------
+# Batch validation
+# ----------------------
+class ValidationResult:
+    """
+    Outcome of CompiledSchema.validate for a batch.
+
+    columns: column name -> array over all rows (int64 for numeric columns,
+    object for categorical ones), defaults filled in; `valid` is the row mask
+    and `errors` one {"index": i, "errors": {column: message}} per bad row.
+    """
+
+    def __init__(self, columns, valid, errors):
+        self.columns = columns
+        self.valid = valid
+        self.errors = errors
+
+    def __len__(self):
+        return len(self.valid)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def model_columns(self, valid_only=True):
+        """Column name -> array, for `predict_columns` (no per-record dicts built)."""
+        if not valid_only or self.ok:
+            return dict(self.columns)
+        return {name: values[self.valid] for name, values in self.columns.items()}
+
+    def records(self, valid_only=True):
+        """Model input dicts (REQUIRED_COLUMNS only), built once from the columns."""
+        names = list(self.columns)
+        rows = np.flatnonzero(self.valid) if valid_only else np.arange(len(self.valid))
+        values = [self.columns[name][rows].tolist() for name in names]
+        return list(map(dict, map(zip, repeat(names), zip(*values))))
+
+
+class CompiledSchema:
+    """
+    Validates, coerces and default-fills a whole batch of records column by
+    column. The schema (types, ranges, allowed values, defaults) is turned
+    into NumPy lookups once; validating a batch is then one pass per column
+    instead of per-record, per-field Python checks.
+
+    Numeric fields take integers, integral floats and numeric strings. A
+    missing or null field gets its default unless it is in `required`;
+    default values are not range-checked.
+
+    Parameters:
+    defaults (dict): Fill values for missing fields (default: DEFAULTS)
+    required (list): Fields that must be present (no default)
+    check_ranges (bool): Reject numbers outside NUMERIC_RANGES
+    check_categories (bool): Reject strings outside CATEGORY_VALUES (otherwise
+        they pass through and the model treats them as unknown)
+    """
+
+    def __init__(self, defaults=None, required=(), check_ranges=True, check_categories=True):
+        self.defaults = dict(DEFAULTS if defaults is None else defaults)
+        self.required = set(required)
+        self.check_ranges = check_ranges
+        self.check_categories = check_categories
+        self.numeric_columns = [col for col in REQUIRED_COLUMNS if col in NUMERIC_COLUMNS]
+        self.categorical_columns = [col for col in REQUIRED_COLUMNS if col not in NUMERIC_COLUMNS]
+        self._ranges = {col: np.array(NUMERIC_RANGES[col], dtype=np.float64) for col in self.numeric_columns}
+        self._allowed = {col: frozenset(CATEGORY_VALUES[col]) for col in self.categorical_columns}
+
+    def validate(self, records):
+        """ValidationResult for a list of record dicts (a single dict is one record)."""
+        if isinstance(records, dict):
+            records = [records]
+        n = len(records)
+        messages = []  # (column, bad row mask, message for those rows)
+
+        not_object = ~np.fromiter(map(isinstance, records, repeat(dict)), dtype=bool, count=n)
+        if not_object.any():
+            records = [record if isinstance(record, dict) else {} for record in records]
+            messages.append(("_record", not_object, "expected a JSON object"))
+
+        columns = {}
+        for col in REQUIRED_COLUMNS:
+            values = self._column(records, col)
+            if col in self._ranges:
+                columns[col] = self._numeric(col, values, messages, not_object)
+            else:
+                columns[col] = self._categorical(col, values, messages, not_object)
+
+        bad = np.zeros(n, dtype=bool)
+        for _, mask, _ in messages:
+            bad |= mask
+        errors = []
+        for i in np.flatnonzero(bad):
+            found = {col: message for col, mask, message in messages if mask[i]}
+            errors.append({"index": int(i), "errors": found})
+        return ValidationResult(columns, ~bad, errors)
+
+    @staticmethod
+    def _column(records, col):
+        """Object array of one field over all records, None where it is missing."""
+        # fromiter keeps list/dict values as single objects
+        try:
+            # Field present everywhere: one C-level lookup per record
+            return np.fromiter(map(itemgetter(col), records), dtype=object, count=len(records))
+        except KeyError:
+            return np.fromiter([record.get(col) for record in records], dtype=object, count=len(records))
+
+    def _fill_missing(self, col, values, missing, messages, not_object):
+        """Puts the default into missing (None) cells, or flags them for required fields."""
+        if not missing.any():
+            return
+        values[missing] = self.defaults[col]
+        if col in self.required:
+            messages.append((col, missing & ~not_object, "field required"))
+
+    def _numeric(self, col, values, messages, not_object):
+        wrong_type = np.zeros(len(values), dtype=bool)
+        try:
+            # None casts to NaN
+            numbers = values.astype(np.float64)
+        except (TypeError, ValueError):
+            # Rare: find the rows that do not convert, one by one
+            numbers = np.empty(len(values), dtype=np.float64)
+            for i, value in enumerate(values):
+                try:
+                    numbers[i] = np.nan if value is None else float(value)
+                except (TypeError, ValueError):
+                    numbers[i], wrong_type[i] = 0.0, True
+        missing = np.isnan(numbers)
+        if missing.any():
+            missing[missing] = np.equal(values[missing], None)
+            self._fill_missing(col, numbers, missing, messages, not_object)
+        wrong_type |= ~np.isfinite(numbers) | (numbers != np.floor(numbers))
+        if wrong_type.any():
+            messages.append((col, wrong_type, "must be an integer"))
+            numbers[wrong_type] = 0.0
+
+        if self.check_ranges:
+            lo, hi = self._ranges[col]
+            out_of_range = ~missing & ~wrong_type & ((numbers < lo) | (numbers > hi))
+            if out_of_range.any():
+                messages.append((col, out_of_range, f"must be between {lo:g} and {hi:g}"))
+        return numbers.astype(np.int64)
+
+    def _categorical(self, col, values, messages, not_object):
+        allowed = self._allowed[col]
+        try:
+            known = np.fromiter(map(allowed.__contains__, values), dtype=bool, count=len(values))
+        except TypeError:  # unhashable value (list, dict)
+            known = np.array([isinstance(value, str) and value in allowed for value in values], dtype=bool)
+        # Only the unknown values (few, normally) need a closer look
+        check = np.flatnonzero(~known)
+        if len(check) == 0:
+            return values
+        missing = np.zeros(len(values), dtype=bool)
+        missing[check] = [values[i] is None for i in check]
+        self._fill_missing(col, values, missing, messages, not_object)
+
+        wrong_type = np.zeros(len(values), dtype=bool)
+        wrong_type[check] = [not isinstance(values[i], str) for i in check]
+        wrong_type &= ~missing
+        if wrong_type.any():
+            messages.append((col, wrong_type, "must be a string"))
+            values[wrong_type] = self.defaults[col]
+        if self.check_categories:
+            unknown = np.zeros(len(values), dtype=bool)
+            unknown[check] = True
+            unknown &= ~missing & ~wrong_type
+            if unknown.any():
+                messages.append((col, unknown, f"must be one of {list(CATEGORY_VALUES[col])}"))
+        return values
+
+
+# Shared instance: defaults filled, ranges and categories checked
+STUDENT_SCHEMA = CompiledSchema()
+
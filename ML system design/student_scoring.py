@@ -0,0 +1,207 @@
+# student_scoring.py
+import json
+import os
+from datetime import datetime, timezone
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+from prediction_cache import canonical_key
+from student_queries import QueryError, find_students
+from student_schema import DEFAULTS, REQUIRED_COLUMNS, STUDENT_SCHEMA
+
+# Field on the student document holding its last score
+SCORE_FIELD = "scoring"
+
+# Bulk scoring: documents per model call / bulk_write, and per request
+SCORING_CHUNK_SIZE = int(os.environ.get("SCORING_CHUNK_SIZE", "500"))
+DEFAULT_SCORING_LIMIT = 1000
+MAX_SCORING_LIMIT = int(os.environ.get("MAX_SCORING_LIMIT", "10000"))
+
+# Filter operators that run code on the server
+_FORBIDDEN_OPERATORS = {"$where", "$function", "$accumulator"}
+
+
+# ----------------------
+# Record state
+# ----------------------
+def model_record(doc):
+    """The document's model input: REQUIRED_COLUMNS, missing ones filled with DEFAULTS."""
+    return {col: doc.get(col, DEFAULTS[col]) for col in REQUIRED_COLUMNS}
+
+
+def record_hash(doc):
+    return canonical_key(model_record(doc))
+
+
+def is_fresh(doc, version):
+    """True when the stored score was made by `version` on the document's current features."""
+    stored = doc.get(SCORE_FIELD)
+    return (
+        isinstance(stored, dict)
+        and stored.get("model_version") == version
+        and stored.get("record_hash") == record_hash(doc)
+    )
+
+
+# ----------------------
+# Scoring
+# ----------------------
+def score_documents(collection, docs, mv, force=False):
+    """
+    Scores student documents with model version `mv` and stores the result
+    on each stale one.
+
+    Documents whose stored score has the same model version and record hash
+    are answered from the document. The others are validated with
+    STUDENT_SCHEMA, encoded once and predicted from those features in one
+    model call, and written back in one unordered bulk_write as
+    {prediction, model_version, record_hash, features, scored_at}.
+
+    Returns one {"_id", "prediction", "model_version", "cached"} per document,
+    in order; a document that fails validation gets {"_id", "error",
+    "details", "model_version"} instead and is left unscored.
+    """
+    results = [None] * len(docs)
+    stale = []
+    for i, doc in enumerate(docs):
+        if not force and is_fresh(doc, mv.version):
+            results[i] = _result(doc["_id"], doc[SCORE_FIELD]["prediction"], mv.version, True)
+        else:
+            stale.append(i)
+    if not stale:
+        return results
+
+    # A bad stored document must not fail the chunk; missing fields get their defaults
+    validation = STUDENT_SCHEMA.validate([docs[i] for i in stale])
+    for error in validation.errors:
+        i = stale[error["index"]]
+        results[i] = {"_id": str(docs[i]["_id"]), "error": "Validation failed",
+                      "details": error["errors"], "model_version": mv.version}
+    valid = [i for i, ok in zip(stale, validation.valid) if ok]
+    if not valid:
+        return results
+
+    records = validation.records()
+    features = mv.predictor.encode(records)
+    predictions = mv.predictor.predict_encoded(features)
+    scored_at = datetime.now(timezone.utc)
+
+    updates = []
+    for i, prediction, vector in zip(valid, predictions, features):
+        score = {
+            "prediction": int(prediction),
+            "model_version": mv.version,
+            "record_hash": record_hash(docs[i]),
+            "features": [float(x) for x in vector],
+            "scored_at": scored_at,
+        }
+        updates.append(UpdateOne({"_id": docs[i]["_id"]}, {"$set": {SCORE_FIELD: score}}))
+        results[i] = _result(docs[i]["_id"], score["prediction"], mv.version, False)
+    collection.bulk_write(updates, ordered=False)
+    return results
+
+
+def score_student(collection, id, mv, force=False):
+    """Score for one stored student, or None when it does not exist. Raises QueryError on a bad id."""
+    try:
+        _id = ObjectId(id)
+    except (InvalidId, TypeError):
+        raise QueryError("Invalid ID format")
+    doc = collection.find_one({"_id": _id})
+    if doc is None:
+        return None
+    return score_documents(collection, [doc], mv, force)[0]
+
+
+def score_matching(collection, args, mv):
+    """
+    Scores up to `limit` students matching `filter` (a JSON Mongo filter),
+    in _id order after the `after` cursor, SCORING_CHUNK_SIZE at a time.
+    `force=true` rescores fresh documents too; documents failing validation
+    are counted in "failed" and reported with their errors. Raises QueryError.
+    """
+    query = parse_scoring_query(args)
+    summary = {"model_version": mv.version, "matched": 0, "scored": 0, "cached": 0, "failed": 0,
+               "next_cursor": None, "predictions": []}
+
+    cursor = find_students(collection, query["after"], query["limit"], filter=query["filter"])
+    chunk = []
+    for doc in cursor:
+        chunk.append(doc)
+        if len(chunk) >= SCORING_CHUNK_SIZE:
+            _add_chunk(summary, score_documents(collection, chunk, mv, query["force"]))
+            chunk = []
+    if chunk:
+        _add_chunk(summary, score_documents(collection, chunk, mv, query["force"]))
+
+    if summary["matched"] == query["limit"]:
+        summary["next_cursor"] = summary["predictions"][-1]["_id"]
+    return summary
+
+
+# ----------------------
+# Helpers
+# ----------------------
+def parse_scoring_query(args):
+    raw_filter = args.get("filter")
+    if raw_filter:
+        try:
+            filter = json.loads(raw_filter)
+        except ValueError as e:
+            raise QueryError(f"filter must be a JSON object: {e}")
+        if not isinstance(filter, dict):
+            raise QueryError("filter must be a JSON object")
+        _check_operators(filter)
+    else:
+        filter = {}
+
+    after = args.get("after")
+    if after:
+        try:
+            after = ObjectId(after)
+        except (InvalidId, TypeError):
+            raise QueryError("Invalid cursor in 'after'")
+    else:
+        after = None
+
+    limit = args.get("limit")
+    if limit is None or limit == "":
+        limit = DEFAULT_SCORING_LIMIT
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise QueryError("limit must be an integer")
+        if limit < 1:
+            raise QueryError("limit must be >= 1")
+        limit = min(limit, MAX_SCORING_LIMIT)
+
+    force = str(args.get("force", "")).lower() in ("1", "true", "yes")
+    return {"filter": filter, "after": after, "limit": limit, "force": force}
+
+
+def _check_operators(value):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in _FORBIDDEN_OPERATORS:
+                raise QueryError(f"Operator {key} is not allowed in filter")
+            _check_operators(item)
+    elif isinstance(value, list):
+        for item in value:
+            _check_operators(item)
+
+
+def _result(_id, prediction, version, cached):
+    return {"_id": str(_id), "prediction": prediction, "model_version": version, "cached": cached}
+
+
+def _add_chunk(summary, results):
+    summary["matched"] += len(results)
+    for result in results:
+        if "error" in result:
+            summary["failed"] += 1
+        else:
+            summary["cached" if result["cached"] else "scored"] += 1
+    summary["predictions"].extend(results)
@@ -0,0 +1,24 @@
+"""
+The student pass/fail service as one Flask application.
+
+    from student_service import create_app
+    app = create_app()              # configured from the environment
+
+    python serve.py "student_service:create_app()" --workers 4
+
+Routes, grouped in blueprints:
+
+    predict   /, /predict, /predict/batch, /explain, /model, /model/rollback
+    students  /students (GET, POST), /students/bulk, /students/<id>,
+              /students/<id>/predict, /students/predict  (when Mongo is enabled)
+    metrics   /ready (503 until the model is live), /stats (JSON),
+              /metrics (Prometheus text when enabled, else JSON)
+
+The model registry, prediction cache, schema validation, Mongo connection
+and metrics middleware are built once per app and shared by every route.
+app.py, predict_api.py, mongodb_app.py, logging_mongodb_api.py and the
+monitoring apps are thin wrappers around create_app with their old options.
+"""
+from student_service.app import create_app
+
+__all__ = ["create_app"]
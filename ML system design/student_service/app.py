@@ -0,0 +1,75 @@
+# student_service/app.py
+import logging
+import os
+
+from flask import Flask
+
+from fast_json import use_fast_json
+from log_config import payload_logging_enabled, setup_logging
+from student_service import metrics, predict
+from student_service.context import EXTENSION, ServiceContext
+from student_service.model import model_service_from_env
+
+
+def env_flag(name, default):
+    return os.environ.get(name, default).lower() in ("1", "true", "yes")
+
+
+def create_app(registry=None, mongo=None, enable_mongo=None, prometheus=None, log_file=None,
+               access_log=False, api_key=None, log_payloads=None):
+    """
+    Builds the student service. Arguments left as None come from the environment.
+
+    Parameters:
+    registry (ModelRegistry): Model registry; registry_from_env() by default
+    mongo (MongoConnectionManager): Student collection; mongo_from_env() by default
+    enable_mongo (bool): Serve the /students routes (SERVICE_MONGO, default 1)
+    prometheus (bool): Prometheus /metrics and inference metrics (SERVICE_PROMETHEUS, default 0)
+    log_file (str): Install the logging pipeline writing to this file (SERVICE_LOG_FILE)
+    access_log (bool): Log every request with its latency
+    api_key (str): Required x-api-key on prediction routes (API_KEY; unset = open)
+    log_payloads (bool): Log request payloads and predictions (LOG_PAYLOADS)
+    """
+    if enable_mongo is None:
+        enable_mongo = mongo is not None or env_flag("SERVICE_MONGO", "1")
+    if prometheus is None:
+        prometheus = env_flag("SERVICE_PROMETHEUS", "0")
+    log_file = log_file or os.environ.get("SERVICE_LOG_FILE")
+    api_key = api_key or os.environ.get("API_KEY")
+    if log_payloads is None:
+        log_payloads = payload_logging_enabled()
+
+    log_pipeline = setup_logging(log_file) if log_file else None
+
+    app = Flask(__name__)
+    # orjson-backed jsonify / request.get_json; encodes ObjectId, NumPy and datetimes
+    use_fast_json(app)
+
+    model = model_service_from_env(registry, track_metrics=prometheus)
+    if enable_mongo and mongo is None:
+        from mongo_connection import mongo_from_env
+
+        # Pooled client + background health checker (MONGO_URI, MONGO_MAX_POOL_SIZE, ...)
+        mongo = mongo_from_env()
+
+    app.extensions[EXTENSION] = ServiceContext(
+        model,
+        mongo=mongo if enable_mongo else None,
+        api_key=api_key,
+        log_payloads=log_payloads,
+        log_pipeline=log_pipeline,
+    )
+
+    app.register_blueprint(predict.bp)
+    if enable_mongo:
+        # Imported only here: pymongo and the ingest/query modules are not needed without Mongo
+        from student_service import students
+
+        app.register_blueprint(students.bp)
+    # Last, so the Prometheus counters wrap every route registered above
+    metrics.install_metrics(app, prometheus=prometheus, access_log=access_log)
+
+    # With MODEL_LOAD_ASYNC=1 the model may still be loading; /ready reports when it is live
+    logging.info(f"Student service created | Model: {model.registry.status()} | Mongo: {enable_mongo} | "
+                 f"Prometheus: {prometheus}")
+    return app
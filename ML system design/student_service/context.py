@@ -0,0 +1,74 @@
+# student_service/context.py
+import logging
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+EXTENSION = "student_service"
+
+# Seconds a client should wait before retrying while the model loads
+RETRY_AFTER_SECONDS = "1"
+
+
+class ServiceContext:
+    """
+    What create_app builds once and the blueprints share.
+
+    Parameters:
+    model (ModelService): Registry, prediction cache and schema
+    mongo (MongoConnectionManager): Student collection; None when Mongo is disabled
+    api_key (str): Required x-api-key on the prediction, scoring and rollback routes (None = open)
+    log_payloads (bool): Log request payloads and predictions
+    log_pipeline (LoggingPipeline): Installed logging pipeline, if create_app set one up
+    """
+
+    def __init__(self, model, mongo=None, api_key=None, log_payloads=False, log_pipeline=None):
+        self.model = model
+        self.mongo = mongo
+        self.api_key = api_key
+        self.log_payloads = log_payloads
+        self.log_pipeline = log_pipeline
+
+
+def service():
+    """The ServiceContext of the current app."""
+    return current_app.extensions[EXTENSION]
+
+
+def require_api_key(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        api_key = service().api_key
+        if api_key is not None and request.headers.get("x-api-key") != api_key:
+            logging.warning("Unauthorized API key attempt")
+            return jsonify({"error": "Unauthorized. Invalid API key."}), 401
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def require_model(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # With MODEL_LOAD_ASYNC=1 a worker thread must not block on a model that is still loading
+        registry = service().model.registry
+        if not registry.ready:
+            logging.warning(f"Model not ready: {registry.status()}")
+            response = jsonify({"error": f"Model not ready: {registry.status()}"})
+            return response, 503, {"Retry-After": RETRY_AFTER_SECONDS}
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def require_mongo(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Answered from the cached background ping; no round trip on the request path
+        connected, status = service().mongo.status()
+        if not connected:
+            logging.error(f"MongoDB connection failed: {status}")
+            return jsonify({"error": f"MongoDB connection failed: {status}"}), 500
+        return view(*args, **kwargs)
+
+    return wrapper
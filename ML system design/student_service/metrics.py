@@ -0,0 +1,75 @@
+# student_service/metrics.py
+import logging
+import time
+
+from flask import Blueprint, g, jsonify, request
+
+from student_service.context import service
+
+bp = Blueprint("metrics", __name__)
+
+
+def install_metrics(app, prometheus=False, access_log=False):
+    """
+    Request middleware and metric routes for the app; call it after the
+    other blueprints are registered so the custom counter covers them.
+
+    Parameters:
+    app (Flask): Application to instrument
+    prometheus (bool): Serve Prometheus metrics on /metrics (prometheus_flask_exporter)
+    access_log (bool): Log path, method, status and latency of every request
+    """
+    if access_log:
+        @app.before_request
+        def start_timer():
+            g.start_time = time.perf_counter()
+
+        @app.after_request
+        def track_request(response):
+            latency = time.perf_counter() - g.start_time
+            logging.info(
+                f"Endpoint: {request.path}, Method: {request.method}, Status: {response.status_code}, Latency: {latency:.4f}s"
+            )
+            return response
+
+    app.register_blueprint(bp)
+
+    if prometheus:
+        from prometheus_flask_exporter import PrometheusMetrics
+
+        # Default HTTP metrics and /metrics; inference metrics come from inference_metrics
+        metrics = PrometheusMetrics(app)
+        metrics.info("app_info", "Student Pass Prediction API Info", version="1.0")
+        metrics.register_default(metrics.counter(
+            "my_http_requests_total",
+            "Custom HTTP Request Counter",
+            labels={
+                "method": lambda: request.method,
+                "endpoint": lambda: request.path,
+                "status": lambda r: r.status_code,
+            },
+        ))
+        app.extensions["prometheus_metrics"] = metrics
+    else:
+        app.add_url_rule("/metrics", "metrics.json_metrics", get_stats)
+
+
+@bp.route("/ready", methods=["GET"])
+def ready():
+    """200 once the model is loaded and warmed up, 503 before (readiness probe)."""
+    registry = service().model.registry
+    if not registry.ready:
+        return jsonify({"ready": False, "model": registry.status()}), 503
+    return jsonify({"ready": True, "model_version": registry.current.version})
+
+
+@bp.route("/stats", methods=["GET"])
+def get_stats():
+    """Prediction cache, model version, logging pipeline and Mongo health as JSON."""
+    ctx = service()
+    stats = ctx.model.stats()
+    if ctx.log_pipeline is not None:
+        stats["logging"] = ctx.log_pipeline.stats()
+    if ctx.mongo is not None:
+        stats["mongo"] = ctx.mongo.health()
+    return jsonify(stats)
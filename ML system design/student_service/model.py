@@ -0,0 +1,88 @@
+# student_service/model.py
+import os
+
+from model_registry import registry_from_env
+from prediction_cache import PredictionCache
+from student_schema import STUDENT_SCHEMA
+
+
+class ModelService:
+    """
+    Model loading, feature handling and prediction shared by every route:
+    the registry's live version, the compiled schema that validates and
+    default-fills records, and the prediction cache.
+
+    Parameters:
+    registry (ModelRegistry): Source of the live model version
+    cache (PredictionCache): Cache of recent predictions (per model version)
+    schema (CompiledSchema): Validation and default-filling of input records
+    track_metrics (bool): Record Prometheus inference metrics (inference_metrics)
+    """
+
+    def __init__(self, registry, cache, schema=STUDENT_SCHEMA, track_metrics=False):
+        self.registry = registry
+        self.cache = cache
+        self.schema = schema
+        self.track_metrics = track_metrics
+        self._metrics = None
+        self._explanations = None
+        if track_metrics:
+            import inference_metrics
+
+            inference_metrics.track_registry(registry)
+            self._metrics = inference_metrics
+
+    @property
+    def current(self):
+        """The live ModelVersion; read once per request and keep the reference."""
+        return self.registry.current
+
+    def validate(self, records, version=None):
+        """ValidationResult for a list of records, timed as preprocessing when metrics are on."""
+        if self._metrics is None:
+            return self.schema.validate(records)
+        with self._metrics.preprocess_timer(version or self.current.version):
+            return self.schema.validate(records)
+
+    def predict(self, mv, records):
+        """Predictions (ints) for validated records; repeated records come from the cache."""
+        predictions = self.cache.predict(records, lambda misses: [int(p) for p in self._predict(mv, misses)],
+                                         version=mv.version)
+        if self._metrics is not None:
+            # Every served prediction counts, hits included; model latency is timed on misses only
+            self._metrics.record_predictions(mv, records, predictions)
+        return predictions
+
+    def predict_columns(self, mv, columns):
+        """Predictions for validated columns (ValidationResult.model_columns), no cache."""
+        if self._metrics is not None:
+            return self._metrics.predict_columns(mv, columns)
+        return mv.predictor.predict_columns(columns)
+
+    def _predict(self, mv, records):
+        if self._metrics is not None:
+            return self._metrics.timed_predict(mv, records)
+        return mv.predictor.predict(records)
+
+    @property
+    def explanations(self):
+        """ExplanationEngine, built on the first /explain request."""
+        if self._explanations is None:
+            from explainer import engine_from_env
+
+            self._explanations = engine_from_env()
+        return self._explanations
+
+    def stats(self):
+        # Does not wait for a model that is still loading
+        version = self.current.version if self.registry.ready else None
+        return {"prediction_cache": self.cache.stats(), "model_version": version, "model_status": self.registry.status()}
+
+
+def model_service_from_env(registry=None, track_metrics=False):
+    """ModelService on registry_from_env() and a PredictionCache from PREDICTION_CACHE_SIZE / _TTL."""
+    cache = PredictionCache(
+        maxsize=int(os.environ.get("PREDICTION_CACHE_SIZE", "10000")),
+        ttl=float(os.environ.get("PREDICTION_CACHE_TTL", "300")),
+    )
+    return ModelService(registry or registry_from_env(), cache, track_metrics=track_metrics)
@@ -0,0 +1,203 @@
+# student_service/predict.py
+import logging
+import os
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+import fast_json
+from student_service.context import require_api_key, require_model, service
+
+bp = Blueprint("predict", __name__)
+
+# Records scored per model call on /predict/batch; bounds memory regardless of payload size
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", "1000"))
+
+
+def read_records():
+    """
+    (records, single, error response) from the request body: a JSON object
+    (single=True) or a list of objects.
+    """
+    data = request.get_json(force=True, silent=True)
+    if data is None:
+        logging.error("Invalid JSON received")
+        return None, False, (jsonify({"error": "Invalid JSON received"}), 400)
+    single = isinstance(data, dict)
+    records = [data] if single else data
+    if not isinstance(records, list):
+        return None, False, (jsonify({"error": "Expected a JSON object or a list of objects"}), 400)
+    return records, single, None
+
+
+# ----------------------
+# Routes
+# ----------------------
+@bp.route("/")
+def home():
+    ctx = service()
+    registry = ctx.model.registry
+    # Does not wait for a model that is still loading
+    body = {"message": "Student Pass Prediction API is running!",
+            "model_version": registry.current.version if registry.ready else None,
+            "model_status": registry.status()}
+    if ctx.mongo is not None:
+        connected, status = ctx.mongo.status()
+        body.update({"mongo_status": status, "mongo": ctx.mongo.health()})
+    logging.info("Accessed home route", extra={"sampled": True})
+    return jsonify(body)
+
+
+@bp.route("/predict", methods=["POST"])
+@require_api_key
+@require_model
+def predict():
+    """One object in, one prediction out; a list in, a list out."""
+    ctx = service()
+    mv = ctx.model.current  # one model version for the whole request
+    records, single, error = read_records()
+    if error:
+        return error
+
+    # Validate, coerce and auto-fill missing columns for the whole batch at once
+    result = ctx.model.validate(records, mv.version)
+    if not result.ok:
+        logging.warning(f"POST /predict validation failed for {len(result.errors)} of {len(result)} records")
+        return jsonify({"error": "Validation failed", "details": result.errors}), 400
+    records = result.records()
+    if ctx.log_payloads:
+        logging.info(f"Processed input data: {records}")
+
+    try:
+        predictions = ctx.model.predict(mv, records)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    response = [{"prediction": p, "model_version": mv.version} for p in predictions]
+
+    if ctx.log_payloads:
+        logging.info(f"Predictions: {response}")
+    logging.info(f"POST /predict served | Records: {len(records)} | Model: {mv.version}",
+                 extra={"sampled": True, "records": len(records), "model_version": mv.version})
+    return jsonify(response[0] if single else response)
+
+
+def score_chunk(chunk, mv, model):
+    """
+    Validates and scores a chunk of (line, record, error) entries with one
+    schema pass and one model call. Entries that already carry an error are
+    passed through in order; if the batch call fails, records are scored one
+    by one to isolate the bad rows.
+    """
+    parsed = [(line, record) for line, record, error in chunk if error is None]
+    result = model.validate([record for _, record in parsed], mv.version)
+    invalid = {parsed[e["index"]][0]: e["errors"] for e in result.errors}
+    lines = [line for (line, _), ok in zip(parsed, result.valid) if ok]
+    try:
+        # Validated columns go straight to the model; no per-record dicts
+        predictions = model.predict_columns(mv, result.model_columns())
+        scored = {line: {"line": line, "prediction": int(pred), "model_version": mv.version}
+                  for line, pred in zip(lines, predictions)}
+    except Exception:
+        scored = {}
+        for line, record in zip(lines, result.records()):
+            try:
+                scored[line] = {"line": line, "prediction": int(mv.predictor.predict_one(record)),
+                                "model_version": mv.version}
+            except Exception as e:
+                scored[line] = {"line": line, "error": str(e)}
+
+    return [{"line": line, "error": error} if error is not None
+            else {"line": line, "error": "Validation failed", "details": invalid[line]} if line in invalid
+            else scored[line]
+            for line, _, error in chunk]
+
+
+@bp.route("/predict/batch", methods=["POST"])
+@require_api_key
+@require_model
+def predict_batch():
+    """NDJSON in, NDJSON out: one result line per input line, in order."""
+    from student_ingest import body_lines  # pymongo stays off the import path without Mongo
+
+    logging.info("POST /predict/batch called")
+    model = service().model
+    mv = model.current  # the whole stream is scored by one model version
+
+    def generate():
+        scored, errors = 0, 0
+        chunk = []
+        # Read the body line by line instead of loading the whole payload
+        for line_no, raw in enumerate(body_lines(request), start=1):
+            raw = raw.strip()
+            if raw:
+                try:
+                    record = fast_json.loads(raw)
+                    if not isinstance(record, dict):
+                        raise ValueError("each line must be a JSON object")
+                    # Missing columns are filled when the chunk is validated
+                    chunk.append((line_no, record, None))
+                except ValueError as e:
+                    chunk.append((line_no, None, f"Failed to decode JSON: {e}"))
+
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                for result in score_chunk(chunk, mv, model):
+                    errors += "error" in result
+                    scored += "prediction" in result
+                    yield fast_json.dumps(result) + b"\n"
+                chunk = []
+
+        if chunk:
+            for result in score_chunk(chunk, mv, model):
+                errors += "error" in result
+                scored += "prediction" in result
+                yield fast_json.dumps(result) + b"\n"
+
+        logging.info(f"POST /predict/batch finished | Model: {mv.version} | Scored: {scored} | Errors: {errors}")
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@bp.route("/explain", methods=["POST"])
+@require_api_key
+@require_model
+def explain():
+    """Per-feature attributions (log-odds of passing) for one record or a list; ?top=N keeps the largest."""
+    model = service().model
+    mv = model.current
+    records, single, error = read_records()
+    if error:
+        return error
+    try:
+        top = int(request.args["top"]) if request.args.get("top") else None
+    except ValueError:
+        return jsonify({"error": "top must be an integer"}), 400
+
+    result = model.validate(records, mv.version)
+    if not result.ok:
+        return jsonify({"error": "Validation failed", "details": result.errors}), 400
+    try:
+        # The explainer for a new model version is built on its first request
+        explained = model.explanations.explain(mv, result.records(), top)
+    except Exception as e:
+        logging.error(f"Explanation error: {e}")
+        return jsonify({"error": f"Explanation error: {e}"}), 500
+    if single:
+        return jsonify({"model_version": explained["model_version"], "explainer": explained["explainer"],
+                        **explained["explanations"][0]})
+    return jsonify(explained)
+
+
+@bp.route("/model", methods=["GET"])
+def get_model():
+    return jsonify(service().model.registry.info())
+
+
+@bp.route("/model/rollback", methods=["POST"])
+@require_api_key
+def rollback_model():
+    try:
+        mv = service().model.registry.rollback()
+    except RuntimeError as e:
+        logging.error(f"Model rollback failed: {str(e)}")
+        return jsonify({"error": str(e)}), 409
+    logging.warning(f"Rolled back to model version {mv.version}")
+    return jsonify({"model_version": mv.version})
@@ -0,0 +1,136 @@
+# student_service/students.py
+import logging
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from flask import Blueprint, jsonify, request
+
+from student_ingest import IngestError, ingest_request
+from student_queries import QueryError, students_response
+from student_scoring import score_matching, score_student
+from student_service.context import require_api_key, require_model, require_mongo, service
+
+bp = Blueprint("students", __name__)
+
+
+def collection():
+    return service().mongo.collection
+
+
+@bp.route("/students", methods=["GET"])
+@require_mongo
+def get_students():
+    # Keyset-paginated (?after=<_id>&limit=N), projected (?fields=a,b) and
+    # optionally streamed (?format=ndjson|json-stream)
+    try:
+        response = students_response(collection(), request.args)
+        logging.info(f"GET /students served | Args: {dict(request.args)}", extra={"sampled": True})
+        return response
+    except QueryError as e:
+        logging.warning(f"Invalid /students query: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error fetching students: {str(e)}")
+        return jsonify({"error": "Failed to fetch students"}), 500
+
+
+@bp.route("/students", methods=["POST"])
+@require_mongo
+def add_student():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    if service().log_payloads:
+        logging.info(f"POST /students called | Data: {data}")
+    try:
+        result = collection().insert_one(data)
+    except Exception as e:
+        logging.error(f"Error inserting student: {str(e)}")
+        return jsonify({"error": "Failed to insert student"}), 500
+    logging.info(f"Inserted student with ID: {result.inserted_id}")
+    return jsonify({"inserted_id": str(result.inserted_id)})
+
+
+@bp.route("/students/bulk", methods=["POST"])
+@require_mongo
+def add_students_bulk():
+    """CSV or JSON Lines body, validated and inserted in batches."""
+    logging.info(f"POST /students/bulk called | Content-Type: {request.content_type}")
+    try:
+        summary = ingest_request(collection(), request)
+    except IngestError as e:
+        logging.warning(f"Bulk insert rejected: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+
+    logging.info(f"Bulk insert: {summary['received']} rows, {summary['inserted']} inserted, "
+                 f"{summary['failed']} failed in {summary['seconds']}s ({summary['rows_per_second']} rows/s)")
+    if summary["aborted"]:
+        logging.error(f"Bulk insert aborted: {summary['aborted']}")
+        return jsonify(summary), 500
+    return jsonify(summary)
+
+
+@bp.route("/students/<id>", methods=["GET"])
+@require_mongo
+def get_student(id):
+    try:
+        student = collection().find_one({"_id": ObjectId(id)})
+    except (InvalidId, TypeError):
+        logging.warning(f"Invalid ID format: {id}")
+        return jsonify({"error": "Invalid ID format"}), 400
+    except Exception as e:
+        logging.error(f"Error fetching student {id}: {str(e)}")
+        return jsonify({"error": "Failed to fetch student"}), 500
+
+    if student:
+        logging.info(f"Student found: {id}", extra={"sampled": True})
+        return jsonify(student)
+    logging.warning(f"Student not found: {id}")
+    return jsonify({"error": "Student not found"}), 404
+
+
+# ----------------------
+# Scoring stored students (results are written back to the documents)
+# ----------------------
+@bp.route("/students/<id>/predict", methods=["POST"])
+@require_api_key
+@require_model
+@require_mongo
+def predict_student(id):
+    force = request.args.get("force", "").lower() in ("1", "true", "yes")
+    try:
+        result = score_student(collection(), id, service().model.current, force)
+    except QueryError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error scoring student {id}: {str(e)}")
+        return jsonify({"error": "Failed to score student"}), 500
+
+    if result is None:
+        logging.warning(f"Student not found: {id}")
+        return jsonify({"error": "Student not found"}), 404
+    if "error" in result:
+        logging.warning(f"Stored student {id} failed validation: {result['details']}")
+        return jsonify(result), 400
+    logging.info(f"Student {id} scored: {result}", extra={"sampled": True})
+    return jsonify(result)
+
+
+@bp.route("/students/predict", methods=["POST"])
+@require_api_key
+@require_model
+@require_mongo
+def predict_students():
+    """Scores the students matching ?filter= (JSON) in chunks, skipping ones already scored by this model."""
+    try:
+        summary = score_matching(collection(), request.args, service().model.current)
+    except QueryError as e:
+        logging.warning(f"Invalid /students/predict query: {str(e)}")
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Error scoring students: {str(e)}")
+        return jsonify({"error": "Failed to score students"}), 500
+
+    logging.info(f"Students scored | Model: {summary['model_version']} | Matched: {summary['matched']} | "
+                 f"Scored: {summary['scored']} | Cached: {summary['cached']} | Failed: {summary['failed']}")
+    return jsonify(summary)
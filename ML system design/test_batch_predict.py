@@ -0,0 +1,85 @@
+import io
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_predict
+from batch_predict import run_batch
+
+POR_CSV = "data/raw/student_por.csv"
+
+
+@pytest.fixture(scope="module")
+def expected():
+    df = pd.read_csv(POR_CSV)
+    df["dataset"] = "portuguese"
+    return joblib.load("performance_pipeline.pkl").predict(df)
+
+
+def score(tmp_path, output, **kwargs):
+    options = {"chunk_size": 100, "workers": 1, "dataset": "portuguese", "log": io.StringIO()}
+    return run_batch(POR_CSV, str(tmp_path / output), **{**options, **kwargs})
+
+
+def test_csv_output_matches_pipeline(tmp_path, expected):
+    summary = score(tmp_path, "out.csv")
+
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert summary["rows"] == len(out) == len(expected)
+    np.testing.assert_array_equal(out["prediction"], expected)
+    assert out["model_version"].nunique() == 1
+
+
+def test_parquet_output_with_process_pool(tmp_path, expected):
+    score(tmp_path, "out_parquet", fmt="parquet", workers=2)
+
+    out = pd.read_parquet(tmp_path / "out_parquet")
+    np.testing.assert_array_equal(out["prediction"].to_numpy(dtype=int), expected)
+
+
+def test_resume_after_a_crash_writes_every_row_once(tmp_path, monkeypatch, expected):
+    write = batch_predict.CsvOutput.write
+
+    def crash_on_fourth_chunk(self, df, index):
+        if index == 3:
+            self.file.write("half a chunk,")  # partial output the resume must discard
+            raise RuntimeError("disk full")
+        return write(self, df, index)
+
+    monkeypatch.setattr(batch_predict.CsvOutput, "write", crash_on_fourth_chunk)
+    with pytest.raises(RuntimeError):
+        score(tmp_path, "out.csv")
+    monkeypatch.setattr(batch_predict.CsvOutput, "write", write)
+
+    summary = score(tmp_path, "out.csv")
+
+    assert summary["rows_this_run"] == len(expected) - 300
+    out = pd.read_csv(tmp_path / "out.csv")
+    np.testing.assert_array_equal(out["prediction"], expected)
+
+
+def test_unscorable_rows_get_an_empty_prediction(tmp_path):
+    df = pd.read_csv(POR_CSV).head(50)
+    df.loc[7, "age"] = None
+    df.to_csv(tmp_path / "in.csv", index=False)
+
+    summary = run_batch(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), workers=1,
+                        dataset="portuguese", log=io.StringIO())
+
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert summary["failed_rows"] == 1
+    assert out["prediction"].isna().tolist() == [i == 7 for i in range(50)]
+
+
+def test_dataset_comes_from_the_file_name_or_the_file_is_rejected(tmp_path, expected):
+    run_batch(POR_CSV, str(tmp_path / "out.csv"), workers=1, log=io.StringIO())
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert set(out["dataset"]) == {"portuguese"}
+    np.testing.assert_array_equal(out["prediction"], expected)
+
+    pd.read_csv(POR_CSV).to_csv(tmp_path / "history.csv", index=False)
+    with pytest.raises(ValueError, match="no dataset column"):
+        run_batch(str(tmp_path / "history.csv"), str(tmp_path / "out2.csv"), workers=1, log=io.StringIO())
+    assert not (tmp_path / "out2.csv").exists()
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_predict import run_batch
+from columnar_dataset import convert_csv, is_columnar, load_columnar
+from fast_pipeline import load_compiled_pipeline
+
+RAW = {"math": "data/raw/student_mat.csv", "portuguese": "data/raw/student_por.csv"}
+
+
+@pytest.fixture(scope="module")
+def columnar(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("columnar") / "students")
+    convert_csv(list(RAW.values()), path)
+    return path
+
+
+def raw_frame():
+    return pd.concat([pd.read_csv(path).assign(dataset=name) for name, path in RAW.items()], ignore_index=True)
+
+
+def test_round_trip_with_small_dtypes(columnar):
+    assert is_columnar(columnar)
+    data = load_columnar(columnar)
+    raw = raw_frame()
+
+    assert data.rows == len(raw) and data.columns == list(raw.columns)
+    assert all(data.array(col).dtype == np.int8 for col in data.columns)
+    assert isinstance(data.array("age"), np.memmap)
+
+    df = data.to_pandas()
+    assert isinstance(df["school"].dtype, pd.CategoricalDtype)
+    decoded = df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+    pd.testing.assert_frame_equal(decoded, raw, check_dtype=False)
+
+    chunks = list(data.iter_chunks(400, start=100))
+    assert [len(c) for c in chunks] == [400, 400, 144]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df.iloc[100:].reset_index(drop=True))
+
+
+def test_coded_columns_score_like_the_pipeline(columnar, tmp_path):
+    pipeline, kernel = load_compiled_pipeline("performance_pipeline.pkl")
+    df = load_columnar(columnar).to_pandas()
+    expected = pipeline.predict(raw_frame()[pipeline.feature_names_in_])
+
+    columns = {col: df[col].array if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].to_numpy()
+               for col in kernel.columns}
+    np.testing.assert_array_equal(kernel.predict_columns(columns), expected)
+
+    output = str(tmp_path / "scored.csv")
+    summary = run_batch(columnar, output, chunk_size=300, workers=1)
+    assert summary["rows"] == len(df) and summary["failed_rows"] == 0
+    np.testing.assert_array_equal(pd.read_csv(output)["prediction"], expected)
+
+
+def test_loads_without_pymongo():
+    # StudentPass reads the columnar data and does not install pymongo
+    import subprocess
+    import sys
+
+    code = "import sys; sys.modules['pymongo'] = None; import columnar_dataset"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
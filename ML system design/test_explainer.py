@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from explainer import ExplanationEngine, LinearExplainer, load_background
+from fast_pipeline import load_compiled_pipeline
+from model_registry import ModelVersion
+
+MODEL_PATH = "performance_pipeline.pkl"
+
+
+@pytest.fixture(scope="module")
+def model_version():
+    pipeline, predictor = load_compiled_pipeline(MODEL_PATH)
+    return ModelVersion("v1", MODEL_PATH, pipeline, predictor, 0.0)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ExplanationEngine("data/raw/student_mat.csv", background_rows=50)
+
+
+def test_background_is_a_fixed_sample():
+    first = load_background("data/raw/student_mat.csv", 50, seed=0)
+    assert len(first) == 50
+    assert first == load_background("data/raw/student_mat.csv", 50, seed=0)
+    assert first != load_background("data/raw/student_mat.csv", 50, seed=1)
+
+
+def test_attributions_add_up_to_the_model_score(engine, model_version):
+    records = load_background("data/raw/student_por.csv", 0, dataset="portuguese")
+    explainer, values = engine.shap_values("v1", model_version.pipeline, model_version.predictor, records, chunk_size=100)
+
+    assert isinstance(explainer, LinearExplainer)
+    assert values.shape == (len(records), 34)
+    scores = model_version.predictor.decision_function(records)[:, 0]
+    np.testing.assert_allclose(explainer.expected_value + values.sum(axis=1), scores, atol=1e-9)
+
+
+def test_explainer_is_built_once_per_version(engine, model_version):
+    first = engine.explainer("v1", model_version.pipeline, model_version.predictor)
+    assert engine.explainer("v1", model_version.pipeline, model_version.predictor) is first
+    engine.explainer("v2", model_version.pipeline, model_version.predictor)
+    engine.explainer("v3", model_version.pipeline, model_version.predictor)
+    assert engine.explainer("v1", model_version.pipeline, model_version.predictor) is not first
+
+
+def test_explain_returns_top_attributions(engine, model_version):
+    record = load_background("data/raw/student_mat.csv", 1)[0]
+    result = engine.explain(model_version, [record], top=3)
+
+    assert result["model_version"] == "v1" and result["explainer"] == "linear"
+    explanation = result["explanations"][0]
+    assert explanation["prediction"] == model_version.predictor.predict_one(record)
+    magnitudes = [abs(v) for v in explanation["attributions"].values()]
+    assert len(magnitudes) == 3 and magnitudes == sorted(magnitudes, reverse=True)
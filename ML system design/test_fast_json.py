@@ -0,0 +1,54 @@
+import datetime
+import json
+
+import numpy as np
+from bson.objectid import ObjectId
+from flask import Flask, jsonify, request
+
+import fast_json
+
+
+def test_encodes_mongo_numpy_and_datetime_values():
+    oid = ObjectId()
+    payload = {
+        "_id": oid,
+        "prediction": np.int64(1),
+        "probability": np.float32(0.5),
+        "passed": np.bool_(True),
+        "scores": np.arange(3),
+        "columns": np.arange(6).reshape(2, 3)[:, 1],  # non-contiguous view
+        "created": datetime.datetime(2024, 1, 2, 3, 4, 5),
+        "day": datetime.date(2024, 1, 2),
+    }
+    assert json.loads(fast_json.dumps(payload)) == {
+        "_id": str(oid), "prediction": 1, "probability": 0.5, "passed": True, "scores": [0, 1, 2],
+        "columns": [1, 4], "created": "2024-01-02T03:04:05", "day": "2024-01-02",
+    }
+    assert fast_json.loads(fast_json.dumps([{"a": 1}])) == [{"a": 1}]
+
+
+def test_flask_provider_handles_requests_and_responses():
+    app = fast_json.use_fast_json(Flask(__name__))
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        data = request.get_json()
+        return jsonify([{"prediction": np.int64(len(data)), "_id": ObjectId("0" * 24)}])
+
+    client = app.test_client()
+    response = client.post("/echo", json=[{"age": 17}, {"age": 18}])
+    assert response.status_code == 200 and response.mimetype == "application/json"
+    assert response.get_json() == [{"prediction": 2, "_id": "0" * 24}]
+    assert client.post("/echo", data=b"{bad", content_type="application/json").status_code == 400
+
+
+def test_stdlib_fallback_is_logged_once(monkeypatch, caplog):
+    monkeypatch.setattr(fast_json, "orjson", None)
+    monkeypatch.setattr(fast_json, "_fallback_logged", False)
+
+    fast_json.use_fast_json(Flask(__name__))
+    fast_json.use_fast_json(Flask(__name__))
+
+    assert [r.message for r in caplog.records if "orjson" in r.message] == [
+        "orjson is not installed; fast_json falls back to the standard library json (slower)"
+    ]
@@ -0,0 +1,69 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from fast_pipeline import compile_pipeline
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(HERE, "performance_pipeline.pkl")
+DATASETS = {
+    "math": os.path.join(HERE, "data", "raw", "student_mat.csv"),
+    "portuguese": os.path.join(HERE, "data", "raw", "student_por.csv"),
+}
+
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def kernel(model):
+    return compile_pipeline(model)
+
+
+def load_dataset(name):
+    df = pd.read_csv(DATASETS[name])
+    df["dataset"] = name
+    return df
+
+
+@pytest.mark.parametrize("name", sorted(DATASETS))
+def test_predict_matches_pipeline(model, kernel, name):
+    df = load_dataset(name)
+    records = df.to_dict(orient="records")
+
+    expected = model.predict(df)
+    np.testing.assert_array_equal(kernel.predict(records), expected)
+    np.testing.assert_array_equal(kernel.predict_columns({c: df[c].to_numpy() for c in df.columns}), expected)
+    np.testing.assert_allclose(kernel.decision_function(records)[:, 0], model.decision_function(df), rtol=1e-9, atol=1e-9)
+
+
+def test_unknown_category_is_ignored_like_pipeline(model, kernel):
+    df = load_dataset("math").head(20)
+    df["Mjob"] = "astronaut"
+    df["dataset"] = "none"
+
+    np.testing.assert_array_equal(kernel.predict(df.to_dict(orient="records")), model.predict(df))
+
+
+def test_missing_column_raises(kernel):
+    record = load_dataset("math").iloc[0].to_dict()
+    del record["G1"]
+
+    with pytest.raises(ValueError, match="columns are missing"):
+        kernel.predict([record])
+
+
+def test_encode_matches_preprocessor(model, kernel):
+    df = load_dataset("portuguese")
+    records = df.to_dict(orient="records")
+
+    expected = model[:-1].transform(df)
+    expected = expected.toarray() if hasattr(expected, "toarray") else expected
+    np.testing.assert_allclose(kernel.encode(records), expected)
+    assert len(kernel.feature_names()) == expected.shape[1]
+    np.testing.assert_array_equal(kernel.predict_encoded(kernel.encode(records)), model.predict(df))
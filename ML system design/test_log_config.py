@@ -0,0 +1,74 @@
+import json
+import logging
+import sys
+
+import pytest
+
+from log_config import JsonFormatter, SamplingFilter, setup_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_queue_pipeline_writes_json_lines(tmp_path, monkeypatch, restore_root_logger):
+    monkeypatch.setenv("LOG_SAMPLE_RATE", "0")
+    path = tmp_path / "app.log"
+    pipeline = setup_logging(str(path))
+
+    logging.info("POST /predict served", extra={"sampled": True, "records": 3})
+    logging.info("kept", extra={"records": 3})
+    logging.warning("always kept", extra={"sampled": True})
+    pipeline.stop()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["msg"] for line in lines] == ["kept", "always kept"]
+    assert lines[0]["records"] == 3 and lines[0]["level"] == "INFO"
+    assert pipeline.stats()["dropped_sampled"] == 1
+
+
+def test_rotation_by_size(tmp_path, monkeypatch, restore_root_logger):
+    monkeypatch.setenv("LOG_MAX_BYTES", "2000")
+    monkeypatch.setenv("LOG_BACKUP_COUNT", "2")
+    pipeline = setup_logging(str(tmp_path / "app.log"))
+    for i in range(200):
+        logging.info(f"line {i}")
+    pipeline.stop()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["app.log", "app.log.1", "app.log.2"]
+
+
+def test_sampling_rate_is_roughly_respected():
+    sampler = SamplingFilter(rate=0.25)
+    records = [logging.makeLogRecord({"msg": "x", "levelno": logging.INFO, "sampled": True}) for _ in range(4000)]
+    kept = sum(sampler.filter(record) for record in records)
+    assert 800 < kept < 1200
+
+
+def test_formatter_includes_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.getLogger("t").makeRecord("t", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "failed" and "ValueError: boom" in entry["exc"]
+
+
+def test_setting_up_again_stops_the_previous_pipeline(tmp_path, restore_root_logger):
+    first = setup_logging(str(tmp_path / "first.log"))
+    logging.info("to the first file")
+    second = setup_logging(str(tmp_path / "second.log"))
+    logging.info("to the second file")
+    second.stop()
+
+    assert first.listener is None
+    assert "to the first file" in (tmp_path / "first.log").read_text()
+    assert "to the first file" not in (tmp_path / "second.log").read_text()
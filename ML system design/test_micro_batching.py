@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from micro_batching import MicroBatcher, QueueFull
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def recording_predict(calls):
+    def predict(records):
+        calls.append(list(records))
+        return [record * 10 for record in records]
+    return predict
+
+
+def test_concurrent_requests_share_one_call_and_get_their_own_result():
+    calls = []
+    batcher = MicroBatcher(recording_predict(calls), max_batch_size=32, max_wait_ms=50)
+
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.stop()
+        return results
+
+    assert run(main()) == [i * 10 for i in range(10)]
+    assert calls == [list(range(10))]
+    assert batcher.stats()["batch_size_histogram"] == {10: 1}
+
+
+def test_batches_are_capped_at_max_batch_size():
+    calls = []
+    batcher = MicroBatcher(recording_predict(calls), max_batch_size=4, max_wait_ms=50)
+
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.stop()
+        return results
+
+    assert run(main()) == [i * 10 for i in range(10)]
+    assert [len(call) for call in calls] == [4, 4, 2]
+
+
+def test_a_lone_request_is_flushed_after_max_wait():
+    calls = []
+    batcher = MicroBatcher(recording_predict(calls), max_batch_size=32, max_wait_ms=50)
+
+    async def main():
+        start = time.perf_counter()
+        result = await batcher.submit(1)
+        elapsed = time.perf_counter() - start
+        await batcher.stop()
+        return result, elapsed
+
+    result, elapsed = run(main())
+    assert result == 10 and calls == [[1]]
+    assert 0.04 <= elapsed < 1.0
+
+
+def test_a_failing_batch_raises_in_every_waiting_caller():
+    failures = []
+
+    def predict(records):
+        if not failures:
+            failures.append(records)
+            raise ValueError("model exploded")
+        return records
+
+    batcher = MicroBatcher(predict, max_batch_size=32, max_wait_ms=20)
+
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        # The batcher keeps serving after a failed batch
+        after = await batcher.submit(7)
+        await batcher.stop()
+        return results, after
+
+    results, after = run(main())
+    assert all(isinstance(r, ValueError) and str(r) == "model exploded" for r in results)
+    assert after == 7
+    assert batcher.stats()["errors"] == 1
+
+
+def test_full_queue_rejects_new_requests():
+    started, release = threading.Event(), threading.Event()
+
+    def predict(records):
+        started.set()
+        release.wait(5)
+        return records
+
+    batcher = MicroBatcher(predict, max_batch_size=1, max_wait_ms=0, max_concurrency=1, max_queue_size=2)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        # One batch blocks the only executor slot, two more fill the queue
+        first = asyncio.ensure_future(batcher.submit(0))
+        await loop.run_in_executor(None, started.wait, 5)
+        queued = [asyncio.ensure_future(batcher.submit(i)) for i in (1, 2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(QueueFull):
+            await batcher.submit(3)
+
+        release.set()
+        results = await asyncio.gather(first, *queued)
+        await batcher.stop()
+        return results
+
+    assert run(main()) == [0, 1, 2]
+    assert batcher.stats()["rejected"] == 1
+
+
+def test_student_api_answers_503_when_the_queue_is_full(monkeypatch):
+    import pandas as pd
+    from fastapi.testclient import TestClient
+
+    import student_api
+
+    async def full(record):
+        raise QueueFull("Prediction queue is full (1 waiting)")
+
+    monkeypatch.setattr(student_api.batcher, "submit", full)
+    monkeypatch.setattr(student_api.cache, "get", lambda key, version: student_api.PredictionCache.MISS)
+    student = pd.read_csv("data/raw/student_mat.csv").iloc[0].to_dict()
+
+    response = TestClient(student_api.app).post("/predict", json={**student, "dataset": "math"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == student_api.RETRY_AFTER_SECONDS
+    assert response.json()["detail"].startswith("Prediction queue is full")
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_worker_pool_predictions_match_the_in_process_model(kind):
+    import pandas as pd
+
+    import student_api
+
+    records = pd.read_csv("data/raw/student_mat.csv").assign(dataset="math").head(50).to_dict(orient="records")
+    mv = student_api.registry.current
+    expected = [(int(p), mv.version) for p in mv.pipeline.predict(pd.DataFrame(records))]
+
+    executor = student_api.create_executor(kind, 2)
+    batcher = MicroBatcher(student_api.predict_batch, max_batch_size=16, max_wait_ms=5, executor=executor,
+                           max_concurrency=2, context_fn=student_api.current_model)
+
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(record) for record in records))
+        await batcher.stop()
+        return results
+
+    try:
+        assert run(main()) == expected
+    finally:
+        executor.shutdown()
+    assert batcher.stats()["batches"] > 1
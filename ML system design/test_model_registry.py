@@ -0,0 +1,101 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import pytest
+
+from model_registry import ModelRegistry, load_warmup_sample
+
+MODEL_PATH = "performance_pipeline.pkl"
+WARMUP = "data/raw/student_mat.csv"
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    shutil.copy(MODEL_PATH, tmp_path / "performance_pipeline-v1.pkl")
+    return tmp_path
+
+
+def write_second_pipeline(model_dir, name="performance_pipeline-v2.pkl"):
+    """A different fitted pipeline: same preprocessing, intercept pushed so every student passes."""
+    pipeline = joblib.load(MODEL_PATH)
+    pipeline.named_steps["model"].intercept_ = pipeline.named_steps["model"].intercept_ + 100.0
+    path = model_dir / name
+    joblib.dump(pipeline, path)
+    bump_mtime(path)
+    return path
+
+
+def bump_mtime(path, seconds=10):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+def test_newer_file_is_loaded_and_swapped_in(model_dir):
+    registry = ModelRegistry(str(model_dir), poll_interval=0, warmup_path=WARMUP)
+    v1 = registry.current
+    assert registry.refresh() is False
+
+    write_second_pipeline(model_dir)
+    assert registry.refresh() is True
+    assert registry.current.version != v1.version
+    assert registry.previous is v1
+    assert set(registry.current.predictor.predict(registry.warmup_sample)) == {1}
+
+
+def test_requests_in_flight_keep_their_version_during_a_swap(model_dir):
+    registry = ModelRegistry(str(model_dir), poll_interval=0, warmup_path=WARMUP)
+    records = load_warmup_sample(WARMUP)
+    v1 = registry.current
+    write_second_pipeline(model_dir)
+
+    def request(_):
+        mv = registry.current  # read once, like the apps
+        return mv.version, [int(p) for p in mv.predictor.predict(records)]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pending = [pool.submit(request, i) for i in range(200)]
+        registry.refresh()
+        results = [future.result() for future in pending]
+
+    expected = {mv.version: [int(p) for p in mv.predictor.predict(records)] for mv in (v1, registry.current)}
+    assert all(predictions == expected[version] for version, predictions in results)
+    assert expected[v1.version] != expected[registry.current.version]
+
+
+def test_rollback_restores_the_previous_version(model_dir):
+    registry = ModelRegistry(str(model_dir), poll_interval=0, warmup_path=WARMUP)
+    with pytest.raises(RuntimeError, match="No previous model version"):
+        registry.rollback()
+
+    v1 = registry.current
+    write_second_pipeline(model_dir)
+    registry.refresh()
+    v2 = registry.current
+
+    assert registry.rollback() is v1
+    assert (registry.current, registry.previous) == (v1, v2)
+    assert registry.get(v2.version) is v2
+
+
+def test_failed_load_keeps_the_live_model(model_dir):
+    registry = ModelRegistry(str(model_dir), poll_interval=0, warmup_path=WARMUP)
+    v1 = registry.current
+
+    broken = model_dir / "performance_pipeline-broken.pkl"
+    broken.write_bytes(b"not a pickle")
+    bump_mtime(broken)
+
+    assert registry.refresh() is False
+    assert registry.current is v1
+    assert str(broken) in registry.info()["rejected"]
+
+
+def test_initial_load_error_says_why_the_file_was_rejected(tmp_path):
+    broken = tmp_path / "performance_pipeline.pkl"
+    broken.write_bytes(b"not a pickle")
+
+    with pytest.raises(RuntimeError, match="No loadable model") as error:
+        ModelRegistry(str(tmp_path), poll_interval=0)
+    assert f"({broken}: " in str(error.value)
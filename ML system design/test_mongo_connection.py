@@ -0,0 +1,89 @@
+import time
+
+import mongomock
+import pytest
+
+from mongo_connection import MongoConnectionManager
+
+
+class CountingClient(mongomock.MongoClient):
+    """mongomock client that counts pings and can be switched to failing."""
+
+    def __init__(self):
+        super().__init__()
+        self.pings = 0
+        self.down = False
+        client = self
+
+        class Admin:
+            def command(self, name):
+                client.pings += 1
+                if client.down:
+                    raise ConnectionError("server unreachable")
+                return {"ok": 1.0}
+
+        self._admin = Admin()
+
+    @property
+    def admin(self):
+        return self._admin
+
+
+@pytest.fixture
+def client():
+    return CountingClient()
+
+
+def test_status_is_unknown_until_the_first_ping(client):
+    mongo = MongoConnectionManager(client=client, health_interval=0)
+    assert mongo.health()["connected"] is None and client.pings == 0
+
+    assert mongo.status() == (True, "SUCCESS")
+    assert mongo.status() == (True, "SUCCESS")
+    assert client.pings == 1
+
+
+def test_status_is_answered_from_the_cache_between_checks(client):
+    mongo = MongoConnectionManager(client=client, health_interval=0.2)
+    try:
+        deadline = time.monotonic() + 5
+        while client.pings == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for _ in range(100):
+            assert mongo.status() == (True, "SUCCESS")
+        assert client.pings == 1
+
+        # The next background check picks up the outage
+        client.down = True
+        deadline = time.monotonic() + 5
+        while mongo.status()[0] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert mongo.status() == (False, "server unreachable")
+        assert mongo.health()["failed_checks"] >= 1
+    finally:
+        mongo.close()
+
+
+def test_reported_failure_flips_the_cached_status_until_the_next_ping(client):
+    mongo = MongoConnectionManager(client=client, health_interval=0)
+    mongo.check_now()
+
+    mongo.report_failure(ConnectionError("connection reset"))
+    assert mongo.status() == (False, "connection reset")
+
+    assert mongo.check_now() == (True, "SUCCESS")
+    assert client.pings == 2
+
+
+def test_each_process_gets_its_own_client(monkeypatch):
+    import mongo_connection
+
+    monkeypatch.setattr(mongo_connection, "MongoClient", lambda uri, **options: mongomock.MongoClient())
+    mongo = MongoConnectionManager(health_interval=0)
+    parent = mongo.client
+    assert mongo.client is parent
+
+    # A forked worker sees another pid and must not reuse the parent's sockets
+    monkeypatch.setattr(mongo_connection.os, "getpid", lambda: -1)
+    assert mongo.client is not parent
+    assert mongo.collection.database.client is mongo.client
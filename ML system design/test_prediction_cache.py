@@ -0,0 +1,68 @@
+import prediction_cache
+from prediction_cache import PredictionCache
+
+MISS = PredictionCache.MISS
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISS
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(ttl=10)
+    cache.set("a", 1)
+
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is MISS
+    assert cache.stats()["expirations"] == 1
+
+
+def test_entries_are_kept_per_model_version():
+    cache = PredictionCache(ttl=0)
+    cache.set("a", 1, version="v1")
+
+    assert cache.get("a", version="v1") == 1
+    assert cache.get("a") is MISS
+    cache.set("a", 0, version="v1")
+    assert cache.get("a", version="v1") == 0
+
+
+def test_new_version_clears_but_in_flight_old_version_does_not():
+    cache = PredictionCache(ttl=0)
+    cache.set("a", 1, version="v1")
+    assert cache.get("a", version="v1") == 1
+
+    # Swap: the first lookup with the new version clears the old entries
+    assert cache.get("a", version="v2") is MISS
+    cache.set("a", 2, version="v2")
+    assert cache.stats()["invalidations"] == 1
+
+    # A request still on the old version finishes after the swap
+    assert cache.get("a", version="v1") is MISS
+    cache.set("a", 1, version="v1")
+    assert cache.get("a", version="v2") == 2
+    assert cache.stats()["invalidations"] == 1 and cache.stats()["model_version"] == "v2"
+
+
+def test_model_file_change_clears_the_cache(tmp_path):
+    model = tmp_path / "model.pkl"
+    model.write_bytes(b"v1")
+    cache = PredictionCache(ttl=0, model_path=str(model), check_interval=0)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    model.write_bytes(b"v2 with another size")
+    assert cache.get("a") is MISS
+    assert cache.stats()["invalidations"] == 1
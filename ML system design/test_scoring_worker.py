@@ -0,0 +1,68 @@
+import mongomock
+import pytest
+
+from ingest_students import ingest_file
+from model_registry import ModelRegistry
+from scoring_worker import ScoringWorker, _only_touches_score
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient()["student_performance"]
+    ingest_file(db["records"], "data/raw/student_mat.csv")
+    return db
+
+
+@pytest.fixture
+def worker(db):
+    registry = ModelRegistry(poll_interval=0)
+    return ScoringWorker(db["records"], db["scoring_worker_state"], registry, batch_size=100)
+
+
+def test_backfill_scores_every_stale_document(db, worker):
+    assert worker.backfill() == 395
+    assert db["records"].count_documents({"scoring.model_version": worker.registry.current.version}) == 395
+    assert worker.backfill() == 0
+
+
+def test_sweep_rescores_edited_records_and_saves_its_cursor(db, worker):
+    worker.backfill()
+    doc = db["records"].find_one()
+    db["records"].update_one({"_id": doc["_id"]}, {"$set": {"G1": 0, "G2": 0}})
+
+    scored = worker.scored
+    worker._sweep()
+
+    assert worker.scored == scored + 1
+    assert db["scoring_worker_state"].find_one({"_id": "scoring-worker"}) is not None
+
+
+def test_mongomock_falls_back_to_polling(worker):
+    worker.poll_interval = 0.01
+    worker._stop.wait = lambda timeout: worker._stop.set() or True  # one poll, then stop
+
+    worker.run()
+
+    assert worker.stats()["mode"] == "poll"
+    assert worker.scored == 395
+
+
+def test_own_write_backs_are_ignored():
+    own = {"operationType": "update", "updateDescription": {"updatedFields": {"scoring": {}}, "removedFields": []}}
+    edit = {"operationType": "update", "updateDescription": {"updatedFields": {"G2": 3}, "removedFields": []}}
+    assert _only_touches_score(own)
+    assert not _only_touches_score(edit)
+    assert not _only_touches_score({"operationType": "insert"})
+
+
+def test_failing_documents_are_not_retried_on_every_poll(db, worker):
+    bad = db["records"].find_one()["_id"]
+    db["records"].update_one({"_id": bad}, {"$set": {"age": "x"}})
+
+    assert worker.backfill() == 394
+    assert worker.backfill() == 0
+    assert worker.errors == 1 and worker.stats()["failed_documents"] == 1
+
+    # Fixing the record makes it eligible again
+    db["records"].update_one({"_id": bad}, {"$set": {"age": 17}})
+    assert worker.backfill() == 1
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+import serve
+
+SMAPS_ROLLUP = """\
+563f54bc0000-7ffef6efd000 ---p 00000000 00:00 0                          [rollup]
+Rss:              204800 kB
+Pss:               61440 kB
+Pss_Anon:          10240 kB
+Shared_Clean:     143360 kB
+Shared_Dirty:       4096 kB
+Private_Clean:     20480 kB
+Private_Dirty:     36864 kB
+Swap:                  0 kB
+"""
+
+
+def test_read_memory_parses_smaps_rollup(tmp_path):
+    path = tmp_path / "smaps_rollup"
+    path.write_text(SMAPS_ROLLUP)
+
+    assert serve.read_memory(1, path=str(path)) == {
+        "rss_mb": 200.0, "pss_mb": 60.0, "shared_mb": 144.0, "private_mb": 56.0,
+    }
+    assert serve.read_memory(1, path=str(tmp_path / "missing")) is None
+
+
+@pytest.fixture
+def post_request(monkeypatch):
+    reads = []
+
+    def fake_read_memory(pid):
+        reads.append(pid)
+        return {"rss_mb": 300.0, "pss_mb": 100.0, "shared_mb": 100.0, "private_mb": 200.0}
+
+    monkeypatch.setattr(serve, "read_memory", fake_read_memory)
+
+    def call(limit_mb, nr):
+        worker = SimpleNamespace(nr=nr, alive=True)
+        serve.make_hooks(0, limit_mb)["post_request"](worker, None, {}, None)
+        return worker.alive, len(reads)
+
+    return call
+
+
+def test_worker_memory_is_checked_every_100_requests(post_request):
+    assert post_request(150, 99) == (True, 0)
+    assert post_request(150, 100) == (False, 1)
+    assert post_request(150, 250) == (True, 1)
+    assert post_request(150, 300) == (False, 2)
+
+
+def test_worker_under_the_limit_or_without_one_is_kept(post_request):
+    assert post_request(250, 100) == (True, 1)
+    assert post_request(0, 100) == (True, 1)
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import student_api
+
+STUDENT = {"school": "GP", "sex": "F", "age": 17, "G1": 12, "G2": 13}
+
+
+@pytest.fixture
+def client():
+    return TestClient(student_api.app)
+
+
+def test_predict_fills_defaults_like_the_flask_service(client):
+    response = client.post("/predict", json=STUDENT)
+    assert response.status_code == 200
+    assert response.json()["model_version"] == student_api.registry.current.version
+
+
+@pytest.mark.parametrize("field, value", [("dataset", "mat"), ("age", 99), ("sex", 1)])
+def test_predict_and_explain_reject_what_the_schema_rejects(client, field, value):
+    for path in ("/predict", "/explain"):
+        response = client.post(path, json={**STUDENT, field: value})
+        assert response.status_code == 422
+        detail = response.json()["detail"]
+        assert detail["error"] == "Validation failed" and field in detail["details"][0]["errors"]
+
+
+def test_explanation_engine_is_built_on_the_first_explain_request(client, monkeypatch):
+    monkeypatch.setattr(student_api, "explanations", None)
+
+    response = client.post("/explain", json=STUDENT, params={"top": 3})
+    assert response.status_code == 200
+    assert len(response.json()["attributions"]) == 3
+    assert student_api.explanations is not None
@@ -0,0 +1,104 @@
+import json
+
+import mongomock
+import pytest
+from flask import Flask, jsonify, request
+
+from ingest_students import ingest_file
+from student_ingest import IngestError, ingest, ingest_request
+
+MAT_CSV = "data/raw/student_mat.csv"
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient()["student_performance"]["records"]
+
+
+@pytest.fixture
+def client(collection):
+    app = Flask(__name__)
+
+    @app.route("/students/bulk", methods=["POST"])
+    def add_students_bulk():
+        try:
+            return jsonify(ingest_request(collection, request))
+        except IngestError as e:
+            return jsonify({"error": str(e)}), 400
+
+    return app.test_client()
+
+
+def csv_lines(path=MAT_CSV, rows=None):
+    with open(path) as f:
+        lines = f.read().splitlines(keepends=True)
+    return lines if rows is None else lines[:rows + 1]
+
+
+def test_csv_file_is_loaded_in_batches(collection):
+    summary = ingest_file(collection, MAT_CSV, batch_size=100)
+
+    assert summary["received"] == summary["inserted"] == collection.count_documents({}) == 395
+    assert summary["batches"] == 4
+    assert summary["failed"] == 0
+    assert collection.find_one()["dataset"] == "math"
+    assert isinstance(collection.find_one()["age"], int)
+
+
+def test_bad_rows_are_reported_without_aborting_the_batch(client, collection):
+    lines = csv_lines(rows=5)
+    lines[1] = lines[1].replace(",18,", ",old,", 1)  # file line 2: age is not an int
+    lines.append("GP,F,17\n")  # file line 7: short row
+
+    response = client.post("/students/bulk?dataset=math&batch_size=2", data="".join(lines),
+                           content_type="text/csv")
+
+    assert response.status_code == 200
+    summary = response.json
+    assert (summary["received"], summary["inserted"], summary["failed"]) == (6, 4, 2)
+    assert [error["line"] for error in summary["errors"]] == [2, 7]
+    assert "age" in summary["errors"][0]["error"]
+    assert collection.count_documents({}) == 4
+
+
+def test_write_errors_fail_only_their_own_rows(collection):
+    collection.create_index("absences", unique=True)
+    row = json.loads(csv_to_jsonl(csv_lines(rows=1))[0])
+    rows = [(line, {**row, "absences": absences}, None) for line, absences in [(2, 1), (3, 1), (4, 2)]]
+
+    summary = ingest(collection, rows, batch_size=10)
+
+    assert (summary["inserted"], summary["failed"], summary["batches"]) == (2, 1, 1)
+    assert [error["line"] for error in summary["errors"]] == [3]
+
+
+def test_jsonl_body(client, collection):
+    body = "".join(csv_to_jsonl(csv_lines(rows=3))) + "\nnot json\n[1, 2]\n"
+    summary = client.post("/students/bulk", data=body, content_type="application/x-ndjson").json
+
+    assert (summary["inserted"], summary["failed"]) == (3, 2)
+    assert collection.count_documents({"dataset": "portuguese"}) == 3
+
+
+@pytest.mark.parametrize("query", ["format=xml", "batch_size=0", "batch_size=abc", "dataset=french"])
+def test_bad_parameters_are_rejected(client, query):
+    assert client.post(f"/students/bulk?{query}", data="").status_code == 400
+
+
+def csv_to_jsonl(lines):
+    header = lines[0].strip().split(",")
+    return [json.dumps({**dict(zip(header, line.strip().split(","))), "dataset": "portuguese"}) + "\n"
+            for line in lines[1:]]
+
+
+
+def test_rows_the_prediction_schema_rejects_are_not_stored(collection):
+    row = json.loads(csv_to_jsonl(csv_lines(rows=1))[0])
+    rows = [(2, row, None), (3, {**row, "dataset": "mat"}, None), (4, {**row, "age": 99}, None),
+            (5, {k: v for k, v in row.items() if k != "G2"}, None)]
+
+    summary = ingest(collection, rows, batch_size=10)
+
+    assert (summary["inserted"], summary["failed"]) == (1, 3)
+    assert [error["error"].split(":")[0] for error in summary["errors"]] == ["dataset", "age", "G2"]
+    assert summary["errors"][2]["error"] == "G2: field required"
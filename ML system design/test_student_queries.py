@@ -0,0 +1,73 @@
+import json
+
+import mongomock
+import pytest
+from flask import Flask, jsonify, request
+
+import student_queries
+from student_queries import QueryError, students_response
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient()["student_performance"]["records"]
+    collection.insert_many([{"school": "GP", "age": 15 + i % 5, "G3": i % 20} for i in range(250)])
+    return collection
+
+
+@pytest.fixture
+def client(collection):
+    app = Flask(__name__)
+
+    @app.route("/students")
+    def get_students():
+        try:
+            return students_response(collection, request.args)
+        except QueryError as e:
+            return jsonify({"error": str(e)}), 400
+
+    return app.test_client()
+
+
+def test_keyset_pagination_walks_every_student_once(client, collection):
+    seen, after = [], None
+    while True:
+        response = client.get("/students", query_string={"limit": 100, **({"after": after} if after else {})})
+        assert response.status_code == 200
+        seen.extend(student["_id"] for student in response.json)
+        after = response.headers.get("X-Next-Cursor")
+        if not after:
+            break
+
+    assert len(seen) == len(set(seen)) == collection.count_documents({})
+    assert seen == sorted(seen)
+
+
+def test_default_and_max_page_size(client, monkeypatch):
+    assert len(client.get("/students").json) == student_queries.DEFAULT_PAGE_SIZE
+
+    monkeypatch.setattr(student_queries, "MAX_PAGE_SIZE", 10)
+    assert len(client.get("/students?limit=5000").json) == 10
+
+
+def test_projection_keeps_only_requested_fields(client):
+    students = client.get("/students?fields=age&limit=3").json
+    assert all(set(student) == {"_id", "age"} for student in students)
+
+
+def test_ndjson_stream(client, collection):
+    response = client.get("/students?format=ndjson&fields=G3")
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert len(lines) == collection.count_documents({})
+    assert set(lines[0]) == {"_id", "G3"}
+
+
+def test_json_stream_is_one_array(client):
+    response = client.get("/students?format=json-stream&limit=7")
+    assert len(json.loads(response.data)) == 7
+
+
+@pytest.mark.parametrize("query", ["after=nope", "limit=0", "limit=abc", "format=xml", "fields=$where"])
+def test_bad_parameters_are_rejected(client, query):
+    assert client.get(f"/students?{query}").status_code == 400
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from student_schema import DEFAULTS, REQUIRED_COLUMNS, STUDENT_SCHEMA, CompiledSchema, StudentData
+
+
+def load_records():
+    df = pd.read_csv("data/raw/student_mat.csv")
+    df["dataset"] = "math"
+    return df.to_dict("records")
+
+
+def test_raw_rows_validate_unchanged():
+    records = load_records()
+    result = STUDENT_SCHEMA.validate(records)
+
+    assert result.ok and result.valid.all()
+    expected = [{col: record[col] for col in REQUIRED_COLUMNS} for record in records]
+    assert result.records() == expected
+    # Same values pydantic would produce, field by field
+    assert result.records()[:5] == [StudentData(**record).model_dump() for record in expected[:5]]
+
+
+def test_defaults_and_coercion():
+    result = STUDENT_SCHEMA.validate([{"age": "17", "Mjob": None, "G1": 12.0}, {}])
+
+    assert result.ok
+    first, second = result.records()
+    assert first["age"] == 17 and first["G1"] == 12 and first["Mjob"] == DEFAULTS["Mjob"]
+    assert second == {col: DEFAULTS[col] for col in REQUIRED_COLUMNS}
+    assert all(type(first[col]) is int for col in ("age", "G1", "Walc"))
+
+
+def test_errors_are_reported_per_row():
+    records = load_records()[:4]
+    records[1] = {**records[1], "age": 30, "sex": "X", "G1": "twelve"}
+    records[2] = "not an object"
+    records[3] = {**records[3], "Mjob": ["teacher"], "absences": 1.5}
+    result = STUDENT_SCHEMA.validate(records)
+
+    assert result.valid.tolist() == [True, False, False, False]
+    assert result.errors == [
+        {"index": 1, "errors": {"sex": "must be one of ['F', 'M']", "age": "must be between 15 and 22",
+                                "G1": "must be an integer"}},
+        {"index": 2, "errors": {"_record": "expected a JSON object"}},
+        {"index": 3, "errors": {"Mjob": "must be a string", "absences": "must be an integer"}},
+    ]
+    assert len(result.records()) == 1 and len(result.records(valid_only=False)) == 4
+    assert len(result.model_columns()["age"]) == 1
+
+
+def test_required_fields_and_relaxed_checks():
+    schema = CompiledSchema(required=["school", "age"])
+    result = schema.validate([{"school": "GP", "age": 16}, {"age": None}])
+    assert result.errors == [{"index": 1, "errors": {"school": "field required", "age": "field required"}}]
+
+    lenient = CompiledSchema(check_ranges=False, check_categories=False)
+    assert lenient.validate({"age": 40, "school": "XY"}).ok
@@ -0,0 +1,86 @@
+import mongomock
+import pytest
+
+from fast_pipeline import load_compiled_pipeline
+from ingest_students import ingest_file
+from model_registry import ModelVersion
+from student_scoring import SCORE_FIELD, score_documents, score_matching, score_student
+
+MODEL_PATH = "performance_pipeline.pkl"
+
+
+@pytest.fixture(scope="module")
+def model_version():
+    pipeline, predictor = load_compiled_pipeline(MODEL_PATH)
+    return ModelVersion("v1", MODEL_PATH, pipeline, predictor, 0.0)
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient()["student_performance"]["records"]
+    ingest_file(collection, "data/raw/student_mat.csv")
+    return collection
+
+
+def test_scores_are_stored_and_reused(collection, model_version):
+    _id = collection.find_one()["_id"]
+
+    first = score_student(collection, str(_id), model_version)
+    stored = collection.find_one({"_id": _id})[SCORE_FIELD]
+    assert first["cached"] is False
+    assert stored["model_version"] == "v1" and stored["prediction"] == first["prediction"]
+    assert len(stored["features"]) == len(model_version.predictor.feature_names())
+
+    assert score_student(collection, str(_id), model_version)["cached"] is True
+    assert score_student(collection, str(_id), model_version, force=True)["cached"] is False
+
+
+def test_changed_record_or_model_is_rescored(collection, model_version):
+    doc = collection.find_one()
+    score_documents(collection, [doc], model_version)
+
+    collection.update_one({"_id": doc["_id"]}, {"$set": {"G2": doc["G2"] + 1}})
+    assert score_student(collection, str(doc["_id"]), model_version)["cached"] is False
+
+    v2 = ModelVersion("v2", MODEL_PATH, model_version.pipeline, model_version.predictor, 0.0)
+    result = score_student(collection, str(doc["_id"]), v2)
+    assert (result["cached"], result["model_version"]) == (False, "v2")
+
+
+def test_filtered_bulk_scoring_matches_pipeline(collection, model_version):
+    args = {"filter": '{"school": "MS"}', "limit": "1000"}
+    summary = score_matching(collection, args, model_version)
+
+    docs = list(collection.find({"school": "MS"}).sort("_id", 1))
+    expected = model_version.predictor.predict([{**doc} for doc in docs])
+    assert summary["matched"] == summary["scored"] == len(docs)
+    assert [p["prediction"] for p in summary["predictions"]] == [int(p) for p in expected]
+
+    again = score_matching(collection, args, model_version)
+    assert (again["scored"], again["cached"]) == (0, len(docs))
+
+
+def test_missing_student_and_bad_filter(collection, model_version):
+    from student_queries import QueryError
+
+    assert score_student(collection, "0" * 24, model_version) is None
+    with pytest.raises(QueryError):
+        score_matching(collection, {"filter": '{"$where": "1"}'}, model_version)
+
+
+def test_invalid_stored_documents_are_reported_not_fatal(collection, model_version):
+    docs = list(collection.find().sort("_id", 1).limit(3))
+    collection.update_one({"_id": docs[0]["_id"]}, {"$set": {"age": "x"}})
+    collection.update_one({"_id": docs[1]["_id"]}, {"$set": {"dataset": "mat"}})
+    docs = list(collection.find().sort("_id", 1).limit(3))
+
+    results = score_documents(collection, docs, model_version)
+
+    assert results[0]["error"] == "Validation failed" and "age" in results[0]["details"]
+    assert "dataset" in results[1]["details"]
+    assert results[2]["prediction"] == int(model_version.predictor.predict_one(docs[2]))
+    assert SCORE_FIELD not in collection.find_one({"_id": docs[0]["_id"]})
+    assert collection.find_one({"_id": docs[2]["_id"]})[SCORE_FIELD]["model_version"] == "v1"
+
+    summary = score_matching(collection, {"limit": "3"}, model_version)
+    assert (summary["failed"], summary["cached"]) == (2, 1)
@@ -0,0 +1,137 @@
+import json
+
+import mongomock
+import pytest
+
+from model_registry import ModelRegistry
+from mongo_connection import MongoConnectionManager
+from student_service import create_app
+
+STUDENT = {"school": "GP", "sex": "F", "age": 17, "G1": 12, "G2": 13}
+HEADERS = {"x-api-key": "test-key"}
+
+
+@pytest.fixture
+def client():
+    mongo = MongoConnectionManager(client=mongomock.MongoClient(), health_interval=0)
+    app = create_app(registry=ModelRegistry(poll_interval=0), mongo=mongo, prometheus=False,
+                     api_key="test-key", log_payloads=False)
+    return app.test_client()
+
+
+def test_predict_keeps_the_shape_of_the_input(client):
+    single = client.post("/predict", json=STUDENT, headers=HEADERS)
+    batch = client.post("/predict", json=[STUDENT, STUDENT], headers=HEADERS)
+
+    assert single.status_code == 200 and batch.status_code == 200
+    assert set(single.json) == {"prediction", "model_version"}
+    assert batch.json == [single.json, single.json]
+
+
+def test_predict_rejects_invalid_records_and_missing_key(client):
+    invalid = client.post("/predict", json={**STUDENT, "age": "old"}, headers=HEADERS)
+    assert invalid.status_code == 400
+    assert invalid.json["details"][0]["index"] == 0
+    unknown_dataset = client.post("/predict", json={**STUDENT, "dataset": "mat"}, headers=HEADERS)
+    assert unknown_dataset.status_code == 400 and "dataset" in unknown_dataset.json["details"][0]["errors"]
+
+    assert client.post("/predict", json=STUDENT).status_code == 401
+
+
+def test_batch_predict_streams_one_line_per_input(client):
+    body = "\n".join([json.dumps(STUDENT), "not json", json.dumps({**STUDENT, "sex": "X"})]) + "\n"
+    response = client.post("/predict/batch", data=body, headers=HEADERS)
+    lines = [json.loads(line) for line in response.data.splitlines()]
+
+    assert [line["line"] for line in lines] == [1, 2, 3]
+    assert "prediction" in lines[0]
+    assert lines[1]["error"].startswith("Failed to decode JSON")
+    assert lines[2]["error"] == "Validation failed"
+
+
+def test_students_share_the_app_with_predictions(client):
+    inserted = client.post("/students", json=STUDENT).json["inserted_id"]
+
+    assert client.get(f"/students/{inserted}").json["school"] == "GP"
+    assert client.get("/students/not-an-id").status_code == 400
+    assert [s["_id"] for s in client.get("/students").json] == [inserted]
+
+    scored = client.post(f"/students/{inserted}/predict", headers=HEADERS)
+    assert scored.status_code == 200
+    stats = client.get("/stats").json
+    assert stats["model_version"] == scored.json["model_version"]
+    assert client.get("/metrics").json == stats
+
+
+def test_ready_turns_green_once_the_background_load_finishes(tmp_path):
+    empty = ModelRegistry(str(tmp_path), poll_interval=0, background=True)
+    with pytest.raises(RuntimeError, match="No loadable model"):
+        empty.wait_ready(timeout=30)
+    response = create_app(registry=empty, enable_mongo=False).test_client().get("/ready")
+    assert response.status_code == 503 and response.json["ready"] is False
+
+    registry = ModelRegistry(poll_interval=0, background=True)
+    client = create_app(registry=registry, enable_mongo=False).test_client()
+    registry.wait_ready(timeout=60)
+    assert client.get("/ready").json == {"ready": True, "model_version": registry.current.version}
+
+
+def test_batch_predictions_are_recorded_in_the_inference_metrics():
+    from prometheus_client import REGISTRY
+
+    from student_service.model import model_service_from_env
+
+    model = model_service_from_env(ModelRegistry(poll_interval=0), track_metrics=True)
+    mv = model.current
+    sample = lambda name: REGISTRY.get_sample_value(name, {"model_version": mv.version}) or 0.0
+    before = sample("student_inference_batch_size_count"), sample("student_inference_batch_size_sum")
+
+    result = model.validate([STUDENT] * 5, mv.version)
+    predictions = model.predict_columns(mv, result.model_columns())
+
+    assert len(predictions) == 5
+    assert sample("student_inference_batch_size_count") == before[0] + 1
+    assert sample("student_inference_batch_size_sum") == before[1] + 5
+
+
+def test_predict_routes_answer_503_while_the_model_loads(monkeypatch):
+    import threading
+
+    release = threading.Event()
+    load = ModelRegistry.load
+
+    def slow_load(self, path):
+        release.wait(30)
+        return load(self, path)
+
+    monkeypatch.setattr(ModelRegistry, "load", slow_load)
+    registry = ModelRegistry(poll_interval=0, background=True)
+    client = create_app(registry=registry, enable_mongo=False, prometheus=False).test_client()
+
+    for path in ("/predict", "/explain"):
+        response = client.post(path, json=STUDENT)
+        assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+        assert response.json["error"] == "Model not ready: loading"
+    assert client.get("/").json["model_version"] is None
+
+    release.set()
+    registry.wait_ready(timeout=60)
+    assert client.post("/predict", json=STUDENT).status_code == 200
+
+
+def test_cached_predictions_are_counted_but_not_timed():
+    from prometheus_client import REGISTRY
+
+    from student_service.model import model_service_from_env
+
+    model = model_service_from_env(ModelRegistry(poll_interval=0), track_metrics=True)
+    mv = model.current
+    sample = lambda name: REGISTRY.get_sample_value(name, {"model_version": mv.version}) or 0.0
+    before = sample("student_inference_predict_seconds_count"), sample("student_inference_batch_size_sum")
+
+    records = model.validate([STUDENT], mv.version).records()
+    first = model.predict(mv, records)
+    assert model.predict(mv, records) == first
+
+    assert sample("student_inference_predict_seconds_count") == before[0] + 1
+    assert sample("student_inference_batch_size_sum") == before[1] + 2
@@ -0,0 +1,38 @@
+import json
+import os
+
+import pandas as pd
+
+from columnar_dataset import convert_csv
+from model_registry import ModelRegistry
+from train import load_training_data, train
+
+RAW = ["data/raw/student_mat.csv", "data/raw/student_por.csv"]
+
+
+def test_csv_and_columnar_inputs_give_the_same_data(tmp_path):
+    from_csv, _ = load_training_data(["data/raw/*.csv"])
+    convert_csv(RAW, str(tmp_path / "students"))
+    from_columnar, _ = load_training_data([str(tmp_path / "students")])
+
+    assert len(from_csv) == 1044 and set(from_csv["dataset"]) == {"math", "portuguese"}
+    assert from_csv["passed"].tolist() == (from_csv["G3"] > 10).astype(int).tolist()
+    pd.testing.assert_frame_equal(from_csv, from_columnar, check_dtype=False)
+
+
+def test_writes_a_versioned_model_the_registry_serves(tmp_path):
+    grid = {"model__C": [1, 10], "model__solver": ["lbfgs"]}
+    report = train(RAW, str(tmp_path), param_grid=grid, cv=3, n_jobs=2)
+
+    model_path = tmp_path / f"performance_pipeline-{report['version']}.pkl"
+    assert model_path.exists() and not (tmp_path / ".performance_pipeline.pkl.tmp").exists()
+    with open(tmp_path / f"performance_pipeline-{report['version']}.json") as f:
+        assert json.load(f)["best_params"] == report["best_params"]
+    assert report["metrics"]["test"]["accuracy"] > 0.9
+    assert report["timing"]["fits"] == 6 and len(report["cv_results"]) == 2
+
+    registry = ModelRegistry(str(tmp_path), poll_interval=0, warmup_path=RAW[0])
+    info = registry.info()["current"]
+    assert info["version"] == report["version"] and info["kernel"] == "CompiledPipeline"
+    assert info["training"]["best_params"] == report["best_params"]
+    assert os.path.samefile(info["path"], model_path)
@@ -0,0 +1,224 @@
+"""
+Trains the pass/fail pipeline of `student_performance end-to-end.ipynb` headless.
+
+    python train.py                                  # data/raw/*.csv -> performance_pipeline-<version>.pkl
+    python train.py data/processed/students --output-dir models --n-jobs 8
+
+Same preprocessing (StandardScaler + OneHotEncoder) and LogisticRegression as
+the notebook, same target (passed = G3 > 10) and 80/20 stratified split. The
+grid search runs its folds in parallel across cores, and the fitted
+preprocessing of each fold is cached, so the candidates sharing a fold only
+fit the classifier.
+
+The model is written as performance_pipeline-<version>.pkl, where version is
+the short sha256 that ModelRegistry also uses, next to a .json file with
+the metrics, best parameters, per-candidate CV scores and a timing report.
+Pointing MODEL_DIR at the output directory makes the apps pick it up.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from columnar_dataset import is_columnar, load_columnar
+from prediction_cache import model_file_hash
+from student_schema import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, dataset_for_path
+
+DEFAULT_INPUTS = ["data/raw/*.csv"]
+TARGET = "passed"
+PASS_THRESHOLD = 10  # passed = G3 > PASS_THRESHOLD
+
+# Grid of the notebook's "Hyperparameter Tuning" cell
+PARAM_GRID = {
+    "model__C": [0.01, 0.1, 1, 10],
+    "model__solver": ["lbfgs", "liblinear"],
+}
+
+
+# ----------------------
+# Data
+# ----------------------
+def load_training_data(inputs):
+    """
+    One DataFrame from raw student CSVs (globs allowed) or columnar_dataset
+    directories, with the `dataset` column and the `passed` target.
+    """
+    frames, sources = [], []
+    for pattern in inputs:
+        paths = sorted(glob.glob(pattern)) or [pattern]
+        for path in paths:
+            if is_columnar(path):
+                df = load_columnar(path).to_pandas()
+            else:
+                header = pd.read_csv(path, nrows=0).columns
+                df = pd.read_csv(path, dtype={col: str for col in CATEGORICAL_COLUMNS if col in header})
+                if "dataset" not in df.columns:
+                    df["dataset"] = dataset_for_path(path)
+            frames.append(df)
+            sources.append(os.path.abspath(path))
+    if not frames:
+        raise ValueError(f"No training data found in {inputs}")
+
+    df = pd.concat(frames, ignore_index=True)
+    # Categorical columns from different sources can have different category sets
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    df[TARGET] = (df["G3"] > PASS_THRESHOLD).astype(int)
+    return df, sources
+
+
+def build_pipeline(memory=None):
+    """Unfitted preprocessing + LogisticRegression pipeline (steps "preprocessor", "model")."""
+    preprocessor = ColumnTransformer([
+        ("num", StandardScaler(), NUMERIC_COLUMNS),
+        ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL_COLUMNS),
+    ])
+    return Pipeline([("preprocessor", preprocessor), ("model", LogisticRegression(max_iter=1000))], memory=memory)
+
+
+# ----------------------
+# Training
+# ----------------------
+def evaluate(model, X, y):
+    predictions = model.predict(X)
+    probabilities = model.predict_proba(X)[:, 1]
+    return {
+        "accuracy": accuracy_score(y, predictions),
+        "roc_auc": roc_auc_score(y, probabilities),
+        "precision": precision_score(y, predictions, zero_division=0),
+        "recall": recall_score(y, predictions, zero_division=0),
+        "f1": f1_score(y, predictions, zero_division=0),
+        "confusion_matrix": confusion_matrix(y, predictions).tolist(),
+        "rows": len(y),
+    }
+
+
+def train(inputs=DEFAULT_INPUTS, output_dir=".", param_grid=None, cv=5, n_jobs=-1, test_size=0.2,
+          random_state=42, cache_dir=None, log=sys.stderr):
+    """
+    Runs the grid search, evaluates the best pipeline on the held-out split
+    and writes performance_pipeline-<version>.pkl + .json into output_dir.
+    Returns the report dict (also the .json content).
+
+    Parameters:
+    inputs (list): CSV paths/globs or columnar_dataset directories
+    output_dir (str): Where the versioned model and report are written
+    param_grid (dict): GridSearchCV grid (default: PARAM_GRID)
+    cv (int): Cross-validation folds
+    n_jobs (int): Parallel fits (-1 = all cores)
+    test_size (float): Held-out share for the final metrics
+    random_state (int): Seed of the train/test split
+    cache_dir (str): Directory for the fitted-preprocessing cache (default: a temp dir, removed afterwards)
+    """
+    timing = {}
+    start = time.perf_counter()
+    df, sources = load_training_data(inputs)
+    X = df[NUMERIC_COLUMNS + CATEGORICAL_COLUMNS]
+    y = df[TARGET]
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+    timing["load_seconds"] = time.perf_counter() - start
+    print(f"Loaded {len(df)} rows from {len(sources)} file(s) in {timing['load_seconds']:.2f}s", file=log)
+
+    param_grid = param_grid or PARAM_GRID
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = joblib.Memory(cache_dir or tmp, verbose=0)
+        search = GridSearchCV(build_pipeline(memory), param_grid, cv=cv, scoring="accuracy", n_jobs=n_jobs)
+        search_start = time.perf_counter()
+        search.fit(X_train, y_train)
+        timing["search_seconds"] = time.perf_counter() - search_start
+        timing["refit_seconds"] = search.refit_time_
+
+    # The cache is gone; ship the pipeline without a memory reference
+    model = search.best_estimator_
+    model.set_params(memory=None)
+
+    eval_start = time.perf_counter()
+    test_metrics = evaluate(model, X_test, y_test)
+    timing["evaluate_seconds"] = time.perf_counter() - eval_start
+
+    os.makedirs(output_dir, exist_ok=True)
+    # Written under a name the registry ignores, then renamed once the version is known
+    tmp_path = os.path.join(output_dir, ".performance_pipeline.pkl.tmp")
+    joblib.dump(model, tmp_path)
+    version = model_file_hash(tmp_path)
+    model_path = os.path.join(output_dir, f"performance_pipeline-{version}.pkl")
+    report_path = os.path.splitext(model_path)[0] + ".json"
+    timing["total_seconds"] = time.perf_counter() - start
+
+    results = search.cv_results_
+    report = {
+        "version": version,
+        "model_path": os.path.abspath(model_path),
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sources": sources,
+        "rows": {"train": len(y_train), "test": len(y_test)},
+        "target": f"{TARGET} = G3 > {PASS_THRESHOLD}",
+        "best_params": search.best_params_,
+        "metrics": {"cv_accuracy": search.best_score_, "test": test_metrics},
+        "cv_results": [
+            {"params": params, "mean_accuracy": mean, "std_accuracy": std, "mean_fit_seconds": fit}
+            for params, mean, std, fit in zip(results["params"], results["mean_test_score"],
+                                              results["std_test_score"], results["mean_fit_time"])
+        ],
+        "timing": {
+            **{key: round(value, 4) for key, value in timing.items()},
+            "n_jobs": n_jobs,
+            "cpu_count": os.cpu_count(),
+            "candidates": len(results["params"]),
+            "folds": cv,
+            "fits": len(results["params"]) * cv,
+        },
+        "environment": {"python": platform.python_version(), "sklearn": sklearn.__version__,
+                        "numpy": np.__version__, "pandas": pd.__version__},
+    }
+    # Report first: the registry may load the model as soon as it appears
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    os.replace(tmp_path, model_path)
+
+    print(f"Best {search.best_params_}: CV accuracy {search.best_score_:.4f}, "
+          f"test accuracy {test_metrics['accuracy']:.4f}, ROC-AUC {test_metrics['roc_auc']:.4f}", file=log)
+    print(f"{report['timing']['fits']} fits in {timing['search_seconds']:.2f}s (n_jobs={n_jobs}), "
+          f"total {timing['total_seconds']:.2f}s -> {model_path}", file=log)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the student pass/fail pipeline")
+    parser.add_argument("inputs", nargs="*", default=DEFAULT_INPUTS,
+                        help="CSV files/globs or columnar dataset directories (default: data/raw/*.csv)")
+    parser.add_argument("--output-dir", default=".", help="Where performance_pipeline-<version>.pkl/.json go")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel fits (-1 = all cores)")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--cache-dir", help="Keep the fitted-preprocessing cache here between runs")
+    args = parser.parse_args(argv)
+
+    report = train(args.inputs, args.output_dir, cv=args.cv, n_jobs=args.n_jobs, test_size=args.test_size,
+                   random_state=args.random_state, cache_dir=args.cache_dir)
+    print(json.dumps({"version": report["version"], "model_path": report["model_path"],
+                      "metrics": report["metrics"], "timing": report["timing"]}))
+
+
+if __name__ == "__main__":
+    main()
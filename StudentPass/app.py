@@ -1,11 +1,22 @@
 import streamlit as st
-import pandas as pd
-import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
-import shap
+import hashlib
+import io
+import os
+import sys
+from collections import OrderedDict
 import numpy as np
 
+# Shared serving code (compiled pipeline, explanation engine) lives next door
+SHARED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ML system design")
+sys.path.insert(0, SHARED_DIR)
+
+# pandas, scikit-learn, matplotlib, seaborn and shap take seconds to import,
+# so they are imported by the pages that use them: Home and About render
+# without them, and the model is loaded on the first prediction page
+
+# Built with: python columnar_dataset.py data/raw/student_mat.csv data/raw/student_por.csv -o data/processed/students
+COLUMNAR_DATA = os.path.join(SHARED_DIR, "data", "processed", "students")
+
 # -------------------------------
 # Page Config & Theme
 # -------------------------------
@@ -28,11 +39,30 @@ st.markdown(f"""
 # -------------------------------
 # Load Model
 # -------------------------------
-@st.cache_data
-def load_model():
-    return joblib.load("model/performance_pipeline.pkl")
+MODEL_PATH = "model/performance_pipeline.pkl"
+
+@st.cache_resource
+def load_model(path=MODEL_PATH):
+    """One shared pipeline per server process, its fast predictor and its version (short sha256 of the file)."""
+    import joblib
+    from fast_pipeline import make_predictor
 
-model = load_model()
+    with open(path, "rb") as f:
+        data = f.read()
+    pipeline = joblib.load(io.BytesIO(data))
+    return pipeline, make_predictor(pipeline), hashlib.sha256(data).hexdigest()[:12]
+
+@st.cache_resource
+def load_explanations(background_path="student_mat.csv"):
+    """SHAP engine on a fixed background sample; builds one explainer per model version."""
+    from explainer import ExplanationEngine
+
+    return ExplanationEngine(background_path)
+
+def pyplot():
+    """matplotlib.pyplot, imported on the first chart."""
+    import matplotlib.pyplot as plt
+    return plt
 
 # -------------------------------
 # Feature lists
@@ -57,6 +87,100 @@ def get_dynamic_options(df, col):
         return df[col].unique().tolist()
     return None
 
+PREDICTION_CHUNK_ROWS = 5000
+MAX_STORED_PREDICTIONS = 20
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def parse_csv(content_hash, _data):
+    """Parses CSV bytes once per distinct file content (the hash is the cache key)."""
+    import pandas as pd
+    return pd.read_csv(io.BytesIO(_data))
+
+def read_upload(uploaded_file):
+    """(content hash, DataFrame) for an uploaded CSV."""
+    data = uploaded_file.getvalue()
+    content_hash = hashlib.sha256(data).hexdigest()
+    return content_hash, parse_csv(content_hash, data)
+
+@st.cache_data(show_spinner=False)
+def read_local_csv(path, mtime):
+    """(content hash, DataFrame) for a CSV on disk; re-read only when its mtime changes."""
+    import pandas as pd
+    with open(path, "rb") as f:
+        data = f.read()
+    return hashlib.sha256(data).hexdigest(), pd.read_csv(io.BytesIO(data))
+
+@st.cache_resource
+def prediction_store():
+    """Batch predictions shared by all sessions, keyed by (file hash, model version)."""
+    return OrderedDict()
+
+def predict_in_chunks(df):
+    """
+    Predictions for the rows of df, PREDICTION_CHUNK_ROWS at a time, with a progress bar.
+    Each chunk goes to the compiled predictor as columns, without the pandas pipeline.
+    """
+    predictor = load_model()[1]
+    n_rows = len(df)
+    predictions = []
+    progress = st.progress(0.0, text=f"Scoring {n_rows:,} rows...")
+    for start in range(0, n_rows, PREDICTION_CHUNK_ROWS):
+        end = min(start + PREDICTION_CHUNK_ROWS, n_rows)
+        chunk = df.iloc[start:end]
+        predictions.append(predictor.predict_columns({col: chunk[col].to_numpy() for col in chunk.columns}))
+        progress.progress(end / n_rows, text=f"Scored {end:,} / {n_rows:,} rows")
+    progress.empty()
+    return np.concatenate(predictions) if predictions else np.array([])
+
+def explain_in_chunks(records):
+    """(explainer, attributions) for a list of records, with a progress bar."""
+    model, predictor, model_version = load_model()
+    progress = st.progress(0.0, text=f"Explaining {len(records):,} rows...")
+    result = load_explanations().shap_values(
+        model_version, model, predictor, records, chunk_size=PREDICTION_CHUNK_ROWS,
+        progress=lambda done, total: progress.progress(done / total, text=f"Explained {done:,} / {total:,} rows"),
+    )
+    progress.empty()
+    return result
+
+def plot_attributions(columns, values, title, top=15):
+    """Horizontal bar chart of the `top` largest attributions by magnitude."""
+    order = np.argsort(-np.abs(values))[:top][::-1]
+    fig, ax = pyplot().subplots(figsize=(8, 0.35 * len(order) + 1))
+    ax.barh([columns[j] for j in order], values[order],
+            color=[primary_color if values[j] >= 0 else secondary_color for j in order])
+    ax.set_xlabel(title)
+    st.pyplot(fig)
+
+@st.cache_resource
+def stats_store():
+    """Statistics per uploaded file (by content hash), shared by all sessions."""
+    from stats_engine import StatsStore
+    return StatsStore()
+
+@st.cache_resource
+def columnar_stats(path, mtime):
+    """Statistics of a columnar dataset, recomputed only when it is rewritten."""
+    from columnar_dataset import load_columnar
+    from stats_engine import STATS_CHUNK_ROWS, StreamingStats
+    return StreamingStats.from_chunks(load_columnar(path).iter_chunks(STATS_CHUNK_ROWS))
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def correlation_png(content_hash, _corr):
+    """Correlation heatmap rendered once per file."""
+    import seaborn as sns
+    plt = pyplot()
+    fig, ax = plt.subplots(figsize=(10,8))
+    sns.heatmap(_corr, annot=len(_corr) <= 20, fmt=".2f", cmap="coolwarm", ax=ax)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=5)
+def predictions_csv(content_hash, version, _df):
+    return _df.to_csv(index=False).encode()
+
 # -------------------------------
 # Home Page
 # -------------------------------
@@ -76,10 +200,13 @@ if app_mode == "Home":
 # Single Prediction Page
 # -------------------------------
 elif app_mode == "Single Prediction":
+    import pandas as pd
+
     st.title("Single Student Prediction")
+    model, predictor, model_version = load_model()
     
     sample_file = st.file_uploader("Upload CSV for dynamic categorical options (optional)", type="csv", key="single_sample")
-    sample_df = pd.read_csv(sample_file) if sample_file else None
+    sample_df = read_upload(sample_file)[1] if sample_file else None
 
     with st.form("single_prediction_form"):
         st.subheader("Categorical Features")
@@ -109,6 +236,8 @@ elif app_mode == "Single Prediction":
                     cat_inputs[col] = st.selectbox(col, ["home","reputation","course","other"])
                 elif col == 'guardian':
                     cat_inputs[col] = st.selectbox(col, ["mother","father","other"])
+                elif col == 'dataset':
+                    cat_inputs[col] = st.selectbox(col, ["math","portuguese"])
                 else:
                     cat_inputs[col] = st.text_input(col)
 
@@ -127,9 +256,9 @@ elif app_mode == "Single Prediction":
 
         if submitted:
             input_df = pd.DataFrame([{**cat_inputs, **num_inputs}])
-            
-            if 'dataset' not in df.columns:
-                input_df['dataset'] = 'student_mat'  # or any default value used during training
+
+            if not input_df.at[0, 'dataset']:
+                input_df['dataset'] = 'math'  # training used "math" / "portuguese"
 
             prediction = model.predict(input_df)[0]
             st.success(f"Predicted Performance: **{prediction}**")
@@ -138,13 +267,13 @@ elif app_mode == "Single Prediction":
             # SHAP Explanation
             # -------------------------------
             try:
-                explainer = shap.Explainer(model.predict, input_df)
-                shap_values = explainer(input_df)
+                explainer, values = load_explanations().shap_values(model_version, model, predictor, input_df.to_dict("records"))
                 st.subheader("Feature Importance (SHAP)")
-                shap.initjs()
-                shap.plots.bar(shap_values, show=False)
+                plot_attributions(explainer.columns, values[0], "Contribution to passing (log-odds)")
+                st.caption(f"Relative to the average student in the background sample "
+                           f"(base value {explainer.expected_value:.2f}, {explainer.kind} explainer).")
             except Exception as e:
-                st.warning("SHAP explanation could not be generated. Model may not be compatible.")
+                st.warning(f"SHAP explanation could not be generated: {e}")
 
 
 # -------------------------------
@@ -153,18 +282,19 @@ elif app_mode == "Single Prediction":
 elif app_mode == "Batch Prediction":
     st.title("Batch Prediction via CSV Upload")
     st.markdown("Upload CSV file with student data to get predictions.")
+    model_version = load_model()[2]
 
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
     
-    # Fallback to local CSV if no upload
+    # Fallback to local CSV if no upload (files are parsed once, keyed by content hash)
     if uploaded_file:
-        df = pd.read_csv(uploaded_file)
+        content_hash, df = read_upload(uploaded_file)
     else:
         try:
-            df = pd.read_csv("student_mat.csv")
+            content_hash, df = read_local_csv("student_mat.csv", os.path.getmtime("student_mat.csv"))
             st.info("No CSV uploaded. Using local student_mat.csv as default dataset.")
         except FileNotFoundError:
-            df = None
+            content_hash, df = None, None
             st.warning("No CSV uploaded and local student_mat.csv not found. Please upload a CSV.")
 
     # Proceed if df is available
@@ -172,20 +302,31 @@ elif app_mode == "Batch Prediction":
         st.write("Data Preview:")
         st.dataframe(df.head())
 
-        if st.button("Predict Batch"):
-            
-            if 'dataset' not in df.columns:
-                df['dataset'] = 'student_mat'  # or any default value used during training
+        # Predictions are kept per (file, model version), so widget interactions
+        # and other sessions with the same file do not score it again
+        store = prediction_store()
+        prediction_key = (content_hash, model_version)
+
+        input_df = df
+        if 'dataset' not in input_df.columns:
+            input_df = input_df.assign(dataset='math')  # training used "math" / "portuguese"
 
-            preds = model.predict(df)
-            df["Prediction"] = preds
-            st.success("Predictions added to data")
+        if prediction_key not in store and st.button("Predict Batch"):
+            store[prediction_key] = predict_in_chunks(input_df)
+            while len(store) > MAX_STORED_PREDICTIONS:
+                store.popitem(last=False)
+
+        if prediction_key in store:
+            df = df.assign(Prediction=store[prediction_key])
+            st.success(f"Predictions added to data (model {model_version})")
             st.dataframe(df.head())
             
             # -------------------------------
             # Interactive Charts
             # -------------------------------
             st.subheader("Prediction Counts")
+            import seaborn as sns
+            plt = pyplot()
             pred_counts = df["Prediction"].value_counts()
             fig, ax = plt.subplots()
             sns.barplot(x=pred_counts.index, y=pred_counts.values, palette="coolwarm", ax=ax)
@@ -197,31 +338,62 @@ elif app_mode == "Batch Prediction":
             ax2.pie(pred_counts.values, labels=pred_counts.index, autopct="%1.1f%%", colors=["#4B79A1","#F4D35E"])
             st.pyplot(fig2)
 
+            # -------------------------------
+            # SHAP Explanations (same engine and background as Single Prediction)
+            # -------------------------------
+            st.subheader("Feature Importance (SHAP)")
+            explanation_key = (content_hash, model_version, "shap")
+            if explanation_key not in store and st.button("Explain Predictions"):
+                store[explanation_key] = explain_in_chunks(input_df.to_dict("records"))
+                while len(store) > MAX_STORED_PREDICTIONS:
+                    store.popitem(last=False)
+
+            if explanation_key in store:
+                explainer, values = store[explanation_key]
+                plot_attributions(explainer.columns, np.abs(values).mean(axis=0), "Mean |SHAP value| (log-odds)")
+                row = st.number_input("Explain row", min_value=0, max_value=len(df) - 1, value=0)
+                plot_attributions(explainer.columns, values[row], f"Contribution to passing for row {row} (log-odds)")
+
             # Download option
-            csv = df.to_csv(index=False).encode()
+            csv = predictions_csv(content_hash, model_version, df)
             st.download_button("Download Predictions CSV", data=csv, file_name="predictions.csv", mime="text/csv")
 
 # -------------------------------
 # Statistics Page
 # -------------------------------
 elif app_mode == "Statistics":
+    from columnar_dataset import is_columnar
+
     st.title("Student Data Statistics")
     st.markdown("Upload dataset to view charts and statistics.")
     
     uploaded_file = st.file_uploader("Upload CSV for statistics", type="csv", key="stats")
+    stats = None
     if uploaded_file:
-        df = pd.read_csv(uploaded_file)
-        st.write(df.describe())
+        # One streaming pass per file; a re-upload with appended rows only reads the new rows
+        content_hash, stats, how = stats_store().get(uploaded_file.getvalue())
+        st.caption(f"{stats.rows:,} rows (statistics {how})")
+    elif is_columnar(COLUMNAR_DATA):
+        mtime = os.path.getmtime(os.path.join(COLUMNAR_DATA, "meta.json"))
+        content_hash, stats = f"columnar:{mtime}", columnar_stats(COLUMNAR_DATA, mtime)
+        st.info(f"No CSV uploaded. Using the columnar student dataset ({stats.rows:,} rows).")
+
+    if stats is not None:
+        st.write(stats.describe())
+        if stats.categorical_columns:
+            st.write(stats.describe_categorical())
 
         st.subheader("Correlation Heatmap")
-        fig, ax = plt.subplots(figsize=(10,8))
-        sns.heatmap(df.corr(), annot=True, cmap="coolwarm", ax=ax)
-        st.pyplot(fig)
+        st.image(correlation_png(content_hash, stats.corr()))
 
         st.subheader("Feature Distributions")
-        feature = st.selectbox("Select feature for histogram", numeric_features)
-        fig2, ax2 = plt.subplots()
-        sns.histplot(df[feature], kde=True, ax=ax2, color=secondary_color)
+        features = [col for col in numeric_features if col in stats.numeric_columns] or stats.numeric_columns
+        feature = st.selectbox("Select feature for histogram", features)
+        edges, counts = stats.histogram(feature)
+        fig2, ax2 = pyplot().subplots()
+        ax2.stairs(counts, edges, fill=True, color=secondary_color)
+        ax2.set_xlabel(feature)
+        ax2.set_ylabel("Count")
         st.pyplot(fig2)
 
 # -------------------------------
@@ -0,0 +1,290 @@
+# stats_engine.py
+"""
+Single-pass statistics for the Statistics page.
+
+A CSV is read in chunks and folded into running sums, so memory stays flat
+however large the file is, and the result can be extended with appended rows
+without re-reading the old ones:
+
+    stats = StreamingStats.from_csv(io.BytesIO(data))
+    stats = StreamingStats.from_chunks(load_columnar(path).iter_chunks(STATS_CHUNK_ROWS))
+    stats.describe(), stats.corr(), stats.histogram("age")
+"""
+import copy
+import hashlib
+import io
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+
+STATS_CHUNK_ROWS = 50000
+MAX_HISTOGRAM_BINS = 256
+MAX_TRACKED_CATEGORIES = 1000
+
+
+class StreamingStats:
+    """
+    Running summary of a table, updated one chunk at a time.
+
+    Numeric columns (the numeric dtypes of the first chunk) keep count,
+    min/max, the sums needed for mean/std and a pairwise-complete
+    correlation matrix, and a histogram whose bin width doubles whenever the
+    data would need more than `max_bins` bins (integer columns with a small
+    range stay exact). Other columns keep value counts.
+
+    Parameters:
+    max_bins (int): Upper bound on histogram bins per numeric column
+    """
+
+    def __init__(self, max_bins=MAX_HISTOGRAM_BINS):
+        self.max_bins = max_bins
+        self.columns = None
+        self.numeric_columns = []
+        self.categorical_columns = []
+        self.rows = 0
+
+    # ----------------------
+    # Building
+    # ----------------------
+    @classmethod
+    def from_chunks(cls, chunks, **kwargs):
+        stats = cls(**kwargs)
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats
+
+    @classmethod
+    def from_csv(cls, source, chunk_size=STATS_CHUNK_ROWS, **kwargs):
+        return cls.from_chunks(pd.read_csv(source, chunksize=chunk_size), **kwargs)
+
+    def update(self, df):
+        """Folds the rows of one DataFrame chunk into the statistics."""
+        if self.columns is None:
+            self._start(df)
+        if len(df) == 0:
+            return
+        self.rows += len(df)
+
+        # Values are shifted by the first chunk's means so the sums of squares stay well conditioned
+        X = np.column_stack([pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+                             for col in self.numeric_columns]) if self.numeric_columns else np.zeros((len(df), 0))
+        if self._shift is None:
+            self._shift = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+        present = ~np.isnan(X)
+        M = present.astype(np.float64)
+        X0 = np.where(present, X - self._shift, 0.0)
+
+        self._n += M.T @ M
+        self._sx += X0.T @ M
+        self._sxx += (X0 * X0).T @ M
+        self._sxy += X0.T @ X0
+        seen = present.any(axis=0)
+        self._min = np.fmin(self._min, np.where(seen, np.where(present, X, np.inf).min(axis=0), np.nan))
+        self._max = np.fmax(self._max, np.where(seen, np.where(present, X, -np.inf).max(axis=0), np.nan))
+        for j in range(X.shape[1]):
+            values = X[present[:, j], j]
+            self._integral[j] &= bool(np.all(values == np.floor(values)))
+            self._add_to_histogram(j, values)
+
+        for col in self.categorical_columns:
+            counts = self._categories[col]
+            counts.update(df[col].dropna().astype(str).value_counts().to_dict())
+            if len(counts) > MAX_TRACKED_CATEGORIES:
+                # Keep the most frequent values; the tail is reported as truncated
+                self._categories[col] = Counter(dict(counts.most_common(MAX_TRACKED_CATEGORIES)))
+                self._truncated.add(col)
+            self._category_counts[col] += int(df[col].notna().sum())
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def _start(self, df):
+        self.columns = list(df.columns)
+        self.numeric_columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+        self.categorical_columns = [col for col in df.columns if col not in self.numeric_columns]
+        k = len(self.numeric_columns)
+        self._shift = None
+        self._n = np.zeros((k, k))
+        self._sx = np.zeros((k, k))  # sum of column i over rows where column j is present
+        self._sxx = np.zeros((k, k))
+        self._sxy = np.zeros((k, k))
+        self._min = np.full(k, np.nan)
+        self._max = np.full(k, np.nan)
+        # Histogram per column: bin width (set by the first values seen), index of the first bin, counts
+        self._hist = [[None, 0, np.zeros(0, dtype=np.int64)] for _ in range(k)]
+        self._integral = np.ones(k, dtype=bool)
+        self._categories = {col: Counter() for col in self.categorical_columns}
+        self._category_counts = {col: 0 for col in self.categorical_columns}
+        self._truncated = set()
+
+    def _add_to_histogram(self, j, values):
+        if len(values) == 0:
+            return
+        hist = self._hist[j]
+        width, first, counts = hist
+        if width is None:
+            width = self._initial_width(values, self._integral[j])
+        # The range is widened in floats first: casting keys of large values to int64 would overflow
+        lo, hi = np.floor(values.min() / width), np.floor(values.max() / width)
+        if len(counts):
+            lo, hi = min(lo, first), max(hi, first + len(counts) - 1)
+        doublings = 0
+        # Integer columns never need bins narrower than 1
+        while (hi - lo + 1 > self.max_bins or max(abs(lo), abs(hi)) > 2 ** 52
+               or (self._integral[j] and width < 1)):
+            # Double the width: bins 2k and 2k+1 become bin k
+            width *= 2
+            lo, hi = lo // 2, hi // 2
+            doublings += 1
+        if len(counts) and doublings:
+            old_keys = np.arange(first, first + len(counts)) // 2 ** doublings
+            first = int(old_keys[0])
+            counts = np.bincount(old_keys - first, weights=counts).astype(np.int64)
+        keys = np.floor(values / width).astype(np.int64)
+        lo = min(keys.min(), first) if len(counts) else keys.min()
+        hi = max(keys.max(), first + len(counts) - 1) if len(counts) else keys.max()
+        merged = np.zeros(hi - lo + 1, dtype=np.int64)
+        if len(counts):
+            merged[first - lo:first - lo + len(counts)] += counts
+        merged += np.bincount(keys - lo, minlength=len(merged))
+        hist[:] = [width, int(lo), merged]
+
+    def _initial_width(self, values, integral):
+        """Power of two that spreads the first values over about `max_bins` bins (at least 1 for integers)."""
+        span = float(values.max() - values.min())
+        if span > 0:
+            width = 2.0 ** np.floor(np.log2(span / self.max_bins))
+        else:
+            width = 2.0 ** np.floor(np.log2(abs(float(values[0])) or 1.0)) * 2.0 ** -20
+        return max(width, 1.0) if integral else width
+
+    # ----------------------
+    # Reading
+    # ----------------------
+    def describe(self):
+        """Numeric summary in the layout of `df.describe()`; quartiles are read off the histograms."""
+        n = np.diag(self._n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.diag(self._sx) / n
+            var = (np.diag(self._sxx) - n * mean ** 2) / (n - 1)
+        summary = {
+            "count": n,
+            "mean": mean + self._shift if self._shift is not None else mean,
+            "std": np.sqrt(np.maximum(var, 0.0)),
+            "min": self._min,
+        }
+        for q in (0.25, 0.5, 0.75):
+            summary[f"{int(q * 100)}%"] = [self._quantile(j, q) for j in range(len(self.numeric_columns))]
+        summary["max"] = self._max
+        return pd.DataFrame(summary, index=self.numeric_columns).T
+
+    def describe_categorical(self):
+        """
+        count / unique / top / freq per non-numeric column (one row each). `unique`
+        is a lower bound when `truncated`, i.e. more than MAX_TRACKED_CATEGORIES values were seen.
+        """
+        summary = {}
+        for col in self.categorical_columns:
+            counts = self._categories[col]
+            top, freq = counts.most_common(1)[0] if counts else (None, 0)
+            summary[col] = {"count": self._category_counts[col], "unique": len(counts), "top": top, "freq": freq,
+                            "truncated": col in self._truncated}
+        return pd.DataFrame.from_dict(summary, orient="index")
+
+    def corr(self):
+        """Pearson correlation of the numeric columns over pairwise-complete rows."""
+        n, sx, sxx, sxy = self._n, self._sx, self._sxx, self._sxy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * sxy - sx * sx.T
+            corr = cov / np.sqrt((n * sxx - sx ** 2) * (n * sxx.T - sx.T ** 2))
+        np.fill_diagonal(corr, np.where(np.diag(n) > 1, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.numeric_columns, columns=self.numeric_columns)
+
+    def histogram(self, col, bins=64):
+        """(bin edges, counts) of a numeric column, adjacent bins merged down to at most `bins`."""
+        width, first, counts = self._hist[self.numeric_columns.index(col)]
+        factor = 1
+        while len(counts) > bins * factor:
+            factor *= 2
+        if factor > 1:
+            # Align to the coarser grid so edges stay multiples of the new width
+            pad = first % factor
+            counts = np.add.reduceat(np.concatenate([np.zeros(pad, dtype=np.int64), counts]),
+                                     np.arange(0, pad + len(counts), factor))
+            first, width = (first - pad) // factor, width * factor
+        edges = (first + np.arange(len(counts) + 1)) * width
+        return edges, counts
+
+    def value_counts(self, col):
+        return pd.Series(dict(self._categories[col].most_common()), name=col, dtype=np.int64)
+
+    def _quantile(self, j, q):
+        """Linear interpolation between order statistics, as pandas does; exact while each bin holds one integer."""
+        width, first, counts = self._hist[j]
+        total = int(counts.sum())
+        if not total:
+            return np.nan
+        cumulative = np.cumsum(counts)
+        position = q * (total - 1)
+        below, above = int(np.floor(position)), int(np.ceil(position))
+        value_below, value_above = self._ranked_value(j, below, cumulative), self._ranked_value(j, above, cumulative)
+        value = value_below + (position - below) * (value_above - value_below)
+        return float(np.clip(value, self._min[j], self._max[j]))
+
+    def _ranked_value(self, j, rank, cumulative):
+        width, first, counts = self._hist[j]
+        k = int(np.searchsorted(cumulative, rank, side="right"))
+        start = (first + k) * width
+        if self._integral[j] and width <= 1:
+            return np.ceil(start)
+        # Otherwise assume the values are spread evenly inside the bin
+        before = cumulative[k - 1] if k else 0
+        return start + (rank - before + 0.5) / counts[k] * width
+
+
+class StatsStore:
+    """
+    StreamingStats per file content hash, shared across sessions.
+
+    When a file is an earlier file plus appended rows (the earlier bytes are
+    its prefix), only the new rows are read and folded into a copy of the
+    earlier statistics.
+
+    Parameters:
+    max_entries (int): Files whose statistics are kept
+    """
+
+    def __init__(self, max_entries=20):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # content hash -> (size in bytes, StreamingStats)
+        self._lock = threading.Lock()
+
+    def get(self, data):
+        """(content hash, StreamingStats, how) for CSV bytes; how is "cached", "appended" or "computed"."""
+        key = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return key, self._entries[key][1], "cached"
+            # Longest earlier file first, so the fewest rows are left to read
+            candidates = sorted(((size, k, stats) for k, (size, stats) in self._entries.items()), reverse=True)
+
+        stats, how = None, "computed"
+        for size, previous_key, previous in candidates:
+            if (size < len(data) and data[size - 1:size] == b"\n"
+                    and hashlib.sha256(data[:size]).hexdigest() == previous_key):
+                stats, how = previous.copy(), "appended"
+                for chunk in pd.read_csv(io.BytesIO(data[size:]), header=None, names=previous.columns,
+                                         chunksize=STATS_CHUNK_ROWS):
+                    stats.update(chunk)
+                break
+        if stats is None:
+            stats = StreamingStats.from_csv(io.BytesIO(data))
+
+        with self._lock:
+            self._entries[key] = (len(data), stats)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return key, stats, how
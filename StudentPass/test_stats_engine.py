@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import StatsStore, StreamingStats
+
+
+def load_sample():
+    with open("student_mat.csv", "rb") as f:
+        return f.read()
+
+
+def test_matches_pandas_in_one_pass():
+    data = load_sample()
+    df = pd.read_csv(io.BytesIO(data))
+    stats = StreamingStats.from_csv(io.BytesIO(data), chunk_size=37)
+
+    assert stats.rows == len(df)
+    pd.testing.assert_frame_equal(stats.describe(), df.describe(), check_exact=False)
+    pd.testing.assert_frame_equal(stats.corr(), df.corr(numeric_only=True), check_exact=False)
+    assert stats.describe_categorical().loc["school"].to_dict() == {
+        "count": 395, "unique": 2, "top": "GP", "freq": 349, "truncated": False}
+
+    edges, counts = stats.histogram("age")
+    assert list(edges) == list(range(15, 24))
+    assert list(counts) == df["age"].value_counts().reindex(range(15, 23), fill_value=0).tolist()
+
+
+def test_missing_values_and_wide_ranges():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.exponential(100, 5000), "y": rng.normal(0, 1, 5000), "z": list("ab") * 2500})
+    df.loc[::7, "x"] = np.nan
+    stats = StreamingStats.from_csv(io.BytesIO(df.to_csv(index=False).encode()), chunk_size=999)
+
+    summary = stats.describe()
+    expected = df.describe()
+    for row in ("count", "mean", "std", "min", "max"):
+        np.testing.assert_allclose(summary.loc[row], expected.loc[row])
+    np.testing.assert_allclose(stats.corr(), df.corr(numeric_only=True), atol=1e-12)
+    edges, counts = stats.histogram("x", bins=32)
+    assert len(counts) <= 32 and counts.sum() == df["x"].notna().sum()
+
+
+def test_large_values_do_not_overflow_the_histogram_keys():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"x": rng.uniform(1.5e14, 3.5e14, 4000), "n": rng.integers(10 ** 13, 10 ** 15, 4000)})
+    stats = StreamingStats.from_chunks([df.iloc[:1000], df.iloc[1000:]])
+
+    summary, expected = stats.describe(), df.describe()
+    for row in ("25%", "50%", "75%"):
+        np.testing.assert_allclose(summary.loc[row], expected.loc[row], rtol=0.02)
+    edges, counts = stats.histogram("x")
+    assert edges[0] <= df["x"].min() and edges[-1] >= df["x"].max() and counts.sum() == len(df)
+
+
+def test_appended_rows_only_read_the_new_rows():
+    data = load_sample()
+    head = data[:data.index(b"\n", len(data) // 2) + 1]
+    store = StatsStore()
+
+    _, first, how = store.get(head)
+    assert how == "computed"
+    assert store.get(head)[2] == "cached"
+
+    _, extended, how = store.get(data)
+    assert how == "appended"
+    assert extended.rows == 395 and first.rows < 395
+    pd.testing.assert_frame_equal(extended.describe(), StreamingStats.from_csv(io.BytesIO(data)).describe())